@@ -0,0 +1,246 @@
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional, Tuple
+from escenario5DIP import Notifier, OrderService
+
+# Envío asíncrono de notificaciones detrás de la misma abstracción Notifier:
+# send() solo encola y vuelve; un hilo por canal junta los mensajes en lotes
+# y los entrega. El servicio que notifica no espera al SMTP ni al SMS.
+
+Message = Tuple[str, str]  # (destinatario, texto)
+
+class NotificationQueueFull(Exception):
+    # La cola del canal está llena: el llamador decide si reintenta o descarta
+    pass
+
+# --- Canales ---
+class Channel(ABC):
+    @abstractmethod
+    def send_batch(self, messages: List[Message]) -> None:
+        pass
+
+class NotifierChannel(Channel):
+    # Adapta cualquier Notifier existente (uno por uno dentro del lote)
+    def __init__(self, notifier: Notifier):
+        self.notifier = notifier
+
+    def send_batch(self, messages: List[Message]) -> None:
+        for to, msg in messages:
+            self.notifier.send(to, msg)
+
+class InMemoryChannel(Channel):
+    # Canal local para pruebas: guarda los lotes y puede simular latencia
+    # y fallas (las primeras fail_times llamadas lanzan ConnectionError)
+    def __init__(self, latency: float = 0.0, fail_times: int = 0):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.calls = 0
+        self.batches: List[List[Message]] = []
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: List[Message]) -> None:
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.fail_times
+        if self.latency:
+            time.sleep(self.latency)
+        if failing:
+            raise ConnectionError("canal no disponible")
+        with self._lock:
+            self.batches.append(list(messages))
+
+    @property
+    def sent(self) -> List[Message]:
+        with self._lock:
+            return [message for batch in self.batches for message in batch]
+
+# --- Despacho por canal ---
+class _ChannelWorker:
+    def __init__(self, name: str, channel: Channel, owner: "AsyncNotifier"):
+        self.name = name
+        self.channel = channel
+        self.owner = owner
+        self.queue = queue.Queue(maxsize=owner.max_queue)
+        self.stats = Counter()
+        self.thread = threading.Thread(target=self._run, name=f"notify-{name}", daemon=True)
+
+    def _run(self) -> None:
+        owner = self.owner
+        while True:
+            try:
+                first = self.queue.get(timeout=owner.flush_interval)
+            except queue.Empty:
+                if owner._stopping.is_set():
+                    return
+                continue
+            # Juntar hasta batch_size mensajes o hasta que venza flush_interval
+            batch = [first]
+            deadline = time.monotonic() + owner.flush_interval
+            while len(batch) < owner.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._deliver(batch)
+            owner._done(len(batch))
+
+    def _deliver(self, batch: List[Message]) -> None:
+        owner = self.owner
+        for attempt in range(owner.max_retries + 1):
+            try:
+                self.channel.send_batch(batch)
+            except Exception as e:
+                if attempt == owner.max_retries:
+                    with owner._lock:
+                        self.stats["failed"] += len(batch)
+                    if owner.on_failed:
+                        owner.on_failed(self.name, batch, e)
+                    return
+                with owner._lock:
+                    self.stats["retries"] += 1
+                # Backoff exponencial con jitter completo: los reintentos de
+                # varios canales no golpean al proveedor al mismo tiempo
+                delay = owner._rng.uniform(0, min(owner.max_backoff, owner.base_backoff * 2 ** attempt))
+                owner._sleep(delay)
+            else:
+                with owner._lock:
+                    self.stats["sent"] += len(batch)
+                    self.stats["batches"] += 1
+                return
+
+# --- Notifier asíncrono ---
+class AsyncNotifier(Notifier):
+    def __init__(self, channels: Dict[str, Channel], default_channel: str = None,
+                 max_queue: int = 1000, batch_size: int = 50, flush_interval: float = 0.05,
+                 coalesce_window: float = 30.0, block_timeout: Optional[float] = 0.0,
+                 max_retries: int = 3, base_backoff: float = 0.1, max_backoff: float = 5.0,
+                 on_failed: Callable[[str, List[Message], Exception], None] = None,
+                 clock=time.monotonic, rng: random.Random = None, sleep=time.sleep):
+        # block_timeout: cuánto espera send() con la cola llena antes de
+        # lanzar NotificationQueueFull (0 = rechaza al instante, None = sin límite)
+        if not channels:
+            raise ValueError("Se necesita al menos un canal")
+        self.default_channel = default_channel or next(iter(channels))
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.coalesce_window = coalesce_window
+        self.block_timeout = block_timeout
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.on_failed = on_failed
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._stopping = threading.Event()
+        # Últimos envíos por (canal, destinatario, texto) para colapsar duplicados
+        self._recent: Dict[Tuple[str, str, str], float] = {}
+        self._recent_order = deque()
+        self._workers = {name: _ChannelWorker(name, channel, self) for name, channel in channels.items()}
+        self._started = False
+
+    def start(self) -> "AsyncNotifier":
+        with self._lock:
+            if not self._started:
+                self._started = True
+                for worker in self._workers.values():
+                    worker.thread.start()
+        return self
+
+    def send(self, to: str, msg: str, channel: str = None) -> None:
+        name = channel or self.default_channel
+        worker = self._workers[name]
+        if self._stopping.is_set():
+            raise RuntimeError("El notificador está detenido")
+        self.start()
+
+        now = self._clock()
+        key = (name, to, msg)
+        with self._lock:
+            self._forget_expired(now)
+            last = self._recent.get(key)
+            if last is not None and now - last < self.coalesce_window:
+                worker.stats["coalesced"] += 1
+                return
+            # Se registra antes de encolar para que un duplicado concurrente también se colapse
+            self._recent[key] = now
+            self._recent_order.append((now, key))
+            self._pending += 1
+
+        try:
+            worker.queue.put((to, msg), block=self.block_timeout != 0, timeout=self.block_timeout or None)
+        except queue.Full:
+            with self._lock:
+                self._pending -= 1
+                if self._recent.get(key) == now:
+                    del self._recent[key]
+                worker.stats["rejected"] += 1
+            raise NotificationQueueFull(f"Cola del canal '{name}' llena")
+
+        with self._lock:
+            worker.stats["enqueued"] += 1
+
+    def flush(self, timeout: float = None) -> bool:
+        # Espera a que todo lo encolado se haya entregado (o descartado tras reintentos)
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def stop(self, timeout: float = None) -> None:
+        # Drena las colas y detiene los hilos
+        if self._started:
+            self.flush(timeout)
+        self._stopping.set()
+        for worker in self._workers.values():
+            if worker.thread.is_alive():
+                worker.thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "channels": {
+                    name: {**worker.stats, "queued": worker.queue.qsize()}
+                    for name, worker in self._workers.items()
+                }
+            }
+
+    def _done(self, count: int) -> None:
+        with self._idle:
+            self._pending -= count
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _forget_expired(self, now: float) -> None:
+        # Las claves salen en orden de llegada: el mapa no crece más allá de la ventana
+        while self._recent_order and now - self._recent_order[0][0] >= self.coalesce_window:
+            sent_at, key = self._recent_order.popleft()
+            if self._recent.get(key) == sent_at:
+                del self._recent[key]
+
+# --- Main ---
+if __name__ == "__main__":
+    sms = InMemoryChannel(latency=0.2, fail_times=1)
+    email = InMemoryChannel(latency=0.1)
+    notifier = AsyncNotifier({"sms": sms, "email": email}, base_backoff=0.05)
+
+    start = time.perf_counter()
+    order_service = OrderService(notifier)
+    for crew in range(20):
+        order_service.place_order(f"crew-{crew % 5}", "Despacho: incendio en Av. Central")
+    notifier.send("central@test.com", "Resumen del turno", channel="email")
+    print(f"20 órdenes en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    notifier.stop()
+    print(notifier.stats())
+    print(f"lotes sms={len(sms.batches)} mensajes={sms.sent}")
@@ -0,0 +1,239 @@
+import random
+import threading
+from bisect import bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+from escenario1SRP import DataSource, Formatter, ConsoleOutput, ReportService
+
+# Estadísticas de incidentes calculadas de forma incremental: cada evento
+# (alta o cambio de estado) actualiza contadores y sketches, y get_data()
+# solo lee ese resumen. El costo de un reporte no depende del historial.
+
+# Estados del backend de Node (backend/adapters/secondary/mongoIncidentRepository.js)
+ACTIVE = "activo"
+DISPATCHED = "en camino"
+RESOLVED = "resuelto"
+PERCENTILES = (0.5, 0.9, 0.99)
+
+# --- Sketch de percentiles ---
+class P2Quantile:
+    # Algoritmo P² (Jain y Chlamtac): estima un percentil con 5 marcadores,
+    # memoria constante y O(1) por muestra, sin guardar las muestras
+    def __init__(self, p: float):
+        self.p = p
+        self._initial = []
+        self._heights = None
+        self._positions = None
+        self._desired = None
+        self._increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x: float) -> None:
+        if self._heights is None:
+            self._initial.append(x)
+            if len(self._initial) == 5:
+                self._heights = sorted(self._initial)
+                self._positions = [0, 1, 2, 3, 4]
+                self._desired = [0.0, 2 * self.p, 4 * self.p, 2 + 2 * self.p, 4.0]
+            return
+
+        q, n = self._heights, self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect_right(q, x) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Ajustar los marcadores intermedios que se alejaron de su posición ideal
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        if self._heights is not None:
+            return self._heights[2]
+        if not self._initial:
+            return None
+        # Menos de 5 muestras: percentil exacto
+        ordered = sorted(self._initial)
+        return ordered[round(self.p * (len(ordered) - 1))]
+
+# --- Motor de estadísticas ---
+class IncidentStats:
+    # Consume eventos de incidentes y mantiene:
+    #  - conteo actual por estado
+    #  - altas totales por tipo y por severidad
+    #  - altas y resoluciones por día (solo los últimos retention_days)
+    #  - tiempo de respuesta (alta -> primer estado de despacho o
+    #    resolución) en minutos: media, mínimo, máximo y percentiles P²
+    # Solo se guardan los incidentes abiertos; al resolverse salen del mapa.
+    # Los estados por defecto son los del backend; otro origen de eventos
+    # puede pasar los suyos.
+
+    def __init__(self, retention_days: int = 30, clock=datetime.now,
+                 dispatched_statuses=(DISPATCHED,), resolved_statuses=(RESOLVED,)):
+        self.retention_days = retention_days
+        self.dispatched_statuses = frozenset(dispatched_statuses)
+        self.resolved_statuses = frozenset(resolved_statuses)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._open = {}  # id -> [estado, creado, respondido]
+        self.total = 0
+        self.by_status = Counter()
+        self.by_type = Counter()
+        self.by_severity = Counter()
+        self.by_day = {}  # fecha -> Counter(created, resolved)
+        self.response_count = 0
+        self.response_sum = 0.0
+        self.response_min = None
+        self.response_max = None
+        self.response_percentiles = {p: P2Quantile(p) for p in PERCENTILES}
+        self.unknown_events = 0
+
+    def record_created(self, incident_id, incident_type: str, severity: str,
+                       status: str = ACTIVE, at: datetime = None) -> None:
+        at = at or self._clock()
+        with self._lock:
+            if incident_id in self._open:
+                self.unknown_events += 1
+                return
+            self._open[incident_id] = [status, at, False]
+            self.total += 1
+            self.by_status[status] += 1
+            self.by_type[incident_type] += 1
+            self.by_severity[severity] += 1
+            self._day(at)["created"] += 1
+
+    def record_status_change(self, incident_id, status: str, at: datetime = None) -> None:
+        at = at or self._clock()
+        with self._lock:
+            incident = self._open.get(incident_id)
+            if incident is None:
+                # Cambio sobre un incidente ya resuelto o que no vimos nacer
+                self.unknown_events += 1
+                return
+            previous, created_at, responded = incident
+            self.by_status[previous] -= 1
+            self.by_status[status] += 1
+            incident[0] = status
+            resolved = status in self.resolved_statuses
+            if not responded and (resolved or status in self.dispatched_statuses):
+                incident[2] = True
+                self._observe_response((at - created_at).total_seconds() / 60)
+            if resolved:
+                del self._open[incident_id]
+                self._day(at)["resolved"] += 1
+
+    def apply(self, event: dict) -> None:
+        # Eventos como llegan de la cola: {"event": "created"|"status_changed", ...}
+        if event["event"] == "created":
+            self.record_created(event["id"], event["type"], event["severity"],
+                                event.get("status", ACTIVE), event.get("at"))
+        elif event["event"] == "status_changed":
+            self.record_status_change(event["id"], event["status"], event.get("at"))
+        else:
+            with self._lock:
+                self.unknown_events += 1
+
+    def snapshot(self) -> dict:
+        today = self._clock().date()
+        with self._lock:
+            return {
+                "total": self.total,
+                "active": len(self._open),
+                "resolved_today": self.by_day.get(today, Counter())["resolved"],
+                "created_today": self.by_day.get(today, Counter())["created"],
+                "by_status": {status: n for status, n in self.by_status.items() if n},
+                "by_type": dict(self.by_type),
+                "by_severity": dict(self.by_severity),
+                "by_day": {str(day): dict(counts) for day, counts in sorted(self.by_day.items())},
+                "response_minutes": {
+                    "count": self.response_count,
+                    "avg": self.response_sum / self.response_count if self.response_count else None,
+                    "min": self.response_min,
+                    "max": self.response_max,
+                    **{f"p{round(p * 100)}": sketch.value() for p, sketch in self.response_percentiles.items()}
+                }
+            }
+
+    def _observe_response(self, minutes: float) -> None:
+        self.response_count += 1
+        self.response_sum += minutes
+        self.response_min = minutes if self.response_min is None else min(self.response_min, minutes)
+        self.response_max = minutes if self.response_max is None else max(self.response_max, minutes)
+        for sketch in self.response_percentiles.values():
+            sketch.add(minutes)
+
+    def _day(self, at: datetime) -> Counter:
+        day = at.date()
+        counts = self.by_day.get(day)
+        if counts is None:
+            counts = self.by_day[day] = Counter(created=0, resolved=0)
+            # Ventana fija de días: se descarta el más viejo
+            while len(self.by_day) > self.retention_days:
+                del self.by_day[min(self.by_day)]
+        return counts
+
+# --- Data Source ---
+class IncidentStatsSource(DataSource):
+    def __init__(self, stats: IncidentStats):
+        self.stats = stats
+
+    def get_data(self):
+        data = self.stats.snapshot()
+        data["fecha"] = str(datetime.now())
+        return data
+
+# --- Formatter ---
+class IncidentFormatter(Formatter):
+    def format(self, data):
+        response = data["response_minutes"]
+
+        def minutes(value):
+            return "-" if value is None else f"{value:.1f} min"
+
+        return "\n".join([
+            f"REPORTE DE INCIDENTES {data['fecha']}",
+            f"total={data['total']} activos={data['active']} resueltos_hoy={data['resolved_today']}",
+            f"respuesta: promedio={minutes(response['avg'])} p50={minutes(response['p50'])} "
+            f"p90={minutes(response['p90'])} p99={minutes(response['p99'])}",
+            f"por estado: {data['by_status']}",
+            f"por tipo: {data['by_type']}",
+            f"por severidad: {data['by_severity']}"
+        ])
+
+# --- Main ---
+if __name__ == "__main__":
+    stats = IncidentStats()
+    rng = random.Random(7)
+    start = datetime.now() - timedelta(days=3)
+    for incident_id in range(10_000):
+        created = start + timedelta(seconds=incident_id * 25)
+        stats.record_created(incident_id, rng.choice(["fire", "medical", "police"]),
+                             rng.choice(["baja", "media", "alta", "critica"]), at=created)
+        dispatched = created + timedelta(minutes=rng.lognormvariate(1.3, 0.5))
+        stats.record_status_change(incident_id, DISPATCHED, at=dispatched)
+        if rng.random() < 0.9:
+            stats.record_status_change(incident_id, RESOLVED, at=dispatched + timedelta(minutes=rng.uniform(10, 90)))
+
+    service = ReportService(IncidentStatsSource(stats), IncidentFormatter(), [ConsoleOutput()])
+    service.run_report()
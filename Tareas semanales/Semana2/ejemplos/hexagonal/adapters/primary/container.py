@@ -0,0 +1,240 @@
+import os
+import threading
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, List, Mapping, Optional
+from adapters.secondary.emergency_repository import InMemoryEmergencyRepository, InMemoryVehicleRepository
+from adapters.secondary.mongo_documents import MONGO_URI_ENV
+from adapters.secondary.instrumented_ports import (
+    InstrumentedEmergencyRepository, InstrumentedRouteOptimizer, InstrumentedVehicleRepository
+)
+from domain.entities import Location
+from services.metrics import MetricsRegistry
+
+DISPATCH_SHARDS_ENV = "DISPATCH_SHARDS"
+SNAPSHOT_DIR_ENV = "SNAPSHOT_DIR"
+TRAVEL_TIME_DIR_ENV = "TRAVEL_TIME_DIR"
+TRAFFIC_DIR_ENV = "TRAFFIC_DIR"
+
+# Lo que warm_up() deja construido antes de marcar la aplicación como lista
+WARM_UP_COMPONENTS = ("emergency_repository", "vehicle_repository", "route_service",
+                      "position_ingestion", "dispatch_scheduler")
+
+@dataclass(frozen=True)
+class ContainerSettings:
+    mongo_uri: Optional[str] = None
+    dispatch_shards: Optional[str] = None  # "2x2"
+    snapshot_dir: Optional[str] = None
+    travel_time_dir: Optional[str] = None
+    traffic_dir: Optional[str] = None
+
+    # mongo_uri sale de ROUTES_MONGO_DB: base propia del servicio de rutas,
+    # distinta de la del backend de Node (ver mongo_documents)
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "ContainerSettings":
+        return cls(
+            mongo_uri=environ.get(MONGO_URI_ENV) or None,
+            dispatch_shards=environ.get(DISPATCH_SHARDS_ENV) or None,
+            snapshot_dir=environ.get(SNAPSHOT_DIR_ENV) or None,
+            travel_time_dir=environ.get(TRAVEL_TIME_DIR_ENV) or None,
+            traffic_dir=environ.get(TRAFFIC_DIR_ENV) or None
+        )
+
+
+class AppContainer:
+    # Raíz de composición de la aplicación. Nada se construye al importar:
+    # cada componente se arma la primera vez que alguien lo pide (un request
+    # o warm_up) y queda compartido. Los componentes se pueden inyectar ya
+    # construidos por nombre (pruebas, benchmarks).
+
+    def __init__(self, settings: ContainerSettings = None, metrics_registry: MetricsRegistry = None, **components):
+        self.settings = settings or ContainerSettings()
+        self.metrics_registry = metrics_registry or MetricsRegistry()
+        self._components = dict(components)
+        # Reentrante: construir un componente pide los que necesita
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._hooks: List[Callable[["AppContainer"], None]] = []
+        self._warm_up_thread = None
+        self.warm_up_seconds = None
+        self.warm_up_error = None
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "AppContainer":
+        return cls(ContainerSettings.from_env(), **kwargs)
+
+    @property
+    def emergency_repository(self):
+        return self._component("emergency_repository")
+
+    @property
+    def vehicle_repository(self):
+        return self._component("vehicle_repository")
+
+    @property
+    def route_optimizer(self):
+        return self._component("route_optimizer")
+
+    @property
+    def route_service(self):
+        return self._component("route_service")
+
+    @property
+    def position_ingestion(self):
+        return self._component("position_ingestion")
+
+    @property
+    def dispatch_scheduler(self):
+        return self._component("dispatch_scheduler")
+
+    def built(self) -> List[str]:
+        return sorted(self._components)
+
+    def on_warm_up(self, hook: Callable[["AppContainer"], None]) -> None:
+        # Se ejecuta al final de warm_up, antes de marcar la aplicación como lista
+        self._hooks.append(hook)
+
+    def warm_up(self) -> None:
+        start = perf_counter()
+        for name in WARM_UP_COMPONENTS:
+            self._component(name)
+        route_service = self.route_service
+        if hasattr(route_service, "start"):
+            # Despacho por regiones: lanzar los procesos ahora y no en el primer request
+            route_service.start()
+        # Una consulta de prueba toca los índices y las páginas mapeadas
+        self.vehicle_repository.nearest_available(Location(latitude=0.0, longitude=0.0), k=1)
+        for hook in self._hooks:
+            hook(self)
+        self.warm_up_seconds = perf_counter() - start
+        self._ready.set()
+
+    def start_warm_up(self) -> threading.Thread:
+        # warm_up en segundo plano: el servidor acepta conexiones mientras tanto
+        # y /ready responde 503 hasta que termina
+        with self._lock:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self._run_warm_up, name="warm-up", daemon=True)
+                self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def readiness(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warm_up_seconds": self.warm_up_seconds,
+            "error": None if self.warm_up_error is None else str(self.warm_up_error),
+            "components": self.built()
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            components = dict(self._components)
+        for name in ("dispatch_scheduler", "position_ingestion"):
+            if name in components:
+                components[name].stop()
+        route_service = components.get("route_service")
+        if hasattr(route_service, "close"):
+            route_service.close()
+
+    def _run_warm_up(self) -> None:
+        try:
+            self.warm_up()
+        except Exception as e:
+            self.warm_up_error = e
+
+    def _component(self, name: str):
+        try:
+            return self._components[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._components:
+                self._components[name] = getattr(self, f"_build_{name}")()
+            return self._components[name]
+
+    # Constructores: los imports van adentro para que solo se cargue lo que
+    # la configuración usa (pymongo, tablas de tiempos, etc.)
+
+    def _build_snapshot(self):
+        from adapters.secondary.snapshot import load_snapshot
+        return load_snapshot(self.settings.snapshot_dir)
+
+    def _build_mongo_database(self):
+        from adapters.secondary.mongo_repository import get_mongo_database
+        return get_mongo_database(self.settings.mongo_uri)
+
+    def _build_base_emergency_repository(self):
+        if self.settings.mongo_uri:
+            from adapters.secondary.mongo_repository import MongoEmergencyRepository
+            repository = MongoEmergencyRepository(self._component("mongo_database"))
+            repository.ensure_indexes()
+            return repository
+        if self.settings.snapshot_dir:
+            from adapters.secondary.columnar_repository import ColumnarEmergencyRepository
+            return ColumnarEmergencyRepository(self._component("snapshot")[1])
+        return InMemoryEmergencyRepository()
+
+    def _build_base_vehicle_repository(self):
+        if self.settings.mongo_uri:
+            from adapters.secondary.mongo_repository import MongoVehicleRepository
+            repository = MongoVehicleRepository(self._component("mongo_database"))
+            repository.ensure_indexes()
+            return repository
+        if self.settings.snapshot_dir:
+            from adapters.secondary.columnar_repository import ColumnarVehicleRepository
+            return ColumnarVehicleRepository(self._component("snapshot")[0])
+        return InMemoryVehicleRepository()
+
+    def _build_emergency_repository(self):
+        return InstrumentedEmergencyRepository(self._component("base_emergency_repository"), self.metrics_registry)
+
+    def _build_vehicle_repository(self):
+        if self.settings.dispatch_shards:
+            # La flota vive en los procesos de cada región
+            return InstrumentedVehicleRepository(self.route_service.vehicle_repository, self.metrics_registry)
+        return InstrumentedVehicleRepository(self._component("base_vehicle_repository"), self.metrics_registry)
+
+    def _build_traffic(self):
+        if not self.settings.traffic_dir:
+            return None
+        from adapters.secondary.historical_traffic import HistoricalTrafficService
+        return HistoricalTrafficService.from_directory(self.settings.traffic_dir)
+
+    def _build_route_optimizer(self):
+        if self.settings.travel_time_dir:
+            from adapters.secondary.travel_time_optimizer import TravelTimeRouteOptimizer
+            optimizer = TravelTimeRouteOptimizer.from_directory(self.settings.travel_time_dir)
+        else:
+            from adapters.secondary.numpy_route_optimizer import NumpyRouteOptimizer
+            optimizer = NumpyRouteOptimizer(self._component("traffic"))
+        return InstrumentedRouteOptimizer(optimizer, self.metrics_registry)
+
+    def _build_route_service(self):
+        if self.settings.dispatch_shards:
+            from services.sharded_dispatch import ShardedRouteService
+            return ShardedRouteService.from_spec(
+                self.emergency_repository,
+                self._component("base_vehicle_repository").get_available_vehicles(),
+                self.settings.dispatch_shards
+            )
+        from services.route_service import RouteService
+        return RouteService(self.emergency_repository, self.vehicle_repository, self.route_optimizer)
+
+    def _build_position_ingestion(self):
+        from services.position_ingestion import PositionIngestion
+        ingestion = PositionIngestion(self.vehicle_repository)
+        ingestion.start()
+        return ingestion
+
+    def _build_dispatch_scheduler(self):
+        from services.dispatch_scheduler import DispatchScheduler
+        scheduler = DispatchScheduler(self.route_service)
+        scheduler.start()
+        return scheduler
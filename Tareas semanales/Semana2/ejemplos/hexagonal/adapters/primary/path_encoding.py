@@ -0,0 +1,89 @@
+from typing import List, Sequence
+import numpy as np
+import shapely
+from domain.entities import Location
+
+# Representaciones compactas de Route.path para las respuestas HTTP:
+#   points   -> [{"lat", "lng"}, ...] (la forma original)
+#   delta    -> enteros escalados por 10**precision, como diferencias con el punto anterior
+#   polyline -> el formato de texto de Google (los mismos deltas en base64 de 5 bits)
+
+PATH_ENCODINGS = ("points", "delta", "polyline")
+DEFAULT_PRECISION = 5
+MAX_PRECISION = 7
+METERS_PER_DEGREE = 111_320.0
+
+def path_coordinates(path: Sequence[Location]) -> np.ndarray:
+    # Matriz (n, 2) de [lat, lng] sin pasar por listas intermedias
+    coordinates = np.fromiter(
+        (value for location in path for value in (location.latitude, location.longitude)),
+        dtype=np.float64,
+        count=2 * len(path)
+    )
+    return coordinates.reshape(-1, 2)
+
+def simplify_coordinates(coordinates: np.ndarray, tolerance_m: float) -> np.ndarray:
+    # Douglas-Peucker de shapely; la tolerancia en metros se pasa a grados
+    # (aproximación suficiente para rutas dentro de una ciudad)
+    if tolerance_m <= 0 or len(coordinates) < 3:
+        return coordinates
+    line = shapely.linestrings(coordinates)
+    simplified = shapely.simplify(line, tolerance_m / METERS_PER_DEGREE, preserve_topology=False)
+    return shapely.get_coordinates(simplified)
+
+def delta_encode(coordinates: np.ndarray, precision: int = DEFAULT_PRECISION) -> np.ndarray:
+    # Enteros escalados y diferenciados: el primer punto va completo
+    scaled = np.rint(coordinates * 10 ** precision).astype(np.int64)
+    return np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+
+def delta_decode(deltas, precision: int = DEFAULT_PRECISION) -> np.ndarray:
+    return np.cumsum(np.asarray(deltas, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision
+
+def encode_polyline(coordinates: np.ndarray, precision: int = DEFAULT_PRECISION) -> str:
+    # Algoritmo de polyline de Google vectorizado: zigzag de cada delta,
+    # grupos de 5 bits con bit de continuación y desplazamiento a ASCII 63
+    values = delta_encode(coordinates, precision).ravel()
+    if len(values) == 0:
+        return ""
+    zigzag = ((values << 1) ^ (values >> 63)).astype(np.uint64)
+    # Solo tantas columnas como grupos necesite el valor más grande (los
+    # deltas de una ruta suelen caber en 3 o 4)
+    width = max(1, -(-int(zigzag.max()).bit_length() // 5))
+    shifts = np.arange(width, dtype=np.uint64) * np.uint64(5)
+    chunks = (zigzag[:, None] >> shifts[None, :]) & np.uint64(0x1F)
+    # Cantidad de grupos por valor: hasta el último con bits, mínimo uno
+    lengths = width - np.argmax((chunks != 0)[:, ::-1], axis=1)
+    lengths[zigzag == 0] = 1
+    position = np.arange(width)[None, :]
+    chunks = chunks | np.where(position < (lengths[:, None] - 1), 0x20, 0).astype(np.uint64)
+    characters = (chunks + np.uint64(63))[position < lengths[:, None]]
+    return characters.astype(np.uint8).tobytes().decode("ascii")
+
+def decode_polyline(text: str, precision: int = DEFAULT_PRECISION) -> List[Location]:
+    values = []
+    current = shift = 0
+    for character in text.encode("ascii"):
+        chunk = character - 63
+        current |= (chunk & 0x1F) << shift
+        shift += 5
+        if chunk < 0x20:
+            values.append(~(current >> 1) if current & 1 else current >> 1)
+            current = shift = 0
+    return [Location(latitude=lat, longitude=lng) for lat, lng in delta_decode(values, precision).tolist()]
+
+def encode_path(path: Sequence[Location], encoding: str = "points", precision: int = DEFAULT_PRECISION,
+                simplify_m: float = 0.0):
+    if encoding not in PATH_ENCODINGS:
+        raise ValueError(f"Unknown path encoding '{encoding}', expected one of {', '.join(PATH_ENCODINGS)}")
+    if not 0 <= precision <= MAX_PRECISION:
+        raise ValueError(f"Precision must be between 0 and {MAX_PRECISION}")
+
+    if encoding == "points" and simplify_m <= 0:
+        return [{"lat": loc.latitude, "lng": loc.longitude} for loc in path]
+    coordinates = simplify_coordinates(path_coordinates(path), simplify_m)
+    if encoding == "points":
+        return [{"lat": lat, "lng": lng} for lat, lng in coordinates.tolist()]
+    if encoding == "delta":
+        deltas = delta_encode(coordinates, precision)
+        return {"lat": deltas[:, 0].tolist(), "lng": deltas[:, 1].tolist()}
+    return encode_polyline(coordinates, precision)
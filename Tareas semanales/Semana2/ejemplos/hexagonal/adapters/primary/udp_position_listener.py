@@ -0,0 +1,66 @@
+import socket
+import threading
+from typing import List
+from domain.entities import PositionUpdate
+from services.position_ingestion import PositionIngestion
+
+def parse_position_lines(data: bytes) -> List[PositionUpdate]:
+    # Un ping por línea: "vehicle_id,lat,lng,timestamp". Las líneas mal
+    # formadas se ignoran (UDP no tiene a quién responderle el error).
+    updates = []
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        parts = line.split(",")
+        if len(parts) != 4:
+            continue
+        try:
+            updates.append(PositionUpdate(parts[0].strip(), float(parts[1]), float(parts[2]), float(parts[3])))
+        except ValueError:
+            continue
+    return updates
+
+
+class UdpPositionListener:
+    # Recibe datagramas con pings GPS y los entrega a PositionIngestion.
+    # El hilo solo parsea: la aplicación al repositorio ocurre en el tick.
+
+    def __init__(self, ingestion: PositionIngestion, host: str = "0.0.0.0", port: int = 9999,
+                 buffer_size: int = 65535):
+        self.ingestion = ingestion
+        self.host = host
+        self.port = port
+        self.buffer_size = buffer_size
+        self.datagrams = 0
+        self._socket = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Búfer de recepción grande para absorber ráfagas entre lecturas
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self._socket.bind((self.host, self.port))
+        self._socket.settimeout(0.5)
+        self.port = self._socket.getsockname()[1]
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="udp-position-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._socket.close()
+        self._socket = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                data, _ = self._socket.recvfrom(self.buffer_size)
+            except socket.timeout:
+                continue
+            self.datagrams += 1
+            self.ingestion.submit(parse_position_lines(data))
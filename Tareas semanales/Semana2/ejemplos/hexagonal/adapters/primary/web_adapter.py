@@ -1,81 +1,275 @@
-from flask import Blueprint, request, jsonify
-from services.route_service import RouteService
-from adapters.secondary.emergency_repository import InMemoryEmergencyRepository
-from adapters.secondary.emergency_repository import InMemoryVehicleRepository
-from adapters.secondary.route_optimizer import SimpleRouteOptimizer
+import json
+import math
+from time import perf_counter
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from adapters.primary.container import AppContainer
+from adapters.primary.path_encoding import DEFAULT_PRECISION, MAX_PRECISION, PATH_ENCODINGS, encode_path
+from domain.entities import PositionUpdate
 
-# Crear instancias de los adaptadores
-emergency_repository = InMemoryEmergencyRepository()
-vehicle_repository = InMemoryVehicleRepository()
-route_optimizer = SimpleRouteOptimizer()
+# Los adaptadores y servicios viven en el AppContainer de la aplicación
+# (create_app lo guarda en app.extensions) y se construyen en el primer uso
+def _container() -> AppContainer:
+    return current_app.extensions["container"]
 
-# Crear servicio
-route_service = RouteService(emergency_repository, vehicle_repository, route_optimizer)
+# Tope de espera de POST /dispatch: un request no retiene un hilo del servidor más que esto
+MAX_DISPATCH_WAIT_SECONDS = 30.0
 
 # Crear blueprint de Flask
 emergency_bp = Blueprint('emergency', __name__, url_prefix='/api/emergency')
 
 @emergency_bp.route('/routes/<emergency_id>', methods=['GET'])
 def get_route_for_emergency(emergency_id):
+    # ?encoding=points|delta|polyline&precision=5&simplify=<metros>
+    container = _container()
+    encoding = request.args.get("encoding", "points")
     try:
-        route = route_service.get_optimal_route_for_emergency(emergency_id)
+        precision = int(request.args.get("precision", DEFAULT_PRECISION))
+        simplify_m = float(request.args.get("simplify", 0))
+        if encoding not in PATH_ENCODINGS or not 0 <= precision <= MAX_PRECISION:
+            raise ValueError(f"expected encoding in {', '.join(PATH_ENCODINGS)} and precision 0-{MAX_PRECISION}")
+    except ValueError as e:
         return jsonify({
-            "success": True,
-            "route": {
+            "success": False,
+            "error": f"Invalid path parameters: {e}"
+        }), 400
+    
+    try:
+        route = container.route_service.get_optimal_route_for_emergency(emergency_id)
+        with container.metrics_registry.timer("web_adapter", "serialize_route"):
+            serialized = {
                 "vehicle_id": route.vehicle.id,
                 "emergency_id": route.emergency.id,
                 "estimated_time": route.estimated_time,
                 "distance": route.distance,
-                "path": [{"lat": loc.latitude, "lng": loc.longitude} for loc in route.path]
+                "path": encode_path(route.path, encoding, precision, simplify_m)
             }
-        })
+            if encoding != "points":
+                serialized["path_encoding"] = encoding
+                serialized["precision"] = precision
+            return jsonify({
+                "success": True,
+                "route": serialized
+            })
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 404
 
+# ?stream=ndjson (una línea JSON por emergencia) o ?stream=sse (Server-Sent Events)
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+def _serialize_result(result: dict) -> dict:
+    if "route" in result:
+        route = result["route"]
+        return {
+            "emergency_id": result["emergency"].id,
+            "vehicle_id": route.vehicle.id,
+            "estimated_time": route.estimated_time,
+            "distance": route.distance
+        }
+    return {
+        "emergency_id": result["emergency"].id,
+        "error": result["error"]
+    }
+
 @emergency_bp.route('/routes', methods=['GET'])
 def get_all_routes():
+    # ?mode=batch resuelve todas las emergencias con una asignación global
+    container = _container()
+    batch = request.args.get('mode') == 'batch'
+    stream = request.args.get('stream')
+    if stream in STREAM_FORMATS:
+        return _stream_routes(batch, stream)
+    
     try:
-        results = route_service.get_all_active_emergencies_with_routes()
-        
-        response_data = []
-        for result in results:
-            if "route" in result:
-                route = result["route"]
-                response_data.append({
-                    "emergency_id": result["emergency"].id,
-                    "vehicle_id": route.vehicle.id,
-                    "estimated_time": route.estimated_time,
-                    "distance": route.distance
-                })
-            else:
-                response_data.append({
-                    "emergency_id": result["emergency"].id,
-                    "error": result["error"]
-                })
+        results = container.route_service.get_all_active_emergencies_with_routes(batch=batch)
         
-        return jsonify({
-            "success": True,
-            "routes": response_data
-        })
+        with container.metrics_registry.timer("web_adapter", "serialize_routes"):
+            return jsonify({
+                "success": True,
+                "routes": [_serialize_result(result) for result in results]
+            })
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
+def _stream_routes(batch: bool, stream: str) -> Response:
+    # Cada emergencia se envía apenas tiene ruta; no se acumula la respuesta
+    container = _container()
+    histogram = container.metrics_registry.histogram("web_adapter", "serialize_route_line")
+    
+    def encode(event: str, data: dict) -> str:
+        payload = json.dumps(data)
+        if stream == "sse":
+            return f"event: {event}\ndata: {payload}\n\n"
+        return payload + "\n"
+    
+    def generate():
+        try:
+            for result in container.route_service.iter_active_emergencies_with_routes(batch=batch):
+                start = perf_counter()
+                line = encode("route", _serialize_result(result))
+                histogram.observe(perf_counter() - start)
+                yield line
+        except Exception as e:
+            yield encode("error", {"success": False, "error": str(e)})
+            return
+        if stream == "sse":
+            yield encode("end", {"success": True})
+    
+    response = Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[stream])
+    # Evitar que proxies o caches acumulen la respuesta antes de enviarla
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 @emergency_bp.route('/vehicles/available', methods=['GET'])
 def get_available_vehicles():
+    container = _container()
     vehicle_type = request.args.get('type')
-    vehicles = vehicle_repository.get_available_vehicles(vehicle_type)
+    vehicles = container.vehicle_repository.get_available_vehicles(vehicle_type)
+    
+    with container.metrics_registry.timer("web_adapter", "serialize_vehicles"):
+        return jsonify({
+            "success": True,
+            "vehicles": [{
+                "id": v.id,
+                "type": v.type,
+                "location": {"lat": v.current_location.latitude, "lng": v.current_location.longitude}
+            } for v in vehicles]
+        })
+
+def _parse_positions(payload) -> list:
+    # Acepta {"positions": [...]} o la lista directa. Cada ping puede ser un
+    # objeto {"vehicle_id", "lat", "lng", "timestamp"} o la forma compacta
+    # [vehicle_id, lat, lng, timestamp].
+    if isinstance(payload, dict):
+        payload = payload.get("positions")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a list of positions")
+    
+    updates = []
+    for item in payload:
+        if isinstance(item, dict):
+            item = (item["vehicle_id"], item["lat"], item["lng"], item["timestamp"])
+        vehicle_id, lat, lng, timestamp = item
+        updates.append(PositionUpdate(str(vehicle_id), float(lat), float(lng), float(timestamp)))
+    return updates
+
+@emergency_bp.route('/vehicles/positions', methods=['POST'])
+def post_vehicle_positions():
+    container = _container()
+    try:
+        updates = _parse_positions(request.get_json(force=True))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "error": f"Invalid positions payload: {e}"
+        }), 400
     
+    # Se encolan para el próximo tick; 202 porque todavía no se aplicaron
+    accepted = container.position_ingestion.submit(updates)
     return jsonify({
         "success": True,
-        "vehicles": [{
-            "id": v.id,
-            "type": v.type,
-            "location": {"lat": v.current_location.latitude, "lng": v.current_location.longitude}
-        } for v in vehicles]
-    })
\ No newline at end of file
+        "received": len(updates),
+        "accepted": accepted
+    }), 202
+
+def _dispatch_wait(value) -> float:
+    if value is None:
+        return 0.0
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        wait = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("'wait' must be a number of seconds")
+    if not math.isfinite(wait) or not 0 <= wait <= MAX_DISPATCH_WAIT_SECONDS:
+        raise ValueError(f"'wait' must be between 0 and {MAX_DISPATCH_WAIT_SECONDS:g} seconds")
+    return wait
+
+@emergency_bp.route('/dispatch', methods=['POST'])
+def post_dispatch():
+    # {"emergency_ids": [...], "wait": segundos}. Sin wait responde 202 apenas
+    # encola; con wait espera los resultados hasta ese tiempo
+    container = _container()
+    payload = request.get_json(force=True, silent=True) or {}
+    emergency_ids = payload.get("emergency_ids")
+    if not isinstance(emergency_ids, list):
+        return jsonify({
+            "success": False,
+            "error": "Expected a list of emergency_ids"
+        }), 400
+    # Se valida antes de encolar: un wait inválido no debe dejar despachos a medias
+    try:
+        wait = _dispatch_wait(payload.get("wait"))
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    
+    queued, unknown = [], []
+    for emergency_id in emergency_ids:
+        emergency = container.emergency_repository.get_emergency_by_id(str(emergency_id))
+        if emergency is None:
+            unknown.append(emergency_id)
+        else:
+            queued.append(container.dispatch_scheduler.submit(emergency))
+    
+    if wait == 0:
+        return jsonify({
+            "success": True,
+            "queued": len(queued),
+            "unknown": unknown,
+            "queue_depth": container.dispatch_scheduler.pending()
+        }), 202
+    
+    deadline = perf_counter() + wait
+    results = []
+    for future in queued:
+        try:
+            results.append(_serialize_result(future.result(timeout=max(deadline - perf_counter(), 0))))
+        except TimeoutError:
+            results.append(None)
+    return jsonify({
+        "success": True,
+        "results": results,
+        "unknown": unknown
+    })
+
+@emergency_bp.route('/dispatch/<emergency_id>', methods=['GET'])
+def get_dispatch_status(emergency_id):
+    # Para quien recibió 202: estado actual y, si su unidad fue desplazada
+    # por una llamada crítica, cuál perdió (la nueva llega al re-despacharla)
+    container = _container()
+    status = container.dispatch_scheduler.status(emergency_id)
+    if status is None:
+        return jsonify({
+            "success": False,
+            "error": f"Emergency {emergency_id} is not known to the dispatcher"
+        }), 404
+    if "result" in status:
+        status["result"] = _serialize_result(status["result"])
+    return jsonify({"success": True, "emergency_id": emergency_id, **status})
+
+@emergency_bp.route('/dispatch/<emergency_id>/complete', methods=['POST'])
+def complete_dispatch(emergency_id):
+    container = _container()
+    if not container.dispatch_scheduler.complete(emergency_id):
+        return jsonify({
+            "success": False,
+            "error": f"No dispatch in progress for emergency {emergency_id}"
+        }), 404
+    return jsonify({"success": True})
+
+@emergency_bp.route('/dispatch/stats', methods=['GET'])
+def get_dispatch_stats():
+    container = _container()
+    return jsonify(container.dispatch_scheduler.stats())
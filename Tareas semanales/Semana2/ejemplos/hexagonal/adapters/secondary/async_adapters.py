@@ -0,0 +1,80 @@
+import asyncio
+from typing import List, Optional
+from domain.async_ports import (
+    AsyncEmergencyRepositoryPort, AsyncMapServicePort, AsyncRouteOptimizerPort, AsyncVehicleRepositoryPort
+)
+from domain.ports import EmergencyRepositoryPort, MapServicePort, RouteOptimizerPort, VehicleRepositoryPort
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate, Route
+
+# Adaptadores que exponen un puerto síncrono como su contraparte async.
+# Con offload=True la llamada corre en el pool de hilos por defecto del loop
+# (para adaptadores que hacen I/O bloqueante); con offload=False se llama
+# directo (adaptadores en memoria o CPU-bound muy rápidos).
+
+async def _call(offload: bool, function, *args, **kwargs):
+    if offload:
+        return await asyncio.to_thread(function, *args, **kwargs)
+    return function(*args, **kwargs)
+
+
+class SyncEmergencyRepositoryAdapter(AsyncEmergencyRepositoryPort):
+    def __init__(self, repository: EmergencyRepositoryPort, offload: bool = True):
+        self.repository = repository
+        self.offload = offload
+
+    async def get_active_emergencies(self) -> List[Emergency]:
+        return await _call(self.offload, self.repository.get_active_emergencies)
+
+    async def get_emergency_by_id(self, emergency_id: str) -> Emergency:
+        return await _call(self.offload, self.repository.get_emergency_by_id, emergency_id)
+
+
+class SyncVehicleRepositoryAdapter(AsyncVehicleRepositoryPort):
+    def __init__(self, repository: VehicleRepositoryPort, offload: bool = True):
+        self.repository = repository
+        self.offload = offload
+
+    async def get_available_vehicles(self, vehicle_type: str = None) -> List[EmergencyVehicle]:
+        return await _call(self.offload, self.repository.get_available_vehicles, vehicle_type)
+
+    async def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        return await _call(self.offload, self.repository.update_vehicle_status, vehicle_id, available)
+
+    async def try_reserve(self, vehicle_id: str) -> bool:
+        return await _call(self.offload, self.repository.try_reserve, vehicle_id)
+
+    async def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        return await _call(self.offload, self.repository.update_vehicle_location, vehicle_id, location)
+
+    async def nearest_available(self, location: Location, vehicle_type: str = None, k: int = 1,
+                                max_radius_km: Optional[float] = None) -> List[EmergencyVehicle]:
+        return await _call(
+            self.offload, self.repository.nearest_available, location, vehicle_type, k, max_radius_km
+        )
+
+    async def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        return await _call(self.offload, self.repository.update_vehicle_positions, updates)
+
+
+class SyncRouteOptimizerAdapter(AsyncRouteOptimizerPort):
+    def __init__(self, optimizer: RouteOptimizerPort, offload: bool = False):
+        self.optimizer = optimizer
+        self.offload = offload
+
+    async def find_optimal_route(self, emergency: Emergency, available_vehicles: List[EmergencyVehicle]) -> Route:
+        return await _call(self.offload, self.optimizer.find_optimal_route, emergency, available_vehicles)
+
+    async def distance_matrix(self, emergencies: List[Emergency], vehicles: List[EmergencyVehicle]):
+        return await _call(self.offload, self.optimizer.distance_matrix, emergencies, vehicles)
+
+
+class SyncMapServiceAdapter(AsyncMapServicePort):
+    def __init__(self, map_service: MapServicePort, offload: bool = True):
+        self.map_service = map_service
+        self.offload = offload
+
+    async def get_route(self, start: Location, end: Location) -> Route:
+        return await _call(self.offload, self.map_service.get_route, start, end)
+
+    async def get_traffic_data(self, location: Location) -> float:
+        return await _call(self.offload, self.map_service.get_traffic_data, location)
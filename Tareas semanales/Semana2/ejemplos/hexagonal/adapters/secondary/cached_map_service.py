@@ -0,0 +1,140 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Set, Tuple
+from domain.ports import MapServicePort
+from domain.entities import Location, Route
+from adapters.secondary.spatial_index import KM_PER_DEGREE
+
+Cell = Tuple[int, int]
+
+class CachedMapService(MapServicePort):
+    # Decorador de cualquier MapServicePort: cachea rutas por par de celdas
+    # (origen, destino) con TTL y desalojo LRU. El TTL debería coincidir con
+    # la frecuencia con que se refrescan los datos de tráfico.
+
+    def __init__(
+        self,
+        map_service: MapServicePort,
+        cell_size_km: float = 0.25,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 10_000,
+        traffic_tolerance: float = 0.05,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.map_service = map_service
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.traffic_tolerance = traffic_tolerance
+        self._cell_lat = cell_size_km / KM_PER_DEGREE
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[Cell, Cell], Tuple[float, Route]]" = OrderedDict()
+        self._keys_by_cell: Dict[Cell, Set[Tuple[Cell, Cell]]] = {}
+        self._traffic: Dict[Cell, float] = {}
+        # Suben con cada invalidación (por celda y global): una ruta que se
+        # empezó a calcular antes no se guarda
+        self._cell_generations: Dict[Cell, int] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_route(self, start: Location, end: Location) -> Route:
+        key = (self.cell_of(start), self.cell_of(end))
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generations(key)
+
+        # La ruta se calcula fuera del lock para no bloquear otras consultas
+        route = self.map_service.get_route(start, end)
+
+        with self._lock:
+            if self._generations(key) != generation:
+                # El tráfico de alguna de las celdas cambió mientras se calculaba
+                return route
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (now + self.ttl_seconds, route)
+            for cell in key:
+                self._keys_by_cell.setdefault(cell, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return route
+
+    def get_traffic_data(self, location: Location) -> float:
+        value = self.map_service.get_traffic_data(location)
+        cell = self.cell_of(location)
+        with self._lock:
+            previous = self._traffic.get(cell)
+            self._traffic[cell] = value
+        if previous is not None and abs(value - previous) > self.traffic_tolerance * max(abs(previous), 1e-9):
+            # El tráfico de la celda cambió: las rutas que salen o llegan ahí ya no sirven
+            self.invalidate_cell(cell)
+        return value
+
+    def invalidate_cell(self, cell: Cell) -> int:
+        with self._lock:
+            self._cell_generations[cell] = self._cell_generations.get(cell, 0) + 1
+            keys = list(self._keys_by_cell.get(cell, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_location(self, location: Location) -> int:
+        return self.invalidate_cell(self.cell_of(location))
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_cell.clear()
+
+    def cell_of(self, location: Location) -> Cell:
+        row = math.floor(location.latitude / self._cell_lat)
+        # Ancho en longitud ajustado a la latitud de la fila para celdas ~cuadradas
+        row_lat = (row + 0.5) * self._cell_lat
+        cell_lon = self._cell_lat / max(math.cos(math.radians(row_lat)), 0.01)
+        return (row, math.floor(location.longitude / cell_lon))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _generations(self, key: Tuple[Cell, Cell]) -> Tuple[int, int, int]:
+        # Requiere tener el lock tomado
+        return (self._generation, self._cell_generations.get(key[0], 0), self._cell_generations.get(key[1], 0))
+
+    def _remove(self, key: Tuple[Cell, Cell]) -> None:
+        # Requiere tener el lock tomado
+        self._entries.pop(key, None)
+        for cell in key:
+            keys = self._keys_by_cell.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_cell[cell]
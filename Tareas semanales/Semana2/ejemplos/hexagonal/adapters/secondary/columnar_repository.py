@@ -0,0 +1,120 @@
+import threading
+from typing import List, Optional
+import numpy as np
+from domain.ports import EmergencyRepositoryPort, VehicleRepositoryPort
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate
+from adapters.secondary.columnar_store import EmergencyStore, FleetStore
+from adapters.secondary.geo import haversine_np
+
+class VehicleBatch(list):
+    # Lista de vehículos que además lleva sus coordenadas como arreglos,
+    # para que los optimizadores vectorizados no tengan que reconstruirlas
+    __slots__ = ("latitudes", "longitudes")
+
+    def __init__(self, vehicles, latitudes: np.ndarray, longitudes: np.ndarray):
+        super().__init__(vehicles)
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+
+
+class ColumnarVehicleRepository(VehicleRepositoryPort):
+    def __init__(self, store: FleetStore = None, lock_stripes: int = 64):
+        self.store = store if store is not None else FleetStore()
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
+        self._positions_lock = threading.Lock()
+
+    def add_vehicle(self, vehicle: EmergencyVehicle) -> None:
+        self.store.add(vehicle)
+
+    def get_available_vehicles(self, vehicle_type: str = None):
+        return self._batch(self.store.available_rows(vehicle_type))
+
+    def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        row = self.store.row_of(vehicle_id)
+        if row is None:
+            return False
+        with self._stripes[row % len(self._stripes)]:
+            self.store.set_available(row, available)
+        return True
+
+    def try_reserve(self, vehicle_id: str) -> bool:
+        row = self.store.row_of(vehicle_id)
+        if row is None:
+            return False
+        with self._stripes[row % len(self._stripes)]:
+            if not self.store.availability[row]:
+                return False
+            self.store.set_available(row, False)
+        return True
+
+    def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        row = self.store.row_of(vehicle_id)
+        if row is None:
+            return False
+        self.store.set_location(row, location.latitude, location.longitude, location.address)
+        return True
+
+    def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        # Todo vectorizado: filas, descarte de pings atrasados y, si un
+        # vehículo aparece varias veces en el lote, solo el más reciente
+        if not updates:
+            return 0
+        count = len(updates)
+        rows = self.store.rows_of([update.vehicle_id for update in updates])
+        latitudes = np.fromiter((update.latitude for update in updates), dtype=np.float64, count=count)
+        longitudes = np.fromiter((update.longitude for update in updates), dtype=np.float64, count=count)
+        timestamps = np.fromiter((update.timestamp for update in updates), dtype=np.float64, count=count)
+
+        with self._positions_lock:
+            keep = rows >= 0
+            keep[keep] = timestamps[keep] > self.store.position_timestamps[rows[keep]]
+            candidates = np.flatnonzero(keep)
+            if len(candidates) == 0:
+                return 0
+            # Orden por (fila, timestamp): el último de cada fila es el más nuevo
+            order = candidates[np.lexsort((timestamps[candidates], rows[candidates]))]
+            last = np.append(rows[order][1:] != rows[order][:-1], True)
+            chosen = order[last]
+            self.store.set_positions(rows[chosen], latitudes[chosen], longitudes[chosen], timestamps[chosen])
+        return len(chosen)
+
+    def nearest_available(self, location: Location, vehicle_type: str = None, k: int = 1,
+                          max_radius_km: Optional[float] = None) -> List[EmergencyVehicle]:
+        rows = self.store.available_rows(vehicle_type)
+        if len(rows) == 0 or k <= 0:
+            return []
+
+        distances = haversine_np(
+            self.store.latitudes[rows], self.store.longitudes[rows], location.latitude, location.longitude
+        )
+        if max_radius_km is not None:
+            inside = distances <= max_radius_km
+            rows, distances = rows[inside], distances[inside]
+        if len(rows) > k:
+            # Selección parcial O(n) antes de ordenar solo los k mejores
+            top = np.argpartition(distances, k - 1)[:k]
+            rows, distances = rows[top], distances[top]
+        return self._batch(rows[np.argsort(distances, kind="stable")])
+
+    def _batch(self, rows: np.ndarray) -> VehicleBatch:
+        store = self.store
+        return VehicleBatch(
+            [store.to_entity(int(row)) for row in rows],
+            store.latitudes[rows],
+            store.longitudes[rows]
+        )
+
+
+class ColumnarEmergencyRepository(EmergencyRepositoryPort):
+    def __init__(self, store: EmergencyStore = None):
+        self.store = store if store is not None else EmergencyStore()
+
+    def add_emergency(self, emergency: Emergency) -> None:
+        self.store.add(emergency)
+
+    def get_active_emergencies(self):
+        return [self.store.to_entity(row) for row in range(len(self.store))]
+
+    def get_emergency_by_id(self, emergency_id: str):
+        row = self.store.row_of(emergency_id)
+        return None if row is None else self.store.to_entity(row)
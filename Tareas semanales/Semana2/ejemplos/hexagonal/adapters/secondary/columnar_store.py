@@ -0,0 +1,286 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from domain.entities import Emergency, EmergencyVehicle, Location
+
+class TypeCodes:
+    # Traduce nombres de tipo (ambulance, fire, ...) a códigos enteros pequeños
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.names.append(name)
+            self._codes[name] = code
+        return code
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self._codes.get(name)
+
+    def name(self, code: int) -> str:
+        return self.names[code]
+
+
+class _ColumnarStore:
+    # Columnas en arreglos NumPy que crecen por duplicación, más un índice
+    # id -> fila. Las propiedades devuelven vistas sin copia de [:size].
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._capacity = max(capacity, 1)
+        self._lat = np.empty(self._capacity, dtype=np.float64)
+        self._lon = np.empty(self._capacity, dtype=np.float64)
+        self._type = np.empty(self._capacity, dtype=np.int16)
+        self._ids: List[str] = []
+        self._addresses: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self._lat[:self._size]
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self._lon[:self._size]
+
+    @property
+    def type_codes(self) -> np.ndarray:
+        return self._type[:self._size]
+
+    @property
+    def ids(self) -> List[str]:
+        return self._ids
+
+    def row_of(self, item_id: str) -> Optional[int]:
+        return self._rows.get(item_id)
+
+    def rows_of(self, item_ids: Sequence[str]) -> np.ndarray:
+        # Filas de varios ids; -1 para los desconocidos
+        rows = self._rows
+        return np.fromiter((rows.get(item_id, -1) for item_id in item_ids), dtype=np.int64, count=len(item_ids))
+
+    def set_location(self, row: int, latitude: float, longitude: float, address: str = None) -> None:
+        self._lat[row] = latitude
+        self._lon[row] = longitude
+        if address is not None:
+            self._addresses[row] = address
+
+    def _columns(self) -> List[str]:
+        return ["_lat", "_lon", "_type"]
+
+    def _reserve(self, extra: int) -> int:
+        # Asegura espacio para `extra` filas y devuelve la primera fila libre
+        needed = self._size + extra
+        if needed > self._capacity:
+            capacity = self._capacity
+            while capacity < needed:
+                capacity *= 2
+            for name in self._columns():
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                setattr(self, name, grown)
+            self._capacity = capacity
+        return self._size
+
+    def _register(self, item_ids: Sequence[str], addresses: Sequence[str]) -> None:
+        # Se valida el lote entero antes de tocar el índice: un id repetido
+        # (contra el store o dentro del lote) no deja filas a medio registrar
+        seen = set()
+        for item_id in item_ids:
+            if item_id in self._rows or item_id in seen:
+                raise ValueError(f"Duplicated id {item_id}")
+            seen.add(item_id)
+        start = self._size
+        for offset, item_id in enumerate(item_ids):
+            self._rows[item_id] = start + offset
+        self._ids.extend(item_ids)
+        self._addresses.extend(addresses)
+        self._size += len(item_ids)
+
+
+class VehicleView:
+    # Vista liviana sobre una fila del FleetStore (no copia datos)
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "FleetStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._store._ids[self._row]
+
+    @property
+    def type(self) -> str:
+        return self._store.vehicle_types.name(int(self._store._type[self._row]))
+
+    @property
+    def available(self) -> bool:
+        return bool(self._store._available[self._row])
+
+    @property
+    def latitude(self) -> float:
+        return float(self._store._lat[self._row])
+
+    @property
+    def longitude(self) -> float:
+        return float(self._store._lon[self._row])
+
+    @property
+    def current_location(self) -> Location:
+        return Location(latitude=self.latitude, longitude=self.longitude, address=self._store._addresses[self._row])
+
+
+class FleetStore(_ColumnarStore):
+    def __init__(self, capacity: int = 1024, vehicle_types: TypeCodes = None):
+        super().__init__(capacity)
+        self._available = np.empty(self._capacity, dtype=bool)
+        self._position_ts = np.empty(self._capacity, dtype=np.float64)
+        self.vehicle_types = vehicle_types or TypeCodes(("ambulance", "fire_truck", "police_car"))
+
+    @property
+    def availability(self) -> np.ndarray:
+        return self._available[:self._size]
+
+    @property
+    def position_timestamps(self) -> np.ndarray:
+        return self._position_ts[:self._size]
+
+    def _columns(self) -> List[str]:
+        return super()._columns() + ["_available", "_position_ts"]
+
+    def add(self, vehicle: EmergencyVehicle) -> int:
+        row = self._reserve(1)
+        location = vehicle.current_location
+        self._lat[row] = location.latitude
+        self._lon[row] = location.longitude
+        self._type[row] = self.vehicle_types.code(vehicle.type)
+        self._available[row] = vehicle.available
+        self._position_ts[row] = -np.inf
+        self._register([vehicle.id], [location.address])
+        return row
+
+    def add_many(self, ids: Sequence[str], latitudes, longitudes, types: Sequence[str], available=True) -> None:
+        # Carga masiva sin crear objetos por vehículo
+        count = len(ids)
+        start = self._reserve(count)
+        end = start + count
+        self._lat[start:end] = latitudes
+        self._lon[start:end] = longitudes
+        self._type[start:end] = [self.vehicle_types.code(name) for name in types]
+        self._available[start:end] = available
+        self._position_ts[start:end] = -np.inf
+        self._register(list(ids), [""] * count)
+
+    def set_positions(self, rows: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray,
+                      timestamps: np.ndarray) -> None:
+        # Escritura vectorizada de posiciones GPS (filas sin repetir)
+        self._lat[rows] = latitudes
+        self._lon[rows] = longitudes
+        self._position_ts[rows] = timestamps
+        addresses = self._addresses
+        for row in rows.tolist():
+            addresses[row] = ""
+
+    def set_available(self, row: int, available: bool) -> None:
+        self._available[row] = available
+
+    def available_rows(self, vehicle_type: str = None) -> np.ndarray:
+        mask = self.availability
+        if vehicle_type is not None:
+            code = self.vehicle_types.lookup(vehicle_type)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask = mask & (self.type_codes == code)
+        return np.flatnonzero(mask)
+
+    def view(self, row: int) -> VehicleView:
+        return VehicleView(self, row)
+
+    def to_entity(self, row: int) -> EmergencyVehicle:
+        return EmergencyVehicle(
+            id=self._ids[row],
+            current_location=Location(
+                latitude=float(self._lat[row]), longitude=float(self._lon[row]), address=self._addresses[row]
+            ),
+            type=self.vehicle_types.name(int(self._type[row])),
+            available=bool(self._available[row])
+        )
+
+
+class EmergencyView:
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "EmergencyStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._store._ids[self._row]
+
+    @property
+    def emergency_type(self) -> str:
+        return self._store.emergency_types.name(int(self._store._type[self._row]))
+
+    @property
+    def priority(self) -> int:
+        return int(self._store._priority[self._row])
+
+    @property
+    def location(self) -> Location:
+        return Location(
+            latitude=float(self._store._lat[self._row]),
+            longitude=float(self._store._lon[self._row]),
+            address=self._store._addresses[self._row]
+        )
+
+
+class EmergencyStore(_ColumnarStore):
+    def __init__(self, capacity: int = 1024, emergency_types: TypeCodes = None):
+        super().__init__(capacity)
+        self._priority = np.empty(self._capacity, dtype=np.int8)
+        self._descriptions: List[str] = []
+        self.emergency_types = emergency_types or TypeCodes(("medical", "fire", "crime"))
+
+    @property
+    def priorities(self) -> np.ndarray:
+        return self._priority[:self._size]
+
+    def _columns(self) -> List[str]:
+        return super()._columns() + ["_priority"]
+
+    def add(self, emergency: Emergency) -> int:
+        row = self._reserve(1)
+        self._lat[row] = emergency.location.latitude
+        self._lon[row] = emergency.location.longitude
+        self._type[row] = self.emergency_types.code(emergency.emergency_type)
+        self._priority[row] = emergency.priority
+        self._register([emergency.id], [emergency.location.address])
+        self._descriptions.append(emergency.description)
+        return row
+
+    def view(self, row: int) -> EmergencyView:
+        return EmergencyView(self, row)
+
+    def to_entity(self, row: int) -> Emergency:
+        return Emergency(
+            id=self._ids[row],
+            location=Location(
+                latitude=float(self._lat[row]), longitude=float(self._lon[row]), address=self._addresses[row]
+            ),
+            emergency_type=self.emergency_types.name(int(self._type[row])),
+            priority=int(self._priority[row]),
+            description=self._descriptions[row]
+        )
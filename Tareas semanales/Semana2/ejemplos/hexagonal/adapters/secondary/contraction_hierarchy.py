@@ -0,0 +1,231 @@
+import heapq
+import math
+from typing import Dict, List, Tuple
+import numpy as np
+from adapters.secondary.road_graph import RoadGraph
+
+class ContractionHierarchy:
+    # Preprocesamiento opcional sobre un RoadGraph: se contraen los nodos en
+    # orden de importancia agregando atajos, y las consultas son un Dijkstra
+    # bidireccional que solo sube en la jerarquía (pocos nodos visitados).
+
+    def __init__(self, graph: RoadGraph, rank: np.ndarray, arc_tail: np.ndarray, arc_head: np.ndarray,
+                 arc_weight: np.ndarray, arc_middle: np.ndarray, arc_edge: np.ndarray):
+        self.graph = graph
+        self.rank = np.asarray(rank, dtype=np.int32)
+        self.arc_tail = np.asarray(arc_tail, dtype=np.int32)
+        self.arc_head = np.asarray(arc_head, dtype=np.int32)
+        self.arc_weight = np.asarray(arc_weight, dtype=np.float64)
+        # arc_middle >= 0 indica un atajo; si no, arc_edge es la arista original
+        self.arc_middle = np.asarray(arc_middle, dtype=np.int32)
+        self.arc_edge = np.asarray(arc_edge, dtype=np.int32)
+        self._arc_lookup = None
+
+        node_count = graph.node_count
+        upward = self.rank[self.arc_head] > self.rank[self.arc_tail]
+        # Grafo hacia arriba desde el origen (arcos que suben)
+        self.up_arcs, self.up_indptr = self._csr(np.flatnonzero(upward), self.arc_tail, node_count)
+        # Grafo hacia arriba desde el destino (arcos que bajan, indexados por la cabeza)
+        self.down_arcs, self.down_indptr = self._csr(np.flatnonzero(~upward), self.arc_head, node_count)
+
+    @staticmethod
+    def _csr(arcs: np.ndarray, key: np.ndarray, node_count: int):
+        arcs = arcs[np.argsort(key[arcs], kind="stable")].astype(np.int32)
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(key[arcs], minlength=node_count), out=indptr[1:])
+        return arcs, indptr
+
+    @classmethod
+    def build(cls, graph: RoadGraph, witness_settle_limit: int = 60) -> "ContractionHierarchy":
+        node_count = graph.node_count
+        # Arcos vigentes: out_arcs[u][v] = (peso, nodo_intermedio, arista_original)
+        out_arcs: List[Dict[int, Tuple[float, int, int]]] = [dict() for _ in range(node_count)]
+        in_arcs: List[Dict[int, Tuple[float, int, int]]] = [dict() for _ in range(node_count)]
+        for edge, (tail, head, weight) in enumerate(zip(
+            graph.edge_tail.tolist(), graph.indices.tolist(), graph.weights.tolist()
+        )):
+            if tail == head:
+                continue
+            current = out_arcs[tail].get(head)
+            if current is None or weight < current[0]:
+                out_arcs[tail][head] = (weight, -1, edge)
+                in_arcs[head][tail] = (weight, -1, edge)
+
+        all_arcs = {}
+        for tail in range(node_count):
+            for head, arc in out_arcs[tail].items():
+                all_arcs[(tail, head)] = arc
+
+        contracted = [False] * node_count
+        deleted_neighbours = [0] * node_count
+        rank = np.zeros(node_count, dtype=np.int32)
+
+        def witness_distance(source, target_limit, excluded):
+            # Dijkstra local limitado que ignora el nodo que se contrae
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            while heap and settled < witness_settle_limit:
+                distance, node = heapq.heappop(heap)
+                if distance > dist.get(node, math.inf):
+                    continue
+                if distance > target_limit:
+                    break
+                settled += 1
+                for head, (weight, _, _) in out_arcs[node].items():
+                    if head == excluded or contracted[head]:
+                        continue
+                    candidate = distance + weight
+                    if candidate < dist.get(head, math.inf):
+                        dist[head] = candidate
+                        heapq.heappush(heap, (candidate, head))
+            return dist
+
+        def shortcuts_for(node):
+            shortcuts = []
+            incoming = [(u, arc[0]) for u, arc in in_arcs[node].items() if not contracted[u]]
+            outgoing = [(w, arc[0]) for w, arc in out_arcs[node].items() if not contracted[w]]
+            if not incoming or not outgoing:
+                return shortcuts
+            max_out = max(weight for _, weight in outgoing)
+            for tail, in_weight in incoming:
+                dist = witness_distance(tail, in_weight + max_out, node)
+                for head, out_weight in outgoing:
+                    if head == tail:
+                        continue
+                    via = in_weight + out_weight
+                    if dist.get(head, math.inf) > via:
+                        shortcuts.append((tail, head, via))
+            return shortcuts
+
+        def importance(node):
+            degree = sum(1 for u in in_arcs[node] if not contracted[u]) + \
+                sum(1 for w in out_arcs[node] if not contracted[w])
+            return len(shortcuts_for(node)) - degree + deleted_neighbours[node]
+
+        queue = [(importance(node), node) for node in range(node_count)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            if contracted[node]:
+                continue
+            # Actualización perezosa: si su prioridad empeoró, vuelve a la cola
+            priority = importance(node)
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, node))
+                continue
+
+            for tail, head, weight in shortcuts_for(node):
+                current = out_arcs[tail].get(head)
+                if current is None or weight < current[0]:
+                    arc = (weight, node, -1)
+                    out_arcs[tail][head] = arc
+                    in_arcs[head][tail] = arc
+                    all_arcs[(tail, head)] = arc
+
+            contracted[node] = True
+            rank[node] = order
+            order += 1
+            for neighbour in set(in_arcs[node]) | set(out_arcs[node]):
+                deleted_neighbours[neighbour] += 1
+
+        tails = np.fromiter((key[0] for key in all_arcs), dtype=np.int32, count=len(all_arcs))
+        heads = np.fromiter((key[1] for key in all_arcs), dtype=np.int32, count=len(all_arcs))
+        values = np.array(list(all_arcs.values()), dtype=np.float64).reshape(-1, 3)
+        return cls(graph, rank, tails, heads, values[:, 0], values[:, 1], values[:, 2])
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path, rank=self.rank, arc_tail=self.arc_tail, arc_head=self.arc_head,
+            arc_weight=self.arc_weight, arc_middle=self.arc_middle, arc_edge=self.arc_edge
+        )
+
+    @classmethod
+    def load(cls, graph: RoadGraph, path: str) -> "ContractionHierarchy":
+        data = np.load(path)
+        return cls(graph, data["rank"], data["arc_tail"], data["arc_head"],
+                   data["arc_weight"], data["arc_middle"], data["arc_edge"])
+
+    def shortest_path(self, source: int, target: int) -> Tuple[float, List[int]]:
+        # Devuelve (segundos, aristas originales del camino)
+        cost, arcs = self._query(source, target)
+        edges = []
+        for arc in arcs:
+            self._unpack(int(self.arc_tail[arc]), int(self.arc_head[arc]), edges)
+        return cost, edges
+
+    def travel_time(self, source: int, target: int) -> float:
+        return self._query(source, target)[0]
+
+    def _query(self, source: int, target: int) -> Tuple[float, List[int]]:
+        if source == target:
+            return 0.0, []
+
+        searches = (
+            (self.up_indptr, self.up_arcs, self.arc_head, {source: 0.0}, {source: -1}, [(0.0, source)]),
+            (self.down_indptr, self.down_arcs, self.arc_tail, {target: 0.0}, {target: -1}, [(0.0, target)])
+        )
+        arc_weight = self.arc_weight
+        best = math.inf
+        meeting = -1
+        side = 0
+        while True:
+            active = [index for index, search in enumerate(searches) if search[5] and search[5][0][0] < best]
+            if not active:
+                break
+            side = active[0] if len(active) == 1 else 1 - side
+            indptr, arcs, heads, dist, parent, heap = searches[side]
+            other_dist = searches[1 - side][3]
+
+            distance, node = heapq.heappop(heap)
+            if distance > dist[node]:
+                continue
+            if node in other_dist and distance + other_dist[node] < best:
+                best = distance + other_dist[node]
+                meeting = node
+            for arc in arcs[indptr[node]:indptr[node + 1]].tolist():
+                head = int(heads[arc])
+                candidate = distance + float(arc_weight[arc])
+                if candidate < dist.get(head, math.inf):
+                    dist[head] = candidate
+                    parent[head] = arc
+                    heapq.heappush(heap, (candidate, head))
+
+        if meeting < 0:
+            raise ValueError(f"No route between nodes {source} and {target}")
+
+        arcs_path = []
+        node = meeting
+        parent_f = searches[0][4]
+        while parent_f[node] >= 0:
+            arc = parent_f[node]
+            arcs_path.append(arc)
+            node = int(self.arc_tail[arc])
+        arcs_path.reverse()
+        node = meeting
+        parent_b = searches[1][4]
+        while parent_b[node] >= 0:
+            arc = parent_b[node]
+            arcs_path.append(arc)
+            node = int(self.arc_head[arc])
+        return best, arcs_path
+
+    def _unpack(self, tail: int, head: int, edges: List[int]) -> None:
+        # Expande un atajo recursivamente hasta las aristas originales
+        if self._arc_lookup is None:
+            self._arc_lookup = {
+                (t, h): (m, e) for t, h, m, e in zip(
+                    self.arc_tail.tolist(), self.arc_head.tolist(),
+                    self.arc_middle.tolist(), self.arc_edge.tolist()
+                )
+            }
+        stack = [(tail, head)]
+        while stack:
+            tail, head = stack.pop()
+            middle, edge = self._arc_lookup[(tail, head)]
+            if middle < 0:
+                edges.append(edge)
+            else:
+                stack.append((middle, head))
+                stack.append((tail, middle))
@@ -1,27 +1,206 @@
-from domain.ports import EmergencyRepositoryPort
-from domain.entities import Emergency, Location
+import math
+import threading
+from typing import Dict, List, Optional
+from domain.ports import EmergencyRepositoryPort, VehicleRepositoryPort
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate
+from adapters.secondary.spatial_index import GridSpatialIndex
 
 class InMemoryEmergencyRepository(EmergencyRepositoryPort):
-    def __init__(self):
-        self.emergencies = {
-            "emergency_1": Emergency(
-                id="emergency_1",
-                location=Location(latitude=40.7128, longitude=-74.0060, address="123 Main St"),
-                emergency_type="medical",
-                priority=1,
-                description="Heart attack patient"
-            ),
-            "emergency_2": Emergency(
-                id="emergency_2",
-                location=Location(latitude=40.7138, longitude=-74.0070, address="456 Oak Ave"),
-                emergency_type="fire",
-                priority=2,
-                description="Small kitchen fire"
-            )
-        }
+    def __init__(self, emergencies: List[Emergency] = None):
+        if emergencies is None:
+            emergencies = [
+                Emergency(
+                    id="emergency_1",
+                    location=Location(latitude=40.7128, longitude=-74.0060, address="123 Main St"),
+                    emergency_type="medical",
+                    priority=1,
+                    description="Heart attack patient"
+                ),
+                Emergency(
+                    id="emergency_2",
+                    location=Location(latitude=40.7138, longitude=-74.0070, address="456 Oak Ave"),
+                    emergency_type="fire",
+                    priority=2,
+                    description="Small kitchen fire"
+                )
+            ]
+        
+        self.emergencies = {emergency.id: emergency for emergency in emergencies}
     
     def get_active_emergencies(self):
         return list(self.emergencies.values())
     
     def get_emergency_by_id(self, emergency_id: str):
-        return self.emergencies.get(emergency_id)
\ No newline at end of file
+        return self.emergencies.get(emergency_id)
+
+class InMemoryVehicleRepository(VehicleRepositoryPort):
+    # Mantiene un índice espacial por tipo de vehículo con solo las unidades
+    # disponibles, de modo que nearest_available no recorre toda la flota.
+
+    def __init__(self, vehicles: List[EmergencyVehicle] = None, cell_size_km: float = 1.0, lock_stripes: int = 64):
+        if vehicles is None:
+            vehicles = [
+                EmergencyVehicle(
+                    id="ambulance_1",
+                    current_location=Location(latitude=40.7150, longitude=-74.0080, address="Hospital Central"),
+                    type="ambulance"
+                ),
+                EmergencyVehicle(
+                    id="ambulance_2",
+                    current_location=Location(latitude=40.7060, longitude=-74.0090, address="Base Sur"),
+                    type="ambulance"
+                ),
+                EmergencyVehicle(
+                    id="fire_truck_1",
+                    current_location=Location(latitude=40.7180, longitude=-74.0020, address="Estación de Bomberos 1"),
+                    type="fire_truck"
+                ),
+                EmergencyVehicle(
+                    id="police_car_1",
+                    current_location=Location(latitude=40.7100, longitude=-74.0100, address="Comisaría 5"),
+                    type="police_car"
+                )
+            ]
+
+        self.cell_size_km = cell_size_km
+        self.vehicles = {vehicle.id: vehicle for vehicle in vehicles}
+        # Locks por franja (striped locking): despachos sobre vehículos
+        # distintos casi nunca compiten por el mismo lock
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
+        self._indexes: Dict[str, GridSpatialIndex] = {}
+        self._index_locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        # Último timestamp GPS aplicado por vehículo (descarta pings atrasados)
+        self._position_times: Dict[str, float] = {}
+        self._positions_lock = threading.Lock()
+        for vehicle in self.vehicles.values():
+            if vehicle.available:
+                self._index_for(vehicle.type).insert(
+                    vehicle.id, vehicle.current_location.latitude, vehicle.current_location.longitude
+                )
+
+    def add_vehicle(self, vehicle: EmergencyVehicle) -> None:
+        self.vehicles[vehicle.id] = vehicle
+        if vehicle.available:
+            index = self._index_for(vehicle.type)
+            with self._index_locks[vehicle.type]:
+                index.insert(vehicle.id, vehicle.current_location.latitude, vehicle.current_location.longitude)
+
+    def remove_vehicle(self, vehicle_id: str) -> Optional[EmergencyVehicle]:
+        # Saca el vehículo del repositorio (p. ej. al pasar a otra región)
+        vehicle = self.vehicles.get(vehicle_id)
+        if vehicle is None:
+            return None
+        with self._stripe(vehicle_id):
+            del self.vehicles[vehicle_id]
+            if vehicle.available:
+                index = self._index_for(vehicle.type)
+                with self._index_locks[vehicle.type]:
+                    index.remove(vehicle_id)
+        with self._positions_lock:
+            self._position_times.pop(vehicle_id, None)
+        return vehicle
+
+    def get_available_vehicles(self, vehicle_type: str = None):
+        return [
+            vehicle for vehicle in list(self.vehicles.values())
+            if vehicle.available and (vehicle_type is None or vehicle.type == vehicle_type)
+        ]
+
+    def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        vehicle = self.vehicles.get(vehicle_id)
+        if not vehicle:
+            return False
+
+        with self._stripe(vehicle_id):
+            self._set_available(vehicle, available)
+        return True
+
+    def try_reserve(self, vehicle_id: str) -> bool:
+        vehicle = self.vehicles.get(vehicle_id)
+        if not vehicle:
+            return False
+
+        with self._stripe(vehicle_id):
+            if not vehicle.available:
+                return False
+            self._set_available(vehicle, False)
+        return True
+
+    def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        vehicle = self.vehicles.get(vehicle_id)
+        if not vehicle:
+            return False
+
+        with self._stripe(vehicle_id):
+            vehicle.current_location = location
+            if vehicle.available:
+                index = self._index_for(vehicle.type)
+                with self._index_locks[vehicle.type]:
+                    index.move(vehicle.id, location.latitude, location.longitude)
+        return True
+
+    def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        # Una pasada: se actualizan las entidades y luego cada índice por
+        # tipo con un solo lock. La disponibilidad se relee bajo el lock del
+        # índice, así un try_reserve concurrente no vuelve a quedar indexado.
+        moves: Dict[str, list] = {}
+        applied = 0
+        with self._positions_lock:
+            times = self._position_times
+            for update in updates:
+                vehicle = self.vehicles.get(update.vehicle_id)
+                if vehicle is None or update.timestamp <= times.get(update.vehicle_id, -math.inf):
+                    continue
+                times[update.vehicle_id] = update.timestamp
+                vehicle.current_location = Location(latitude=update.latitude, longitude=update.longitude)
+                moves.setdefault(vehicle.type, []).append(vehicle)
+                applied += 1
+
+            for vehicle_type, vehicles in moves.items():
+                index = self._index_for(vehicle_type)
+                with self._index_locks[vehicle_type]:
+                    for vehicle in vehicles:
+                        if vehicle.available:
+                            location = vehicle.current_location
+                            index.move(vehicle.id, location.latitude, location.longitude)
+        return applied
+
+    def nearest_available(self, location: Location, vehicle_type: str = None, k: int = 1,
+                          max_radius_km: Optional[float] = None) -> List[EmergencyVehicle]:
+        if vehicle_type is not None:
+            types = [vehicle_type] if vehicle_type in self._indexes else []
+        else:
+            types = list(self._indexes)
+
+        # Cada índice entrega sus k mejores; se mezclan por distancia
+        candidates = []
+        for name in types:
+            with self._index_locks[name]:
+                candidates.extend(self._indexes[name].nearest(location.latitude, location.longitude, k, max_radius_km))
+        candidates.sort(key=lambda candidate: candidate[1])
+        return [self.vehicles[vehicle_id] for vehicle_id, _ in candidates[:k]]
+
+    def _set_available(self, vehicle: EmergencyVehicle, available: bool) -> None:
+        # Requiere el lock de franja del vehículo (orden: franja -> índice)
+        vehicle.available = available
+        index = self._index_for(vehicle.type)
+        with self._index_locks[vehicle.type]:
+            if available:
+                index.insert(vehicle.id, vehicle.current_location.latitude, vehicle.current_location.longitude)
+            else:
+                index.remove(vehicle.id)
+
+    def _stripe(self, vehicle_id: str) -> threading.Lock:
+        return self._stripes[hash(vehicle_id) % len(self._stripes)]
+
+    def _index_for(self, vehicle_type: str) -> GridSpatialIndex:
+        index = self._indexes.get(vehicle_type)
+        if index is None:
+            with self._registry_lock:
+                index = self._indexes.get(vehicle_type)
+                if index is None:
+                    index = GridSpatialIndex(self.cell_size_km)
+                    self._index_locks[vehicle_type] = threading.Lock()
+                    self._indexes[vehicle_type] = index
+        return index
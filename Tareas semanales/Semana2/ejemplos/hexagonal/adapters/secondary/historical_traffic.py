@@ -0,0 +1,144 @@
+import csv
+import json
+import os
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Sequence
+import numpy as np
+from domain.ports import MapServicePort
+from domain.entities import Location, Route
+from adapters.secondary.travel_time_table import TravelTimeGrid
+
+# Perfiles históricos de velocidad por celda y franja del día. El archivo
+# speed_factors.npy tiene forma (franjas, celdas): 1.0 es flujo libre, 0.5
+# la mitad de la velocidad. Se abre con mmap y solo la franja actual se
+# copia a memoria.
+
+META_FILE = "traffic_meta.json"
+FACTORS_FILE = "speed_factors.npy"
+FORMAT_VERSION = 1
+MINUTES_PER_DAY = 24 * 60
+
+def _check_bucket_minutes(bucket_minutes: int) -> None:
+    # Las franjas tienen que cubrir el día exacto: si no, los últimos minutos
+    # caen en una franja que la tabla no tiene
+    if bucket_minutes <= 0 or MINUTES_PER_DAY % bucket_minutes != 0:
+        raise ValueError(f"bucket_minutes must divide {MINUTES_PER_DAY}, got {bucket_minutes}")
+
+def build_speed_profiles(
+    observations_csv: str,
+    directory: str,
+    grid: TravelTimeGrid,
+    bucket_minutes: int = 15,
+    min_samples: int = 3
+) -> None:
+    # Agrega observaciones (latitude, longitude, minute_of_day, speed_factor)
+    # en promedios por celda y franja; con pocas muestras queda 1.0
+    _check_bucket_minutes(bucket_minutes)
+    with open(observations_csv, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    columns = [header.index(name) for name in ("latitude", "longitude", "minute_of_day", "speed_factor")]
+    data = np.loadtxt(observations_csv, delimiter=",", skiprows=1, usecols=columns, ndmin=2)
+
+    buckets = MINUTES_PER_DAY // bucket_minutes
+    cells = grid.cell_index(data[:, 0], data[:, 1])
+    bucket = (data[:, 2].astype(np.int64) % MINUTES_PER_DAY) // bucket_minutes
+    inside = cells >= 0
+    slot = bucket[inside] * grid.cell_count + cells[inside]
+    size = buckets * grid.cell_count
+    counts = np.bincount(slot, minlength=size)
+    sums = np.bincount(slot, weights=data[inside, 3], minlength=size)
+    factors = np.where(counts >= min_samples, sums / np.maximum(counts, 1), 1.0)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, FACTORS_FILE), factors.reshape(buckets, grid.cell_count).astype(np.float32))
+    meta = {"version": FORMAT_VERSION, "grid": asdict(grid), "bucket_minutes": bucket_minutes}
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+class HistoricalTrafficService(MapServicePort):
+    # Implementa get_traffic_data con perfiles históricos: el mismo lugar a
+    # la misma hora siempre da el mismo factor. Las rutas se delegan a otro
+    # MapServicePort si se configura uno.
+
+    def __init__(
+        self,
+        grid: TravelTimeGrid,
+        factors: np.ndarray,
+        bucket_minutes: int,
+        map_service: MapServicePort = None,
+        default_factor: float = 1.0,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        _check_bucket_minutes(bucket_minutes)
+        if factors.shape != (MINUTES_PER_DAY // bucket_minutes, grid.cell_count):
+            raise ValueError(f"Speed factor table has shape {factors.shape}, expected buckets x {grid.cell_count}")
+        self.grid = grid
+        self.bucket_minutes = bucket_minutes
+        self.map_service = map_service
+        self.default_factor = default_factor
+        self._factors = factors
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (franja, factores en memoria): se reemplaza entero al cambiar de franja
+        self._current = (-1, None)
+        self.refreshes = 0
+        self.changed_cells = 0
+
+    @classmethod
+    def from_directory(cls, directory: str, **kwargs) -> "HistoricalTrafficService":
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported traffic profile version: {meta.get('version')}")
+        factors = np.load(os.path.join(directory, FACTORS_FILE), mmap_mode="r")
+        return cls(TravelTimeGrid(**meta["grid"]), factors, meta["bucket_minutes"], **kwargs)
+
+    def get_route(self, start: Location, end: Location) -> Route:
+        if self.map_service is None:
+            raise ValueError("No map service configured for routes")
+        return self.map_service.get_route(start, end)
+
+    def get_traffic_data(self, location: Location) -> float:
+        return float(self.speed_factors([location.latitude], [location.longitude])[0])
+
+    def speed_factors(self, latitudes, longitudes, when: datetime = None) -> np.ndarray:
+        # Factores de velocidad para muchos puntos en una sola consulta
+        factors = self._current_factors() if when is None else self._factors_at(when)
+        cells = self.grid.cell_index(latitudes, longitudes)
+        return np.where(cells >= 0, factors[np.maximum(cells, 0)], self.default_factor)
+
+    def mean_speed_factor(self, path: Sequence[Location], when: datetime = None) -> float:
+        latitudes = [location.latitude for location in path]
+        longitudes = [location.longitude for location in path]
+        return float(self.speed_factors(latitudes, longitudes, when).mean())
+
+    def bucket_of(self, when: datetime) -> int:
+        return (when.hour * 60 + when.minute) // self.bucket_minutes
+
+    def _factors_at(self, when: datetime) -> np.ndarray:
+        bucket = self.bucket_of(when)
+        current_bucket, factors = self._current
+        if bucket == current_bucket:
+            return factors
+        # Consultas de otra hora (p. ej. planificación) no reemplazan la franja en caché
+        return np.asarray(self._factors[bucket], dtype=np.float64)
+
+    def _current_factors(self) -> np.ndarray:
+        bucket = self.bucket_of(self._clock())
+        current_bucket, factors = self._current
+        if bucket == current_bucket:
+            return factors
+
+        with self._lock:
+            current_bucket, previous = self._current
+            if bucket != current_bucket:
+                # Al cambiar de franja solo se lee su fila del archivo mapeado
+                factors = np.array(self._factors[bucket], dtype=np.float64)
+                if previous is not None:
+                    self.changed_cells = int(np.count_nonzero(factors != previous))
+                self._current = (bucket, factors)
+                self.refreshes += 1
+            return self._current[1]
@@ -0,0 +1,105 @@
+from time import perf_counter
+from typing import List, Optional
+from domain.ports import EmergencyRepositoryPort, MapServicePort, RouteOptimizerPort, VehicleRepositoryPort
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate, Route
+from services.metrics import LatencyHistogram, MetricsRegistry
+
+# Decoradores de los puertos que registran llamadas, latencia y errores en
+# un MetricsRegistry. Los histogramas se resuelven al construir el wrapper
+# para que cada llamada solo pague dos perf_counter y un observe().
+
+def _timed(histogram: LatencyHistogram, function, *args):
+    start = perf_counter()
+    try:
+        result = function(*args)
+    except BaseException:
+        histogram.observe(perf_counter() - start, error=True)
+        raise
+    histogram.observe(perf_counter() - start)
+    return result
+
+
+class _Instrumented:
+    def __init__(self, wrapped, registry: MetricsRegistry, port: str, methods):
+        self.wrapped = wrapped
+        self._histograms = {method: registry.histogram(port, method) for method in methods}
+
+    def __getattr__(self, name):
+        # Métodos propios del adaptador (add_vehicle, etc.) pasan sin medir
+        if name == "wrapped":
+            raise AttributeError(name)
+        return getattr(self.wrapped, name)
+
+
+class InstrumentedEmergencyRepository(_Instrumented, EmergencyRepositoryPort):
+    def __init__(self, repository: EmergencyRepositoryPort, registry: MetricsRegistry,
+                 port: str = "emergency_repository"):
+        super().__init__(repository, registry, port, ("get_active_emergencies", "get_emergency_by_id"))
+        self._active = self._histograms["get_active_emergencies"]
+        self._by_id = self._histograms["get_emergency_by_id"]
+
+    def get_active_emergencies(self) -> List[Emergency]:
+        return _timed(self._active, self.wrapped.get_active_emergencies)
+
+    def get_emergency_by_id(self, emergency_id: str) -> Emergency:
+        return _timed(self._by_id, self.wrapped.get_emergency_by_id, emergency_id)
+
+
+class InstrumentedVehicleRepository(_Instrumented, VehicleRepositoryPort):
+    def __init__(self, repository: VehicleRepositoryPort, registry: MetricsRegistry,
+                 port: str = "vehicle_repository"):
+        super().__init__(repository, registry, port, (
+            "get_available_vehicles", "update_vehicle_status", "try_reserve",
+            "update_vehicle_location", "nearest_available", "update_vehicle_positions"
+        ))
+        self._available = self._histograms["get_available_vehicles"]
+        self._status = self._histograms["update_vehicle_status"]
+        self._reserve = self._histograms["try_reserve"]
+        self._location = self._histograms["update_vehicle_location"]
+        self._nearest = self._histograms["nearest_available"]
+        self._positions = self._histograms["update_vehicle_positions"]
+
+    def get_available_vehicles(self, vehicle_type: str = None) -> List[EmergencyVehicle]:
+        return _timed(self._available, self.wrapped.get_available_vehicles, vehicle_type)
+
+    def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        return _timed(self._status, self.wrapped.update_vehicle_status, vehicle_id, available)
+
+    def try_reserve(self, vehicle_id: str) -> bool:
+        return _timed(self._reserve, self.wrapped.try_reserve, vehicle_id)
+
+    def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        return _timed(self._location, self.wrapped.update_vehicle_location, vehicle_id, location)
+
+    def nearest_available(self, location: Location, vehicle_type: str = None, k: int = 1,
+                          max_radius_km: Optional[float] = None) -> List[EmergencyVehicle]:
+        return _timed(self._nearest, self.wrapped.nearest_available, location, vehicle_type, k, max_radius_km)
+
+    def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        return _timed(self._positions, self.wrapped.update_vehicle_positions, updates)
+
+
+class InstrumentedRouteOptimizer(_Instrumented, RouteOptimizerPort):
+    def __init__(self, optimizer: RouteOptimizerPort, registry: MetricsRegistry, port: str = "route_optimizer"):
+        super().__init__(optimizer, registry, port, ("find_optimal_route", "distance_matrix"))
+        self._route = self._histograms["find_optimal_route"]
+        self._matrix = self._histograms["distance_matrix"]
+
+    def find_optimal_route(self, emergency: Emergency, available_vehicles: List[EmergencyVehicle]) -> Route:
+        return _timed(self._route, self.wrapped.find_optimal_route, emergency, available_vehicles)
+
+    def distance_matrix(self, emergencies: List[Emergency], vehicles: List[EmergencyVehicle]):
+        return _timed(self._matrix, self.wrapped.distance_matrix, emergencies, vehicles)
+
+
+class InstrumentedMapService(_Instrumented, MapServicePort):
+    def __init__(self, map_service: MapServicePort, registry: MetricsRegistry, port: str = "map_service"):
+        super().__init__(map_service, registry, port, ("get_route", "get_traffic_data"))
+        self._route = self._histograms["get_route"]
+        self._traffic = self._histograms["get_traffic_data"]
+
+    def get_route(self, start: Location, end: Location) -> Route:
+        return _timed(self._route, self.wrapped.get_route, start, end)
+
+    def get_traffic_data(self, location: Location) -> float:
+        return _timed(self._traffic, self.wrapped.get_traffic_data, location)
@@ -0,0 +1,108 @@
+from typing import Tuple
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate
+
+# Mapeo entre documentos de MongoDB y entidades del dominio, compartido por
+# los adaptadores de pymongo y motor. Las ubicaciones se guardan como
+# GeoJSON Point ([lng, lat]) para poder usar índices 2dsphere.
+
+# Variable de entorno y base de datos propias del servicio de rutas. NO es
+# la base del backend de Node (MONGO_DB / emergency_tracker): ese guarda la
+# colección `incidents` con type/severity y la ubicación como texto libre,
+# sin coordenadas, así que no se puede rutear sin geocodificar. Las
+# emergencias se cargan acá ya geolocalizadas (emergency_type/priority).
+MONGO_URI_ENV = "ROUTES_MONGO_DB"
+DEFAULT_DATABASE = "emergency_routes"
+EMERGENCIES_COLLECTION = "emergencies"
+VEHICLES_COLLECTION = "vehicles"
+
+# Se reutiliza el vocabulario de estados del backend de Node (activo,
+# en camino, resuelto) para que los dos servicios hablen igual
+ACTIVE_STATUSES = ["activo", "en camino"]
+
+EMERGENCY_PROJECTION = {"location": 1, "address": 1, "emergency_type": 1, "priority": 1, "description": 1}
+VEHICLE_PROJECTION = {"location": 1, "address": 1, "type": 1, "available": 1}
+
+def location_to_geojson(location: Location) -> dict:
+    return {"type": "Point", "coordinates": [location.longitude, location.latitude]}
+
+def location_from_document(doc: dict) -> Location:
+    longitude, latitude = doc["location"]["coordinates"]
+    return Location(latitude=latitude, longitude=longitude, address=doc.get("address", ""))
+
+def emergency_to_document(emergency: Emergency, status: str = "activo") -> dict:
+    return {
+        "_id": emergency.id,
+        "location": location_to_geojson(emergency.location),
+        "address": emergency.location.address,
+        "emergency_type": emergency.emergency_type,
+        "priority": emergency.priority,
+        "description": emergency.description,
+        "status": status
+    }
+
+def emergency_from_document(doc: dict) -> Emergency:
+    return Emergency(
+        id=str(doc["_id"]),
+        location=location_from_document(doc),
+        emergency_type=doc["emergency_type"],
+        priority=doc.get("priority", 5),
+        description=doc.get("description", "")
+    )
+
+def vehicle_to_document(vehicle: EmergencyVehicle) -> dict:
+    return {
+        "_id": vehicle.id,
+        "location": location_to_geojson(vehicle.current_location),
+        "address": vehicle.current_location.address,
+        "type": vehicle.type,
+        "available": vehicle.available
+    }
+
+def vehicle_from_document(doc: dict) -> EmergencyVehicle:
+    return EmergencyVehicle(
+        id=str(doc["_id"]),
+        current_location=location_from_document(doc),
+        type=doc["type"],
+        available=doc.get("available", True)
+    )
+
+def available_query(vehicle_type: str = None) -> dict:
+    query = {"available": True}
+    if vehicle_type is not None:
+        query["type"] = vehicle_type
+    return query
+
+def near_query(location: Location, vehicle_type: str = None, max_radius_km: float = None) -> dict:
+    near = {"$geometry": location_to_geojson(location)}
+    if max_radius_km is not None:
+        near["$maxDistance"] = max_radius_km * 1000
+    query = available_query(vehicle_type)
+    query["location"] = {"$near": near}
+    return query
+
+def geo_near_pipeline(location: Location, vehicle_type: str = None, k: int = 1,
+                      max_radius_km: float = None) -> list:
+    # Igual que near_query pero con $geoNear, que además devuelve la distancia (km)
+    geo_near = {
+        "near": location_to_geojson(location),
+        "key": "location",
+        "distanceField": "distance_km",
+        "distanceMultiplier": 0.001,
+        "spherical": True,
+        "query": available_query(vehicle_type)
+    }
+    if max_radius_km is not None:
+        geo_near["maxDistance"] = max_radius_km * 1000
+    return [{"$geoNear": geo_near}, {"$limit": k}, {"$project": {**VEHICLE_PROJECTION, "distance_km": 1}}]
+
+def position_update(update: PositionUpdate) -> Tuple[dict, dict]:
+    # (filtro, cambio) de un ping GPS: solo se aplica si es más nuevo que el
+    # último guardado ($not/$gte también acepta documentos sin position_ts)
+    return (
+        {"_id": update.vehicle_id, "position_ts": {"$not": {"$gte": update.timestamp}}},
+        {"$set": {
+            "location": {"type": "Point", "coordinates": [update.longitude, update.latitude]},
+            "address": "",
+            "position_ts": update.timestamp
+        }}
+    )
@@ -0,0 +1,123 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from pymongo import ASCENDING, GEOSPHERE, MongoClient, ReplaceOne, UpdateOne
+from domain.ports import EmergencyRepositoryPort, VehicleRepositoryPort
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate
+from adapters.secondary.mongo_documents import (
+    ACTIVE_STATUSES, DEFAULT_DATABASE, EMERGENCIES_COLLECTION, EMERGENCY_PROJECTION, MONGO_URI_ENV,
+    VEHICLE_PROJECTION, VEHICLES_COLLECTION, available_query, emergency_from_document, emergency_to_document,
+    geo_near_pipeline, location_to_geojson, near_query, position_update, vehicle_from_document,
+    vehicle_to_document
+)
+
+# Un MongoClient ya es un pool de conexiones thread-safe: se comparte uno
+# por (uri, tamaño de pool) entre todos los repositorios del proceso
+_clients: Dict[Tuple[str, int], MongoClient] = {}
+_clients_lock = threading.Lock()
+
+def get_mongo_client(uri: str = None, max_pool_size: int = 50) -> MongoClient:
+    uri = uri or os.environ.get(MONGO_URI_ENV)
+    key = (uri, max_pool_size)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = MongoClient(uri, maxPoolSize=max_pool_size)
+                _clients[key] = client
+    return client
+
+def get_mongo_database(uri: str = None, database: str = DEFAULT_DATABASE, max_pool_size: int = 50):
+    return get_mongo_client(uri, max_pool_size)[database]
+
+
+class MongoEmergencyRepository(EmergencyRepositoryPort):
+    def __init__(self, database):
+        self.collection = database[EMERGENCIES_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        self.collection.create_index([("status", ASCENDING)])
+        self.collection.create_index([("location", GEOSPHERE)])
+
+    def add_emergencies(self, emergencies: List[Emergency], status: str = "activo") -> None:
+        if emergencies:
+            self.collection.bulk_write([
+                ReplaceOne({"_id": emergency.id}, emergency_to_document(emergency, status), upsert=True)
+                for emergency in emergencies
+            ], ordered=False)
+
+    def get_active_emergencies(self) -> List[Emergency]:
+        cursor = self.collection.find({"status": {"$in": ACTIVE_STATUSES}}, EMERGENCY_PROJECTION)
+        return [emergency_from_document(doc) for doc in cursor]
+
+    def get_emergency_by_id(self, emergency_id: str) -> Emergency:
+        doc = self.collection.find_one({"_id": emergency_id}, EMERGENCY_PROJECTION)
+        return emergency_from_document(doc) if doc else None
+
+
+class MongoVehicleRepository(VehicleRepositoryPort):
+    # El filtro por proximidad, tipo y disponibilidad corre en MongoDB
+    # (índice 2dsphere); a Python solo llegan los k candidatos
+
+    def __init__(self, database):
+        self.collection = database[VEHICLES_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        self.collection.create_index([("location", GEOSPHERE), ("type", ASCENDING), ("available", ASCENDING)])
+        self.collection.create_index([("type", ASCENDING), ("available", ASCENDING)])
+
+    def add_vehicles(self, vehicles: List[EmergencyVehicle]) -> None:
+        if vehicles:
+            self.collection.bulk_write([
+                ReplaceOne({"_id": vehicle.id}, vehicle_to_document(vehicle), upsert=True) for vehicle in vehicles
+            ], ordered=False)
+
+    def get_available_vehicles(self, vehicle_type: str = None) -> List[EmergencyVehicle]:
+        cursor = self.collection.find(available_query(vehicle_type), VEHICLE_PROJECTION)
+        return [vehicle_from_document(doc) for doc in cursor]
+
+    def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        result = self.collection.update_one({"_id": vehicle_id}, {"$set": {"available": available}})
+        return result.matched_count == 1
+
+    def update_vehicle_statuses(self, statuses: Dict[str, bool]) -> int:
+        # Varios cambios de estado en un solo viaje al servidor
+        if not statuses:
+            return 0
+        result = self.collection.bulk_write([
+            UpdateOne({"_id": vehicle_id}, {"$set": {"available": available}})
+            for vehicle_id, available in statuses.items()
+        ], ordered=False)
+        return result.matched_count
+
+    def try_reserve(self, vehicle_id: str) -> bool:
+        # Actualización condicional: solo un despacho puede pasar available de True a False
+        result = self.collection.update_one({"_id": vehicle_id, "available": True}, {"$set": {"available": False}})
+        return result.modified_count == 1
+
+    def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        result = self.collection.update_one(
+            {"_id": vehicle_id},
+            {"$set": {"location": location_to_geojson(location), "address": location.address}}
+        )
+        return result.matched_count == 1
+
+    def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        # Un solo bulk_write sin orden; los pings atrasados no pasan el filtro
+        if not updates:
+            return 0
+        result = self.collection.bulk_write([UpdateOne(*position_update(update)) for update in updates], ordered=False)
+        return result.modified_count
+
+    def nearest_available(self, location: Location, vehicle_type: str = None, k: int = 1,
+                          max_radius_km: Optional[float] = None) -> List[EmergencyVehicle]:
+        # $near devuelve los documentos ya ordenados por distancia
+        cursor = self.collection.find(near_query(location, vehicle_type, max_radius_km), VEHICLE_PROJECTION).limit(k)
+        return [vehicle_from_document(doc) for doc in cursor]
+
+    def nearest_available_with_distance(self, location: Location, vehicle_type: str = None, k: int = 1,
+                                        max_radius_km: Optional[float] = None) -> List[Tuple[EmergencyVehicle, float]]:
+        # Variante con $geoNear: cada vehículo viene con su distancia en km
+        cursor = self.collection.aggregate(geo_near_pipeline(location, vehicle_type, k, max_radius_km))
+        return [(vehicle_from_document(doc), doc["distance_km"]) for doc in cursor]
@@ -0,0 +1,76 @@
+import os
+from typing import List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import GEOSPHERE, UpdateOne
+from domain.async_ports import AsyncEmergencyRepositoryPort, AsyncVehicleRepositoryPort
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate
+from adapters.secondary.mongo_documents import (
+    ACTIVE_STATUSES, DEFAULT_DATABASE, EMERGENCIES_COLLECTION, EMERGENCY_PROJECTION, MONGO_URI_ENV,
+    VEHICLE_PROJECTION, VEHICLES_COLLECTION, available_query, emergency_from_document,
+    location_to_geojson, near_query, position_update, vehicle_from_document
+)
+
+def create_motor_database(uri: str = None, database: str = DEFAULT_DATABASE, max_pool_size: int = 50):
+    client = AsyncIOMotorClient(uri or os.environ.get(MONGO_URI_ENV), maxPoolSize=max_pool_size)
+    return client[database]
+
+
+class MotorEmergencyRepository(AsyncEmergencyRepositoryPort):
+    def __init__(self, database):
+        self.collection = database[EMERGENCIES_COLLECTION]
+
+    async def get_active_emergencies(self) -> List[Emergency]:
+        cursor = self.collection.find({"status": {"$in": ACTIVE_STATUSES}}, EMERGENCY_PROJECTION)
+        return [emergency_from_document(doc) async for doc in cursor]
+
+    async def get_emergency_by_id(self, emergency_id: str) -> Emergency:
+        doc = await self.collection.find_one({"_id": emergency_id}, EMERGENCY_PROJECTION)
+        return emergency_from_document(doc) if doc else None
+
+
+class MotorVehicleRepository(AsyncVehicleRepositoryPort):
+    def __init__(self, database):
+        self.collection = database[VEHICLES_COLLECTION]
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("location", GEOSPHERE)])
+        await self.collection.create_index([("type", 1), ("available", 1)])
+
+    async def get_available_vehicles(self, vehicle_type: str = None) -> List[EmergencyVehicle]:
+        cursor = self.collection.find(available_query(vehicle_type), VEHICLE_PROJECTION)
+        return [vehicle_from_document(doc) async for doc in cursor]
+
+    async def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        result = await self.collection.update_one({"_id": vehicle_id}, {"$set": {"available": available}})
+        return result.matched_count == 1
+
+    async def try_reserve(self, vehicle_id: str) -> bool:
+        # Actualización condicional: solo un despacho puede pasar available de True a False
+        result = await self.collection.update_one(
+            {"_id": vehicle_id, "available": True}, {"$set": {"available": False}}
+        )
+        return result.modified_count == 1
+
+    async def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        result = await self.collection.update_one(
+            {"_id": vehicle_id},
+            {"$set": {"location": location_to_geojson(location), "address": location.address}}
+        )
+        return result.matched_count == 1
+
+    async def nearest_available(self, location: Location, vehicle_type: str = None, k: int = 1,
+                                max_radius_km: Optional[float] = None) -> List[EmergencyVehicle]:
+        # $near devuelve los documentos ya ordenados por distancia
+        cursor = self.collection.find(
+            near_query(location, vehicle_type, max_radius_km), VEHICLE_PROJECTION
+        ).limit(k)
+        return [vehicle_from_document(doc) async for doc in cursor]
+
+    async def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        # Un solo bulk_write sin orden; los pings atrasados no pasan el filtro
+        if not updates:
+            return 0
+        result = await self.collection.bulk_write(
+            [UpdateOne(*position_update(update)) for update in updates], ordered=False
+        )
+        return result.modified_count
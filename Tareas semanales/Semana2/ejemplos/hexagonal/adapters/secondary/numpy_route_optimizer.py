@@ -0,0 +1,81 @@
+from typing import List, Sequence
+import numpy as np
+from adapters.secondary.geo import haversine_np, haversine_matrix
+from adapters.secondary.historical_traffic import HistoricalTrafficService
+from adapters.secondary.route_optimizer import SimpleRouteOptimizer, simulated_path
+from domain.entities import Emergency, EmergencyVehicle, LazyPath, Route
+
+class NumpyRouteOptimizer(SimpleRouteOptimizer):
+    # Mantiene las coordenadas de la flota en arreglos contiguos y calcula
+    # distancias haversine para todos los vehículos en una sola pasada.
+
+    def __init__(self, traffic: HistoricalTrafficService = None):
+        super().__init__(traffic)
+        self._fleet = None
+        self._fleet_lat = np.empty(0, dtype=np.float64)
+        self._fleet_lon = np.empty(0, dtype=np.float64)
+
+    def load_fleet(self, vehicles: Sequence[EmergencyVehicle]) -> None:
+        # Precargar la flota para reutilizar los arreglos entre llamadas
+        self._fleet = vehicles
+        self._fleet_lat, self._fleet_lon = self._to_arrays(vehicles)
+
+    def find_optimal_route(self, emergency: Emergency, available_vehicles: List[EmergencyVehicle]) -> Route:
+        if not available_vehicles:
+            raise ValueError("No available vehicles")
+
+        lat, lon = self._fleet_arrays(available_vehicles)
+        distances = haversine_np(lat, lon, emergency.location.latitude, emergency.location.longitude)
+        best = int(np.argmin(distances))
+        return self._build_route(emergency, available_vehicles[best], float(distances[best]))
+
+    def distance_matrix(self, emergencies: Sequence[Emergency], vehicles: Sequence[EmergencyVehicle]) -> np.ndarray:
+        # Matriz N x M (emergencias x vehículos) en kilómetros
+        e_lat = np.fromiter((e.location.latitude for e in emergencies), dtype=np.float64, count=len(emergencies))
+        e_lon = np.fromiter((e.location.longitude for e in emergencies), dtype=np.float64, count=len(emergencies))
+        v_lat, v_lon = self._fleet_arrays(vehicles)
+        return haversine_matrix(e_lat, e_lon, v_lat, v_lon)
+
+    def find_optimal_routes(self, emergencies: Sequence[Emergency], available_vehicles: List[EmergencyVehicle]) -> List[Route]:
+        # Vehículo más cercano para cada emergencia de forma independiente
+        # (no reserva vehículos: dos emergencias pueden compartir candidato)
+        if not available_vehicles:
+            raise ValueError("No available vehicles")
+        if not emergencies:
+            return []
+
+        distances = self.distance_matrix(emergencies, available_vehicles)
+        best = np.argmin(distances, axis=1)
+        best_distances = distances[np.arange(len(emergencies)), best]
+        return [
+            self._build_route(emergency, available_vehicles[int(index)], float(distance))
+            for emergency, index, distance in zip(emergencies, best, best_distances)
+        ]
+
+    def _build_route(self, emergency: Emergency, vehicle: EmergencyVehicle, distance: float,
+                     estimated_time: float = None) -> Route:
+        # La geometría queda pendiente: el ranking y la asignación solo usan distancia y tiempo
+        path = LazyPath(simulated_path, vehicle.current_location, emergency.location)
+        return Route(
+            vehicle=vehicle,
+            emergency=emergency,
+            path=path,
+            estimated_time=self._estimate_time(distance, path) if estimated_time is None else estimated_time,
+            distance=distance
+        )
+
+    def _fleet_arrays(self, vehicles: Sequence[EmergencyVehicle]):
+        if vehicles is self._fleet and len(vehicles) == len(self._fleet_lat):
+            return self._fleet_lat, self._fleet_lon
+        # Los repositorios columnares ya entregan las coordenadas como arreglos
+        latitudes = getattr(vehicles, "latitudes", None)
+        if latitudes is not None:
+            return latitudes, vehicles.longitudes
+        return self._to_arrays(vehicles)
+
+    @staticmethod
+    def _to_arrays(vehicles: Sequence[EmergencyVehicle]):
+        count = len(vehicles)
+        lat = np.fromiter((v.current_location.latitude for v in vehicles), dtype=np.float64, count=count)
+        lon = np.fromiter((v.current_location.longitude for v in vehicles), dtype=np.float64, count=count)
+        return lat, lon
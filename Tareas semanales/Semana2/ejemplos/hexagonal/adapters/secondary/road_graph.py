@@ -0,0 +1,320 @@
+import heapq
+import math
+from typing import List, Tuple
+import numpy as np
+from adapters.secondary.geo import haversine_km, haversine_np
+
+DEFAULT_SPEED_KMH = 40.0
+ONEWAY_FORWARD = {"yes", "true", "1", "t", "y"}
+ONEWAY_BACKWARD = {"-1", "reverse"}
+
+class RoadGraph:
+    # Grafo dirigido de calles en formato CSR (compressed sparse row).
+    # Los nodos son los extremos de cada tramo y los pesos son tiempos de
+    # viaje en segundos. La geometría de cada tramo se guarda aplanada para
+    # poder reconstruir el recorrido real de una ruta.
+
+    def __init__(
+        self,
+        node_lat: np.ndarray,
+        node_lon: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        travel_time_s: np.ndarray,
+        length_km: np.ndarray,
+        edge_line: np.ndarray = None,
+        edge_reversed: np.ndarray = None,
+        line_indptr: np.ndarray = None,
+        line_lat: np.ndarray = None,
+        line_lon: np.ndarray = None
+    ):
+        self.node_lat = np.ascontiguousarray(node_lat, dtype=np.float64)
+        self.node_lon = np.ascontiguousarray(node_lon, dtype=np.float64)
+        node_count = len(self.node_lat)
+
+        # Ordenar aristas por nodo de origen para armar el CSR
+        order = np.argsort(sources, kind="stable")
+        self.edge_tail = np.ascontiguousarray(sources[order], dtype=np.int32)
+        self.indices = np.ascontiguousarray(targets[order], dtype=np.int32)
+        self.weights = np.ascontiguousarray(travel_time_s[order], dtype=np.float32)
+        self.length_km = np.ascontiguousarray(length_km[order], dtype=np.float32)
+        self.indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_tail, minlength=node_count), out=self.indptr[1:])
+
+        if edge_line is not None:
+            self.edge_line = np.ascontiguousarray(edge_line[order], dtype=np.int32)
+            self.edge_reversed = np.ascontiguousarray(edge_reversed[order], dtype=bool)
+            self.line_indptr = np.asarray(line_indptr, dtype=np.int64)
+            self.line_lat = np.asarray(line_lat, dtype=np.float64)
+            self.line_lon = np.asarray(line_lon, dtype=np.float64)
+        else:
+            self.edge_line = None
+
+        # Grafo inverso (aristas entrantes) para la búsqueda hacia atrás
+        reverse_order = np.argsort(self.indices, kind="stable")
+        self.rev_edge = reverse_order.astype(np.int32)
+        self.rev_indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=node_count), out=self.rev_indptr[1:])
+
+        # Velocidad máxima del grafo: hace admisible la heurística de A*
+        # (con margen por el redondeo de nodos y la precisión float32)
+        speeds = self.length_km / np.maximum(self.weights, 1e-6) * 3600.0
+        self.max_speed_kmh = float(speeds.max()) * 1.01 if len(speeds) else DEFAULT_SPEED_KMH
+        self._node_tree = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_lat)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        layer: str = None,
+        speed_column: str = "maxspeed",
+        oneway_column: str = "oneway",
+        default_speed_kmh: float = DEFAULT_SPEED_KMH,
+        snap_decimals: int = 6
+    ) -> "RoadGraph":
+        # Carga una red vial desde un GeoPackage/Shapefile local. Se asume que
+        # las líneas vienen cortadas en las intersecciones (como en OSM).
+        import geopandas as gpd
+        import pandas as pd
+        import shapely
+
+        frame = gpd.read_file(path, layer=layer, engine="pyogrio")
+        if frame.crs is not None and not frame.crs.is_geographic:
+            frame = frame.to_crs(4326)
+        frame = frame[frame.geometry.notna()].explode(index_parts=False)
+        frame = frame[frame.geometry.geom_type == "LineString"]
+
+        if speed_column in frame.columns:
+            speeds = pd.to_numeric(
+                frame[speed_column].astype(str).str.extract(r"([\d.]+)")[0], errors="coerce"
+            ).fillna(default_speed_kmh).to_numpy(dtype=np.float64)
+        else:
+            speeds = np.full(len(frame), default_speed_kmh)
+        speeds = np.where(speeds > 0, speeds, default_speed_kmh)
+
+        if oneway_column in frame.columns:
+            oneway = frame[oneway_column].astype(str).str.lower().to_numpy()
+        else:
+            oneway = np.full(len(frame), "no")
+
+        coords, line_of_point = shapely.get_coordinates(frame.geometry.values, return_index=True)
+        return cls.from_lines(
+            coords[:, 1], coords[:, 0], line_of_point, speeds, oneway, snap_decimals
+        )
+
+    @classmethod
+    def from_lines(
+        cls,
+        point_lat: np.ndarray,
+        point_lon: np.ndarray,
+        line_of_point: np.ndarray,
+        speed_kmh: np.ndarray,
+        oneway: np.ndarray = None,
+        snap_decimals: int = 6
+    ) -> "RoadGraph":
+        # Construye el grafo desde coordenadas aplanadas de polilíneas
+        line_count = len(speed_kmh)
+        line_indptr = np.zeros(line_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(line_of_point, minlength=line_count), out=line_indptr[1:])
+        valid = (line_indptr[1:] - line_indptr[:-1]) >= 2
+
+        # Largo de cada línea: suma de segmentos haversine consecutivos
+        segment = haversine_np(point_lat[:-1], point_lon[:-1], point_lat[1:], point_lon[1:])
+        segment[line_of_point[:-1] != line_of_point[1:]] = 0.0
+        length = np.bincount(line_of_point[:-1], weights=segment, minlength=line_count)
+
+        # Nodos: extremos de línea unificados por coordenadas redondeadas
+        first = line_indptr[:-1][valid]
+        last = line_indptr[1:][valid] - 1
+        ends = np.concatenate([first, last])
+        keys = np.round(np.column_stack([point_lat[ends], point_lon[ends]]), snap_decimals)
+        unique_keys, node_of_end = np.unique(keys, axis=0, return_inverse=True)
+        node_of_end = node_of_end.ravel()
+        line_ids = np.flatnonzero(valid)
+        start_node = node_of_end[:len(line_ids)]
+        end_node = node_of_end[len(line_ids):]
+
+        travel_time = length[line_ids] / speed_kmh[line_ids] * 3600.0
+        if oneway is None:
+            oneway = np.full(line_count, "no")
+        direction = np.asarray(oneway)[line_ids]
+        forward = ~np.isin(direction, list(ONEWAY_BACKWARD))
+        backward = ~np.isin(direction, list(ONEWAY_FORWARD))
+
+        sources = np.concatenate([start_node[forward], end_node[backward]])
+        targets = np.concatenate([end_node[forward], start_node[backward]])
+        return cls(
+            node_lat=unique_keys[:, 0],
+            node_lon=unique_keys[:, 1],
+            sources=sources,
+            targets=targets,
+            travel_time_s=np.concatenate([travel_time[forward], travel_time[backward]]),
+            length_km=np.concatenate([length[line_ids][forward], length[line_ids][backward]]),
+            edge_line=np.concatenate([line_ids[forward], line_ids[backward]]),
+            edge_reversed=np.concatenate([
+                np.zeros(int(forward.sum()), dtype=bool), np.ones(int(backward.sum()), dtype=bool)
+            ]),
+            line_indptr=line_indptr,
+            line_lat=point_lat,
+            line_lon=point_lon
+        )
+
+    def nearest_node(self, latitude: float, longitude: float) -> int:
+        import shapely
+        if self._node_tree is None:
+            self._node_tree = shapely.STRtree(shapely.points(self.node_lon, self.node_lat))
+        return int(self._node_tree.nearest(shapely.Point(longitude, latitude)))
+
+    def shortest_path(self, source: int, target: int) -> Tuple[float, List[int]]:
+        # A* bidireccional con potenciales promediados (consistentes en
+        # ambas direcciones). Devuelve (segundos, aristas del camino).
+        if source == target:
+            return 0.0, []
+
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        rev_indptr, rev_edge, edge_tail = self.rev_indptr, self.rev_edge, self.edge_tail
+        node_lat, node_lon = self.node_lat, self.node_lon
+        seconds_per_km = 3600.0 / self.max_speed_kmh
+        s_lat, s_lon = float(node_lat[source]), float(node_lon[source])
+        t_lat, t_lon = float(node_lat[target]), float(node_lon[target])
+        potentials = {}
+
+        def potential(node):
+            value = potentials.get(node)
+            if value is None:
+                lat, lon = float(node_lat[node]), float(node_lon[node])
+                value = 0.5 * seconds_per_km * (
+                    haversine_km(lat, lon, t_lat, t_lon) - haversine_km(lat, lon, s_lat, s_lon)
+                )
+                potentials[node] = value
+            return value
+
+        dist_f = {source: 0.0}
+        dist_b = {target: 0.0}
+        parent_f = {source: -1}
+        parent_b = {target: -1}
+        heap_f = [(potential(source), source)]
+        heap_b = [(-potential(target), target)]
+        settled_f = set()
+        settled_b = set()
+        best = math.inf
+        meeting = -1
+
+        while heap_f and heap_b:
+            # Con potenciales promediados basta comparar la suma de los topes
+            if heap_f[0][0] + heap_b[0][0] >= best:
+                break
+
+            if len(heap_f) <= len(heap_b):
+                _, node = heapq.heappop(heap_f)
+                if node in settled_f:
+                    continue
+                settled_f.add(node)
+                base = dist_f[node]
+                start, end = int(indptr[node]), int(indptr[node + 1])
+                for offset, (head, weight) in enumerate(zip(indices[start:end].tolist(), weights[start:end].tolist())):
+                    candidate = base + weight
+                    if candidate < dist_f.get(head, math.inf):
+                        dist_f[head] = candidate
+                        parent_f[head] = start + offset
+                        heapq.heappush(heap_f, (candidate + potential(head), head))
+                        other = dist_b.get(head)
+                        if other is not None and candidate + other < best:
+                            best = candidate + other
+                            meeting = head
+            else:
+                _, node = heapq.heappop(heap_b)
+                if node in settled_b:
+                    continue
+                settled_b.add(node)
+                base = dist_b[node]
+                start, end = int(rev_indptr[node]), int(rev_indptr[node + 1])
+                for edge in rev_edge[start:end].tolist():
+                    tail = int(edge_tail[edge])
+                    candidate = base + float(weights[edge])
+                    if candidate < dist_b.get(tail, math.inf):
+                        dist_b[tail] = candidate
+                        parent_b[tail] = edge
+                        heapq.heappush(heap_b, (candidate - potential(tail), tail))
+                        other = dist_f.get(tail)
+                        if other is not None and candidate + other < best:
+                            best = candidate + other
+                            meeting = tail
+
+        if meeting < 0:
+            raise ValueError(f"No route between nodes {source} and {target}")
+
+        return best, self._join_paths(parent_f, parent_b, meeting)
+
+    def travel_times_from(self, source: int) -> np.ndarray:
+        # Dijkstra de un origen a todos los nodos (segundos, inf si no hay
+        # camino). Pensado para precálculos offline, no para el camino caliente.
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        weights = self.weights.tolist()
+        dist = [math.inf] * self.node_count
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            base, node = heapq.heappop(heap)
+            if base > dist[node]:
+                continue
+            for offset in range(indptr[node], indptr[node + 1]):
+                head = indices[offset]
+                candidate = base + weights[offset]
+                if candidate < dist[head]:
+                    dist[head] = candidate
+                    heapq.heappush(heap, (candidate, head))
+        return np.asarray(dist, dtype=np.float64)
+
+    def _join_paths(self, parent_f: dict, parent_b: dict, meeting: int) -> List[int]:
+        edges = []
+        node = meeting
+        while parent_f[node] >= 0:
+            edge = parent_f[node]
+            edges.append(edge)
+            node = int(self.edge_tail[edge])
+        edges.reverse()
+
+        node = meeting
+        while parent_b[node] >= 0:
+            edge = parent_b[node]
+            edges.append(edge)
+            node = int(self.indices[edge])
+        return edges
+
+    def edge_geometry(self, edges: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        # Concatena la geometría de las aristas (o solo sus nodos si no hay)
+        if not edges:
+            return np.empty(0), np.empty(0)
+        if self.edge_line is None:
+            nodes = [int(self.edge_tail[edges[0]])] + [int(self.indices[edge]) for edge in edges]
+            return self.node_lat[nodes], self.node_lon[nodes]
+
+        lat_parts, lon_parts = [], []
+        for position, edge in enumerate(edges):
+            line = self.edge_line[edge]
+            start, end = self.line_indptr[line], self.line_indptr[line + 1]
+            lat = self.line_lat[start:end]
+            lon = self.line_lon[start:end]
+            if self.edge_reversed[edge]:
+                lat, lon = lat[::-1], lon[::-1]
+            if position > 0:
+                # El primer punto repite el último de la arista anterior
+                lat, lon = lat[1:], lon[1:]
+            lat_parts.append(lat)
+            lon_parts.append(lon)
+        return np.concatenate(lat_parts), np.concatenate(lon_parts)
+
+    def path_length_km(self, edges: List[int]) -> float:
+        if not edges:
+            return 0.0
+        return float(self.length_km[np.asarray(edges, dtype=np.int64)].sum(dtype=np.float64))
@@ -0,0 +1,53 @@
+from typing import List
+from domain.ports import MapServicePort
+from domain.entities import LazyPath, Location, Route
+from adapters.secondary.road_graph import RoadGraph
+from adapters.secondary.contraction_hierarchy import ContractionHierarchy
+
+class RoadGraphMapService(MapServicePort):
+    # Motor de rutas local: resuelve get_route sobre un grafo vial cargado
+    # desde disco, sin depender de servicios externos.
+
+    def __init__(self, graph: RoadGraph, hierarchy: ContractionHierarchy = None):
+        self.graph = graph
+        self.hierarchy = hierarchy
+
+    @classmethod
+    def from_file(cls, path: str, layer: str = None, contraction_hierarchy: bool = False,
+                  hierarchy_path: str = None, **graph_options) -> "RoadGraphMapService":
+        graph = RoadGraph.from_file(path, layer=layer, **graph_options)
+        hierarchy = None
+        if hierarchy_path is not None:
+            hierarchy = ContractionHierarchy.load(graph, hierarchy_path)
+        elif contraction_hierarchy:
+            hierarchy = ContractionHierarchy.build(graph)
+        return cls(graph, hierarchy)
+
+    def get_route(self, start: Location, end: Location) -> Route:
+        source = self.graph.nearest_node(start.latitude, start.longitude)
+        target = self.graph.nearest_node(end.latitude, end.longitude)
+
+        if self.hierarchy is not None:
+            seconds, edges = self.hierarchy.shortest_path(source, target)
+        else:
+            seconds, edges = self.graph.shortest_path(source, target)
+
+        return Route(
+            vehicle=None,
+            emergency=None,
+            # Las coordenadas de cada arista se buscan solo si se lee route.path
+            path=LazyPath(self._build_path, start, end, edges),
+            estimated_time=seconds / 60,
+            distance=self.graph.path_length_km(edges)
+        )
+
+    def get_traffic_data(self, location: Location) -> float:
+        # Sin datos de tráfico: el grafo ya usa velocidades de flujo libre
+        return 1.0
+
+    def _build_path(self, start: Location, end: Location, edges: List[int]) -> List[Location]:
+        lats, lons = self.graph.edge_geometry(edges)
+        path = [start]
+        path.extend(Location(latitude=lat, longitude=lon) for lat, lon in zip(lats.tolist(), lons.tolist()))
+        path.append(end)
+        return path
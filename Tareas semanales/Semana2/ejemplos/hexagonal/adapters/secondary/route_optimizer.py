@@ -1,9 +1,30 @@
 import math
 import random
+from typing import List
 from domain.ports import RouteOptimizerPort
-from domain.entities import Emergency, EmergencyVehicle, Location, Route
+from domain.entities import Emergency, EmergencyVehicle, LazyPath, Location, Route
+from adapters.secondary.historical_traffic import HistoricalTrafficService
+
+def simulated_path(start: Location, end: Location, num_points: int = 3) -> List[Location]:
+    # Generar puntos intermedios simulados (función de módulo para que un
+    # LazyPath pendiente se pueda enviar a otro proceso)
+    path = [start]
+    
+    for i in range(1, num_points + 1):
+        fraction = i / (num_points + 1)
+        lat = start.latitude + (end.latitude - start.latitude) * fraction
+        lon = start.longitude + (end.longitude - start.longitude) * fraction
+        path.append(Location(latitude=lat, longitude=lon))
+    
+    path.append(end)
+    return path
+
 
 class SimpleRouteOptimizer(RouteOptimizerPort):
+    def __init__(self, traffic: HistoricalTrafficService = None):
+        # Sin perfiles de tráfico se usa un factor aleatorio (solo para demos)
+        self.traffic = traffic
+    
     def find_optimal_route(self, emergency: Emergency, available_vehicles: List[EmergencyVehicle]) -> Route:
         # Algoritmo simple: elegir el vehículo más cercano
         closest_vehicle = None
@@ -19,11 +40,12 @@ class SimpleRouteOptimizer(RouteOptimizerPort):
                 min_distance = distance
                 closest_vehicle = vehicle
         
-        # Generar una ruta simulada (en un caso real, usaríamos un servicio de mapas)
-        path = self._generate_simulated_path(closest_vehicle.current_location, emergency.location)
+        # Ruta simulada (en un caso real, usaríamos un servicio de mapas); se
+        # genera recién cuando alguien lee route.path
+        path = LazyPath(simulated_path, closest_vehicle.current_location, emergency.location)
         
         # Calcular tiempo estimado (simulado)
-        estimated_time = self._estimate_time(min_distance)
+        estimated_time = self._estimate_time(min_distance, path)
         
         return Route(
             vehicle=closest_vehicle,
@@ -39,23 +61,13 @@ class SimpleRouteOptimizer(RouteOptimizerPort):
         lon_diff = abs(loc1.longitude - loc2.longitude)
         return math.sqrt(lat_diff**2 + lon_diff**2) * 111  # Aproximación km
     
-    def _generate_simulated_path(self, start: Location, end: Location) -> List[Location]:
-        # Generar puntos intermedios simulados
-        num_points = 3
-        path = [start]
-        
-        for i in range(1, num_points + 1):
-            fraction = i / (num_points + 1)
-            lat = start.latitude + (end.latitude - start.latitude) * fraction
-            lon = start.longitude + (end.longitude - start.longitude) * fraction
-            path.append(Location(latitude=lat, longitude=lon))
-        
-        path.append(end)
-        return path
-    
-    def _estimate_time(self, distance: float) -> float:
+    def _estimate_time(self, distance: float, path: List[Location] = None) -> float:
         # Tiempo estimado en minutos (considerando tráfico)
         base_speed = 60  # km/h
-        traffic_factor = random.uniform(0.7, 1.3)  # Factor aleatorio de tráfico
+        if self.traffic is not None and path:
+            # Factor histórico promedio sobre los puntos del recorrido
+            traffic_factor = self.traffic.mean_speed_factor(path)
+        else:
+            traffic_factor = random.uniform(0.7, 1.3)  # Factor aleatorio de tráfico
         speed = base_speed * traffic_factor
         return (distance / speed) * 60  # Convertir a minutos
\ No newline at end of file
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import pickle
+from datetime import datetime, timezone
+from typing import Iterable, Tuple
+import numpy as np
+from domain.entities import Emergency, EmergencyVehicle
+from adapters.secondary.columnar_store import EmergencyStore, FleetStore, _ColumnarStore
+
+# Snapshot versionado del estado de arranque: las columnas de FleetStore y
+# EmergencyStore van en archivos .npy que se abren con mmap copy-on-write
+# (mmap_mode="c": el SO pagina a demanda y las escrituras quedan en el
+# proceso), y los índices id -> fila y los textos en un pickle. Cargar no
+# recorre la flota ni crea objetos por vehículo.
+
+MANIFEST_FILE = "snapshot.json"
+STATE_FILE = "state.pkl"
+SNAPSHOT_VERSION = 1
+STORES = ("fleet", "emergencies")
+
+def build_stores(vehicles: Iterable[EmergencyVehicle], emergencies: Iterable[Emergency]) -> Tuple[FleetStore, EmergencyStore]:
+    fleet = FleetStore()
+    for vehicle in vehicles:
+        fleet.add(vehicle)
+    store = EmergencyStore()
+    for emergency in emergencies:
+        store.add(emergency)
+    return fleet, store
+
+def save_snapshot(directory: str, fleet: FleetStore, emergencies: EmergencyStore, **metadata) -> dict:
+    os.makedirs(directory, exist_ok=True)
+    state = {}
+    columns = {}
+    for name, store in zip(STORES, (fleet, emergencies)):
+        size = len(store)
+        columns[name] = store._columns()
+        for column in store._columns():
+            np.save(os.path.join(directory, f"{name}{column}.npy"), getattr(store, column)[:size])
+        # Todo lo que no es columna (ids, índice de filas, textos, códigos de tipo)
+        state[name] = {key: value for key, value in vars(store).items() if key not in columns[name]}
+    with open(os.path.join(directory, STATE_FILE), "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # El manifiesto se escribe al final: sin él el snapshot no se considera completo
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "vehicles": len(fleet),
+        "emergencies": len(emergencies),
+        "columns": columns,
+        "metadata": metadata
+    }
+    temporary = os.path.join(directory, MANIFEST_FILE + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temporary, os.path.join(directory, MANIFEST_FILE))
+    return manifest
+
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+    return manifest
+
+def load_snapshot(directory: str) -> Tuple[FleetStore, EmergencyStore]:
+    manifest = read_manifest(directory)
+    with open(os.path.join(directory, STATE_FILE), "rb") as f:
+        state = pickle.load(f)
+    fleet = _restore(FleetStore, directory, "fleet", manifest["columns"]["fleet"], state["fleet"])
+    emergencies = _restore(EmergencyStore, directory, "emergencies", manifest["columns"]["emergencies"],
+                           state["emergencies"])
+    return fleet, emergencies
+
+def _restore(cls, directory: str, name: str, columns, state: dict) -> _ColumnarStore:
+    store = cls.__new__(cls)
+    vars(store).update(state)
+    size = state["_size"]
+    for column in columns:
+        path = os.path.join(directory, f"{name}{column}.npy")
+        # Un archivo vacío no se puede mapear; el store necesita al menos una fila de capacidad
+        values = np.load(path, mmap_mode="c") if size else np.empty(1, dtype=np.load(path).dtype)
+        setattr(store, column, values)
+    # Capacidad = lo cargado: el primer add copia a memoria propia al crecer
+    store._capacity = max(size, 1)
+    return store
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Genera un snapshot de arranque con una ciudad sintética")
+    parser.add_argument("output", help="directorio de salida")
+    parser.add_argument("--vehicles", type=int, default=10_000)
+    parser.add_argument("--emergencies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    from benchmarks.synthetic_city import SyntheticCity
+    city = SyntheticCity(seed=args.seed)
+    fleet, emergencies = build_stores(city.vehicles(args.vehicles), city.emergencies(args.emergencies))
+    manifest = save_snapshot(args.output, fleet, emergencies, source="synthetic", seed=args.seed)
+    print(f"{manifest['vehicles']} vehículos y {manifest['emergencies']} emergencias en {args.output}")
+
+if __name__ == "__main__":
+    main()
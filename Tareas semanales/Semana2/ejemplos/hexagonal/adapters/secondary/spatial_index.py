@@ -0,0 +1,153 @@
+import heapq
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+from adapters.secondary.geo import haversine_km
+
+KM_PER_DEGREE = 111.195
+
+class GridSpatialIndex:
+    # Índice espacial de grilla uniforme: cada celda guarda los ids de los
+    # elementos que caen en ella. Insertar, mover y borrar son O(1) y la
+    # búsqueda de k vecinos recorre anillos de celdas alrededor del punto.
+
+    def __init__(self, cell_size_km: float = 1.0, reference_latitude: float = 0.0):
+        self.cell_size_km = cell_size_km
+        self._cell_lat = cell_size_km / KM_PER_DEGREE
+        self._cell_lon = self._cell_lat / max(math.cos(math.radians(reference_latitude)), 0.01)
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float]]] = {}
+        self._positions: Dict[Hashable, Tuple[float, float, Tuple[int, int]]] = {}
+        # Límites de celdas ocupadas; solo crecen para que mantenerlos sea O(1)
+        self._bounds: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._positions
+
+    def insert(self, item_id: Hashable, latitude: float, longitude: float) -> None:
+        if item_id in self._positions:
+            self.move(item_id, latitude, longitude)
+            return
+        cell = self._cell_of(latitude, longitude)
+        self._cells.setdefault(cell, {})[item_id] = (latitude, longitude)
+        self._positions[item_id] = (latitude, longitude, cell)
+        self._extend_bounds(cell)
+
+    def remove(self, item_id: Hashable) -> bool:
+        entry = self._positions.pop(item_id, None)
+        if entry is None:
+            return False
+        cell = entry[2]
+        bucket = self._cells[cell]
+        del bucket[item_id]
+        if not bucket:
+            del self._cells[cell]
+        if not self._positions:
+            self._bounds = None
+        return True
+
+    def move(self, item_id: Hashable, latitude: float, longitude: float) -> None:
+        entry = self._positions.get(item_id)
+        if entry is None:
+            self.insert(item_id, latitude, longitude)
+            return
+        old_cell = entry[2]
+        new_cell = self._cell_of(latitude, longitude)
+        if new_cell == old_cell:
+            # Misma celda: solo se actualiza la posición
+            self._cells[old_cell][item_id] = (latitude, longitude)
+        else:
+            bucket = self._cells[old_cell]
+            del bucket[item_id]
+            if not bucket:
+                del self._cells[old_cell]
+            self._cells.setdefault(new_cell, {})[item_id] = (latitude, longitude)
+            self._extend_bounds(new_cell)
+        self._positions[item_id] = (latitude, longitude, new_cell)
+
+    def position(self, item_id: Hashable) -> Optional[Tuple[float, float]]:
+        entry = self._positions.get(item_id)
+        return None if entry is None else (entry[0], entry[1])
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1,
+                max_radius_km: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        # Devuelve hasta k pares (id, distancia_km) ordenados por distancia
+        if k <= 0 or not self._positions:
+            return []
+
+        center_row, center_col = self._cell_of(latitude, longitude)
+        max_ring = self._max_ring(center_row, center_col)
+        best: List[Tuple[float, Hashable]] = []  # heap de máximos (distancia negada)
+
+        for ring in range(max_ring + 1):
+            if 8 * ring > len(self._cells):
+                # Anillos más grandes que la cantidad de celdas ocupadas (grilla
+                # dispersa): es más barato revisar directamente lo que queda
+                cells = [
+                    cell for cell in self._cells
+                    if max(abs(cell[0] - center_row), abs(cell[1] - center_col)) >= ring
+                ]
+            else:
+                cells = self._ring_cells(center_row, center_col, ring)
+
+            for cell in cells:
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for item_id, (lat, lon) in bucket.items():
+                    distance = haversine_km(latitude, longitude, lat, lon)
+                    if max_radius_km is not None and distance > max_radius_km:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, item_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, item_id))
+
+            if 8 * ring > len(self._cells):
+                break
+
+            # Cualquier elemento fuera de este anillo está al menos a esta distancia
+            reach_km = self._ring_reach_km(latitude, ring)
+            if max_radius_km is not None and reach_km > max_radius_km:
+                break
+            if len(best) == k and -best[0][0] <= reach_km:
+                break
+
+        return [(item_id, -neg_distance) for neg_distance, item_id in sorted(best, reverse=True)]
+
+    def _cell_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (math.floor(latitude / self._cell_lat), math.floor(longitude / self._cell_lon))
+
+    def _ring_reach_km(self, latitude: float, ring: int) -> float:
+        # Cota inferior de distancia a las celdas del anillo ring + 1
+        far_lat = min(abs(latitude) + (ring + 1) * self._cell_lat, 89.0)
+        width_km = self._cell_lon * KM_PER_DEGREE * math.cos(math.radians(far_lat))
+        return ring * min(self.cell_size_km, width_km) * 0.99
+
+    def _extend_bounds(self, cell: Tuple[int, int]) -> None:
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+            return
+        bounds = self._bounds
+        bounds[0] = min(bounds[0], cell[0])
+        bounds[1] = max(bounds[1], cell[0])
+        bounds[2] = min(bounds[2], cell[1])
+        bounds[3] = max(bounds[3], cell[1])
+
+    def _max_ring(self, row: int, col: int) -> int:
+        # Anillo a partir del cual ya se cubrieron todas las celdas ocupadas
+        min_row, max_row, min_col, max_col = self._bounds
+        return max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int):
+        if ring == 0:
+            yield (row, col)
+            return
+        for dc in range(-ring, ring + 1):
+            yield (row - ring, col + dc)
+            yield (row + ring, col + dc)
+        for dr in range(-ring + 1, ring):
+            yield (row + dr, col - ring)
+            yield (row + dr, col + ring)
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Callable, List, Sequence
+import numpy as np
+from adapters.secondary.geo import haversine_matrix
+from adapters.secondary.numpy_route_optimizer import NumpyRouteOptimizer
+from adapters.secondary.travel_time_table import DEFAULT_DETOUR_FACTOR, TravelTimeTable
+from domain.entities import Emergency, EmergencyVehicle, Route
+
+class TravelTimeRouteOptimizer(NumpyRouteOptimizer):
+    # Elige el vehículo con menor ETA según las tablas precalculadas en vez
+    # del más cercano en línea recta. Los pares que la tabla no cubre (fuera
+    # de la grilla o dentro de la misma celda) usan distancia / velocidad con
+    # el mismo desvío y factor de franja que la tabla, para que compitan en
+    # igualdad con los candidatos de la tabla.
+
+    def __init__(
+        self,
+        table: TravelTimeTable,
+        fallback_speed_kmh: float = 40.0,
+        detour_factor: float = DEFAULT_DETOUR_FACTOR,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        super().__init__()
+        self.table = table
+        self.fallback_speed_kmh = fallback_speed_kmh
+        self.detour_factor = detour_factor
+        self._clock = clock
+
+    @classmethod
+    def from_directory(cls, directory: str, **kwargs) -> "TravelTimeRouteOptimizer":
+        return cls(TravelTimeTable.open(directory), **kwargs)
+
+    def find_optimal_route(self, emergency: Emergency, available_vehicles: List[EmergencyVehicle]) -> Route:
+        return self.find_optimal_routes([emergency], available_vehicles)[0]
+
+    def find_optimal_routes(self, emergencies: Sequence[Emergency], available_vehicles: List[EmergencyVehicle]) -> List[Route]:
+        if not available_vehicles:
+            raise ValueError("No available vehicles")
+        if not emergencies:
+            return []
+
+        distances, seconds = self._distances_and_etas(emergencies, available_vehicles)
+        best = np.argmin(seconds, axis=1)
+        rows = np.arange(len(emergencies))
+        return [
+            self._build_route(emergency, available_vehicles[int(index)], float(distance), float(eta) / 60)
+            for emergency, index, distance, eta in zip(emergencies, best, distances[rows, best], seconds[rows, best])
+        ]
+
+    def eta_matrix(self, emergencies: Sequence[Emergency], vehicles: Sequence[EmergencyVehicle]) -> np.ndarray:
+        # Matriz N x M (emergencias x vehículos) en minutos
+        return self._distances_and_etas(emergencies, vehicles)[1] / 60
+
+    def _distances_and_etas(self, emergencies: Sequence[Emergency], vehicles: Sequence[EmergencyVehicle]):
+        e_lat = np.fromiter((e.location.latitude for e in emergencies), dtype=np.float64, count=len(emergencies))
+        e_lon = np.fromiter((e.location.longitude for e in emergencies), dtype=np.float64, count=len(emergencies))
+        v_lat, v_lon = self._fleet_arrays(vehicles)
+        distances = haversine_matrix(e_lat, e_lon, v_lat, v_lon)
+        when = self._clock()
+        seconds = self.table.eta_matrix(e_lat, e_lon, v_lat, v_lon, when)
+        missing = np.isnan(seconds)
+        if missing.any():
+            factor = self.detour_factor * self.table.band_for(when).time_factor
+            seconds[missing] = distances[missing] * factor / self.fallback_speed_kmh * 3600.0
+        return distances, seconds
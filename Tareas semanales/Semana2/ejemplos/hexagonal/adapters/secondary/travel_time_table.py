@@ -0,0 +1,210 @@
+import argparse
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, Sequence, Tuple
+import numpy as np
+from adapters.secondary.geo import haversine_matrix
+from adapters.secondary.spatial_index import KM_PER_DEGREE
+
+# Tablas de tiempos de viaje celda x celda precalculadas offline. Cada franja
+# horaria se guarda como un .npy (float32, segundos) que se abre con
+# mmap_mode="r": varios procesos comparten las mismas páginas del sistema
+# operativo sin copiar la tabla.
+
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+# Cuánto más larga que la línea recta es, en promedio, la ruta por calles
+DEFAULT_DETOUR_FACTOR = 1.3
+
+@dataclass(frozen=True, slots=True)
+class TimeBand:
+    name: str
+    start_hour: int
+    end_hour: int
+    time_factor: float  # multiplica el tiempo de flujo libre
+
+DEFAULT_TIME_BANDS = (
+    TimeBand("night", 0, 6, 0.8),
+    TimeBand("morning_peak", 6, 10, 1.3),
+    TimeBand("midday", 10, 16, 1.05),
+    TimeBand("evening_peak", 16, 20, 1.3),
+    TimeBand("evening", 20, 24, 0.9)
+)
+
+@dataclass(frozen=True, slots=True)
+class TravelTimeGrid:
+    # Grilla regular en grados; las celdas se numeran fila por fila
+    min_lat: float
+    min_lon: float
+    rows: int
+    cols: int
+    cell_lat: float
+    cell_lon: float
+
+    @classmethod
+    def around(cls, center_lat: float, center_lon: float, radius_km: float, cell_size_km: float) -> "TravelTimeGrid":
+        cell_lat = cell_size_km / KM_PER_DEGREE
+        cell_lon = cell_size_km / (KM_PER_DEGREE * math.cos(math.radians(center_lat)))
+        cells_per_side = max(1, math.ceil(2 * radius_km / cell_size_km))
+        return cls(
+            min_lat=center_lat - cells_per_side * cell_lat / 2,
+            min_lon=center_lon - cells_per_side * cell_lon / 2,
+            rows=cells_per_side,
+            cols=cells_per_side,
+            cell_lat=cell_lat,
+            cell_lon=cell_lon
+        )
+
+    @property
+    def cell_count(self) -> int:
+        return self.rows * self.cols
+
+    def cell_index(self, latitudes, longitudes) -> np.ndarray:
+        # Índice de celda por punto, -1 si cae fuera de la grilla
+        row = np.floor((np.asarray(latitudes, dtype=np.float64) - self.min_lat) / self.cell_lat).astype(np.int64)
+        col = np.floor((np.asarray(longitudes, dtype=np.float64) - self.min_lon) / self.cell_lon).astype(np.int64)
+        inside = (row >= 0) & (row < self.rows) & (col >= 0) & (col < self.cols)
+        return np.where(inside, row * self.cols + col, -1)
+
+    def centroids(self) -> Tuple[np.ndarray, np.ndarray]:
+        row, col = np.divmod(np.arange(self.cell_count), self.cols)
+        return self.min_lat + (row + 0.5) * self.cell_lat, self.min_lon + (col + 0.5) * self.cell_lon
+
+
+# Un "origen de tiempos" devuelve la matriz de segundos (flujo libre) desde
+# un bloque de celdas de origen hacia todas las celdas
+TravelTimeSource = Callable[[np.ndarray], np.ndarray]
+
+def straight_line_travel_times(grid: TravelTimeGrid, speed_kmh: float = 40.0,
+                               detour_factor: float = DEFAULT_DETOUR_FACTOR) -> TravelTimeSource:
+    # Aproximación sin red vial: distancia haversine corregida por un factor de desvío
+    lat, lon = grid.centroids()
+
+    def rows(origin_cells: np.ndarray) -> np.ndarray:
+        distances = haversine_matrix(lat[origin_cells], lon[origin_cells], lat, lon)
+        return distances * detour_factor / speed_kmh * 3600.0
+
+    return rows
+
+def road_graph_travel_times(grid: TravelTimeGrid, graph) -> TravelTimeSource:
+    # Tiempos por la red vial entre los nodos más cercanos a cada centroide
+    lat, lon = grid.centroids()
+    nodes = np.array([graph.nearest_node(float(a), float(b)) for a, b in zip(lat, lon)], dtype=np.int64)
+
+    def rows(origin_cells: np.ndarray) -> np.ndarray:
+        return np.stack([graph.travel_times_from(int(nodes[cell]))[nodes] for cell in origin_cells])
+
+    return rows
+
+def build_travel_time_tables(
+    directory: str,
+    grid: TravelTimeGrid,
+    source: TravelTimeSource,
+    bands: Sequence[TimeBand] = DEFAULT_TIME_BANDS,
+    block_rows: int = 256
+) -> None:
+    # Escribe una tabla por franja directamente en disco, de a bloques de
+    # filas, para no tener la matriz completa en memoria
+    os.makedirs(directory, exist_ok=True)
+    cells = grid.cell_count
+    tables = {
+        band.name: np.lib.format.open_memmap(
+            os.path.join(directory, f"{band.name}.npy"), mode="w+", dtype=np.float32, shape=(cells, cells)
+        )
+        for band in bands
+    }
+    for start in range(0, cells, block_rows):
+        origin_cells = np.arange(start, min(start + block_rows, cells))
+        base = source(origin_cells)
+        base[~np.isfinite(base)] = np.nan
+        for band in bands:
+            tables[band.name][start:start + len(origin_cells)] = base * band.time_factor
+    for table in tables.values():
+        table.flush()
+    del tables
+
+    # meta.json se escribe al final: sin él el directorio no se considera válido
+    meta = {"version": FORMAT_VERSION, "grid": asdict(grid), "bands": [asdict(band) for band in bands]}
+    temporary = os.path.join(directory, META_FILE + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(temporary, os.path.join(directory, META_FILE))
+
+
+class TravelTimeTable:
+    # Consulta de ETAs sobre las tablas mapeadas en memoria: cada par
+    # (origen, destino) es una lectura indexada, sin cálculo de rutas
+
+    def __init__(self, grid: TravelTimeGrid, bands: Sequence[TimeBand], tables: Dict[str, np.ndarray]):
+        self.grid = grid
+        self.bands = tuple(bands)
+        self.tables = tables
+        self._band_by_hour = [None] * 24
+        for band in self.bands:
+            for hour in range(band.start_hour, band.end_hour):
+                self._band_by_hour[hour] = band
+
+    @classmethod
+    def open(cls, directory: str) -> "TravelTimeTable":
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported travel time table version: {meta.get('version')}")
+        grid = TravelTimeGrid(**meta["grid"])
+        bands = [TimeBand(**band) for band in meta["bands"]]
+        tables = {
+            band.name: np.load(os.path.join(directory, f"{band.name}.npy"), mmap_mode="r") for band in bands
+        }
+        return cls(grid, bands, tables)
+
+    def band_for(self, when: datetime) -> TimeBand:
+        band = self._band_by_hour[when.hour]
+        if band is None:
+            raise ValueError(f"No time band covers hour {when.hour}")
+        return band
+
+    def eta_matrix(self, dest_lats, dest_lons, origin_lats, origin_lons, when: datetime = None) -> np.ndarray:
+        # Matriz N x M (destinos x orígenes) en segundos; NaN si algún punto
+        # cae fuera de la grilla o no hay camino
+        table = self.tables[self.band_for(when or datetime.now()).name]
+        dest_cells = self.grid.cell_index(dest_lats, dest_lons)
+        origin_cells = self.grid.cell_index(origin_lats, origin_lons)
+        seconds = table[np.maximum(origin_cells, 0)[None, :], np.maximum(dest_cells, 0)[:, None]]
+        seconds = seconds.astype(np.float64)
+        # Dentro de una misma celda la tabla no distingue distancias: NaN
+        # para que el llamador use su estimación directa
+        outside = (dest_cells < 0)[:, None] | (origin_cells < 0)[None, :]
+        seconds[outside | (dest_cells[:, None] == origin_cells[None, :])] = np.nan
+        return seconds
+
+    def eta_seconds(self, origin_lats, origin_lons, dest_lat: float, dest_lon: float,
+                    when: datetime = None) -> np.ndarray:
+        return self.eta_matrix([dest_lat], [dest_lon], origin_lats, origin_lons, when)[0]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Precalcula tablas de tiempos de viaje por franja horaria")
+    parser.add_argument("output", help="directorio de salida")
+    parser.add_argument("--center-lat", type=float, default=40.7128)
+    parser.add_argument("--center-lon", type=float, default=-74.0060)
+    parser.add_argument("--radius-km", type=float, default=15.0)
+    parser.add_argument("--cell-km", type=float, default=0.5)
+    parser.add_argument("--road-graph", help="archivo vectorial de calles (si no, línea recta)")
+    parser.add_argument("--layer")
+    parser.add_argument("--speed-kmh", type=float, default=40.0, help="velocidad para la aproximación en línea recta")
+    args = parser.parse_args(argv)
+
+    grid = TravelTimeGrid.around(args.center_lat, args.center_lon, args.radius_km, args.cell_km)
+    if args.road_graph:
+        from adapters.secondary.road_graph import RoadGraph
+        source = road_graph_travel_times(grid, RoadGraph.from_file(args.road_graph, layer=args.layer))
+    else:
+        source = straight_line_travel_times(grid, args.speed_kmh)
+    build_travel_time_tables(args.output, grid, source)
+    print(f"{grid.cell_count} celdas x {len(DEFAULT_TIME_BANDS)} franjas en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,27 @@
-from flask import Flask
+import os
+from flask import Flask, Response
+from werkzeug.serving import is_running_from_reloader
+from adapters.primary.container import AppContainer
+from adapters.primary.web_adapter import emergency_bp
+from adapters.primary.udp_position_listener import UdpPositionListener
 
-def create_app():
+def create_app(container: AppContainer = None, udp_listener: bool = True, warm_up: bool = True):
+    # Crear la aplicación no construye adaptadores: eso pasa en warm_up (en
+    # segundo plano) o en el primer request que los necesite
     app = Flask(__name__)
+    container = container or AppContainer.from_env()
+    app.extensions["container"] = container
+    app.register_blueprint(emergency_bp)
+    
+    # Pings por UDP opcionales (GPS_UDP_PORT=9999), abiertos al terminar el warm-up
+    if udp_listener and os.environ.get("GPS_UDP_PORT"):
+        def start_udp_listener(container: AppContainer) -> None:
+            listener = UdpPositionListener(container.position_ingestion, port=int(os.environ["GPS_UDP_PORT"]))
+            listener.start()
+            app.extensions["udp_position_listener"] = listener
+        container.on_warm_up(start_udp_listener)
+    if warm_up:
+        container.start_warm_up()
     
     # Ruta de bienvenida
     @app.route('/')
@@ -9,14 +29,34 @@ def create_app():
         return {
             "message": "Sistema de Optimización de Rutas de Emergencia",
             "endpoints": {
-                "get_route": "/api/emergency/routes/<emergency_id>",
+                "get_route": "/api/emergency/routes/<emergency_id>?encoding=<points|delta|polyline>&precision=5&simplify=<m>",
                 "get_all_routes": "/api/emergency/routes",
-                "get_available_vehicles": "/api/emergency/vehicles/available?type=<vehicle_type>"
+                "stream_all_routes": "/api/emergency/routes?stream=<ndjson|sse>",
+                "get_available_vehicles": "/api/emergency/vehicles/available?type=<vehicle_type>",
+                "post_vehicle_positions": "/api/emergency/vehicles/positions",
+                "post_dispatch": "/api/emergency/dispatch",
+                "complete_dispatch": "/api/emergency/dispatch/<emergency_id>/complete",
+                "dispatch_stats": "/api/emergency/dispatch/stats",
+                "metrics": "/metrics",
+                "ready": "/ready"
             }
         }
     
+    # Latencias por puerto en formato de texto de Prometheus
+    @app.route('/metrics')
+    def metrics():
+        return Response(container.metrics_registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
+    
+    # Readiness: 503 hasta que el warm-up dejó todo construido
+    @app.route('/ready')
+    def ready():
+        return container.readiness(), 200 if container.ready else 503
+    
     return app
 
 if __name__ == '__main__':
-    app = create_app()
+    # Con debug=True el reloader ejecuta este módulo en dos procesos; solo
+    # el hijo (el que atiende requests) hace el warm-up y abre el puerto UDP
+    serving = is_running_from_reloader()
+    app = create_app(udp_listener=serving, warm_up=serving)
     app.run(debug=True, port=5000)
\ No newline at end of file
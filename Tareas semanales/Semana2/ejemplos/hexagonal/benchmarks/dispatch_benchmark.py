@@ -0,0 +1,233 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+from app import create_app
+from adapters.primary.container import AppContainer, ContainerSettings
+from adapters.secondary.emergency_repository import InMemoryEmergencyRepository, InMemoryVehicleRepository
+from adapters.secondary.numpy_route_optimizer import NumpyRouteOptimizer
+from adapters.secondary.snapshot import build_stores, save_snapshot
+from adapters.secondary.route_optimizer import SimpleRouteOptimizer
+from benchmarks.synthetic_city import SyntheticCity
+from services.route_service import RouteService
+
+# Uso (desde la carpeta hexagonal):
+#   python -m benchmarks.dispatch_benchmark --output results.json
+#   python -m benchmarks.dispatch_benchmark --quick --compare results.json
+
+OPTIMIZERS = {
+    "simple": SimpleRouteOptimizer,
+    "numpy": NumpyRouteOptimizer
+}
+DEFAULT_FLEET_SIZES = [10, 100, 1_000, 10_000, 100_000]
+QUICK_FLEET_SIZES = [10, 1_000]
+
+def latency_summary(seconds) -> dict:
+    values = np.asarray(seconds, dtype=np.float64) * 1000
+    return {
+        "samples": int(len(values)),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max())
+    }
+
+def bench_optimizer(city: SyntheticCity, fleet_size: int, optimizer_name: str, samples: int) -> dict:
+    # El optimizador solo, contra toda la flota (sin índice espacial)
+    vehicles = city.vehicles(fleet_size)
+    emergencies = city.emergencies(samples)
+    optimizer = OPTIMIZERS[optimizer_name]()
+    timings = []
+    for emergency in emergencies:
+        start = time.perf_counter()
+        optimizer.find_optimal_route(emergency, vehicles)
+        timings.append(time.perf_counter() - start)
+    return {"benchmark": "optimizer", "variant": optimizer_name, "fleet_size": fleet_size, **latency_summary(timings)}
+
+def bench_single_dispatch(city: SyntheticCity, fleet_size: int, optimizer_name: str, samples: int) -> dict:
+    # RouteService completo: índice espacial + optimizador + reserva
+    emergencies = city.emergencies(samples)
+    vehicle_repository = InMemoryVehicleRepository(city.vehicles(fleet_size))
+    service = RouteService(
+        InMemoryEmergencyRepository(emergencies), vehicle_repository, OPTIMIZERS[optimizer_name]()
+    )
+    timings = []
+    for emergency in emergencies:
+        start = time.perf_counter()
+        route = service.get_optimal_route_for_emergency(emergency.id)
+        timings.append(time.perf_counter() - start)
+        # Devolver la unidad para que la flota no se agote con flotas chicas
+        vehicle_repository.update_vehicle_status(route.vehicle.id, True)
+    return {"benchmark": "dispatch", "variant": optimizer_name, "fleet_size": fleet_size, **latency_summary(timings)}
+
+def bench_batch_endpoint(city: SyntheticCity, fleet_size: int, emergency_count: int, mode: str,
+                         requests: int) -> dict:
+    # Endpoint /api/emergency/routes a través del cliente de pruebas de Flask
+    url = "/api/emergency/routes" + ("?mode=batch" if mode == "batch" else "")
+    emergencies = city.emergencies(emergency_count)
+    vehicles = city.vehicles(fleet_size)
+
+    timings = []
+    assigned = 0
+    for _ in range(requests):
+        # Estado nuevo por request (fuera de la medición): el despacho consume la flota
+        for vehicle in vehicles:
+            vehicle.available = True
+        # Mismo cableado que la aplicación (instrumentación incluida), con
+        # los repositorios de la ciudad sintética inyectados en el contenedor
+        container = AppContainer(
+            base_emergency_repository=InMemoryEmergencyRepository(emergencies),
+            base_vehicle_repository=InMemoryVehicleRepository(vehicles)
+        )
+        client = create_app(container, udp_listener=False, warm_up=False).test_client()
+        container.route_service  # cableado fuera de la medición
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assigned = sum(1 for route in response.get_json()["routes"] if "vehicle_id" in route)
+
+    total = sum(timings)
+    return {
+        "benchmark": "batch_endpoint",
+        "variant": mode,
+        "fleet_size": fleet_size,
+        "emergencies": emergency_count,
+        "assigned": assigned,
+        "requests_per_s": requests / total,
+        "emergencies_per_s": requests * emergency_count / total,
+        **latency_summary(timings)
+    }
+
+def bench_startup(city: SyntheticCity, fleet_size: int, emergency_count: int) -> dict:
+    # Tiempo hasta /ready: flota construida desde entidades vs snapshot mapeado
+    vehicles = city.vehicles(fleet_size)
+    emergencies = city.emergencies(emergency_count)
+    with tempfile.TemporaryDirectory() as directory:
+        save_snapshot(directory, *build_stores(vehicles, emergencies))
+
+        start = time.perf_counter()
+        container = AppContainer(
+            base_emergency_repository=InMemoryEmergencyRepository(city.emergencies(emergency_count)),
+            base_vehicle_repository=InMemoryVehicleRepository(city.vehicles(fleet_size))
+        )
+        container.warm_up()
+        from_entities = time.perf_counter() - start
+        container.close()
+
+        start = time.perf_counter()
+        container = AppContainer(ContainerSettings(snapshot_dir=directory))
+        container.warm_up()
+        from_snapshot = time.perf_counter() - start
+        container.close()
+    return {
+        "benchmark": "startup",
+        "variant": "snapshot",
+        "fleet_size": fleet_size,
+        "from_entities_ms": from_entities * 1000,
+        "from_snapshot_ms": from_snapshot * 1000,
+        "p95_ms": from_snapshot * 1000
+    }
+
+def bench_peak_memory(city: SyntheticCity, fleet_size: int, samples: int) -> dict:
+    # Memoria máxima para construir la flota y despachar (medido aparte porque
+    # tracemalloc distorsiona los tiempos)
+    tracemalloc.start()
+    try:
+        emergencies = city.emergencies(samples)
+        vehicle_repository = InMemoryVehicleRepository(city.vehicles(fleet_size))
+        service = RouteService(InMemoryEmergencyRepository(emergencies), vehicle_repository, NumpyRouteOptimizer())
+        for emergency in emergencies:
+            route = service.get_optimal_route_for_emergency(emergency.id)
+            vehicle_repository.update_vehicle_status(route.vehicle.id, True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"benchmark": "peak_memory", "variant": "numpy", "fleet_size": fleet_size, "peak_mb": peak / 1e6}
+
+def run(args) -> dict:
+    city = SyntheticCity(seed=args.seed)
+    fleet_sizes = args.fleet_sizes or (QUICK_FLEET_SIZES if args.quick else DEFAULT_FLEET_SIZES)
+    results = []
+    for fleet_size in fleet_sizes:
+        for optimizer_name in OPTIMIZERS:
+            results.append(bench_optimizer(city, fleet_size, optimizer_name, args.samples))
+            results.append(bench_single_dispatch(city, fleet_size, optimizer_name, args.samples))
+        if fleet_size <= args.max_endpoint_fleet:
+            for mode in ("greedy", "batch"):
+                results.append(bench_batch_endpoint(city, fleet_size, args.emergencies, mode, args.requests))
+        results.append(bench_startup(city, fleet_size, args.emergencies))
+        results.append(bench_peak_memory(city, fleet_size, min(args.samples, 50)))
+        print(f"fleet_size={fleet_size} listo", file=sys.stderr)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "samples": args.samples,
+            "emergencies": args.emergencies,
+            "requests": args.requests
+        },
+        "results": results
+    }
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    # Regresiones: latencias que suben o throughput que baja más de la tolerancia
+    def key(result):
+        return (result["benchmark"], result["variant"], result["fleet_size"])
+
+    previous = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        for metric, higher_is_worse in (("p95_ms", True), ("peak_mb", True), ("emergencies_per_s", False)):
+            if metric not in result or metric not in old or not old[metric]:
+                continue
+            ratio = result[metric] / old[metric]
+            if (higher_is_worse and ratio > 1 + tolerance) or (not higher_is_worse and ratio < 1 - tolerance):
+                regressions.append({"key": list(key(result)), "metric": metric,
+                                    "baseline": old[metric], "current": result[metric], "ratio": ratio})
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de despacho de emergencias")
+    parser.add_argument("--fleet-sizes", type=int, nargs="+", help="tamaños de flota a medir")
+    parser.add_argument("--quick", action="store_true", help="solo flotas chicas (CI)")
+    parser.add_argument("--samples", type=int, default=200, help="despachos por medición")
+    parser.add_argument("--emergencies", type=int, default=200, help="emergencias activas en el endpoint")
+    parser.add_argument("--requests", type=int, default=5, help="requests al endpoint por modo")
+    parser.add_argument("--max-endpoint-fleet", type=int, default=10_000,
+                        help="flota máxima para medir el endpoint (se reconstruye por request)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="tolerancia relativa de regresión")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import math
+from typing import List
+import numpy as np
+from domain.entities import Emergency, EmergencyVehicle, Location
+from adapters.secondary.spatial_index import KM_PER_DEGREE
+
+EMERGENCY_TYPES = ("medical", "fire", "crime")
+EMERGENCY_TYPE_WEIGHTS = (0.6, 0.15, 0.25)
+VEHICLE_TYPES = ("ambulance", "fire_truck", "police_car")
+VEHICLE_TYPE_WEIGHTS = (0.5, 0.2, 0.3)
+PRIORITY_WEIGHTS = (0.1, 0.2, 0.3, 0.25, 0.15)  # prioridades 1..5
+
+class SyntheticCity:
+    # Generador reproducible de emergencias y flota. Los vehículos se agrupan
+    # alrededor de bases y las emergencias alrededor de zonas calientes, ambos
+    # dentro de un radio alrededor del centro de la ciudad.
+
+    def __init__(self, seed: int = 42, center_lat: float = 40.7128, center_lon: float = -74.0060,
+                 radius_km: float = 15.0, stations: int = 40, hotspots: int = 25):
+        self.seed = seed
+        self.center_lat = center_lat
+        self.center_lon = center_lon
+        self.radius_km = radius_km
+        rng = np.random.default_rng(seed)
+        self._stations = self._uniform_points(rng, stations)
+        self._hotspots = self._uniform_points(rng, hotspots)
+
+    def vehicles(self, count: int) -> List[EmergencyVehicle]:
+        rng = np.random.default_rng([self.seed, 1, count])
+        lat, lon = self._clustered_points(rng, self._stations, count, spread_km=1.5)
+        types = rng.choice(len(VEHICLE_TYPES), size=count, p=VEHICLE_TYPE_WEIGHTS)
+        return [
+            EmergencyVehicle(
+                id=f"vehicle_{index}",
+                current_location=Location(latitude=float(lat[index]), longitude=float(lon[index])),
+                type=VEHICLE_TYPES[types[index]]
+            )
+            for index in range(count)
+        ]
+
+    def emergencies(self, count: int) -> List[Emergency]:
+        rng = np.random.default_rng([self.seed, 2, count])
+        lat, lon = self._clustered_points(rng, self._hotspots, count, spread_km=3.0)
+        types = rng.choice(len(EMERGENCY_TYPES), size=count, p=EMERGENCY_TYPE_WEIGHTS)
+        priorities = rng.choice(5, size=count, p=PRIORITY_WEIGHTS) + 1
+        return [
+            Emergency(
+                id=f"emergency_{index}",
+                location=Location(latitude=float(lat[index]), longitude=float(lon[index])),
+                emergency_type=EMERGENCY_TYPES[types[index]],
+                priority=int(priorities[index])
+            )
+            for index in range(count)
+        ]
+
+    def _uniform_points(self, rng: np.random.Generator, count: int):
+        # Uniforme en el disco (sqrt para no concentrar puntos en el centro)
+        radius = self.radius_km * np.sqrt(rng.random(count))
+        angle = rng.random(count) * 2 * math.pi
+        return self._offset(radius * np.cos(angle), radius * np.sin(angle))
+
+    def _clustered_points(self, rng: np.random.Generator, centers, count: int, spread_km: float):
+        center_lat, center_lon = centers
+        chosen = rng.integers(0, len(center_lat), size=count)
+        north_km = rng.normal(0.0, spread_km, size=count)
+        east_km = rng.normal(0.0, spread_km, size=count)
+        lat = center_lat[chosen] + north_km / KM_PER_DEGREE
+        lon = center_lon[chosen] + east_km / (KM_PER_DEGREE * math.cos(math.radians(self.center_lat)))
+        return lat, lon
+
+    def _offset(self, north_km: np.ndarray, east_km: np.ndarray):
+        lat = self.center_lat + north_km / KM_PER_DEGREE
+        lon = self.center_lon + east_km / (KM_PER_DEGREE * math.cos(math.radians(self.center_lat)))
+        return lat, lon
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate, Route
+
+class AsyncMapServicePort(ABC):
+    @abstractmethod
+    async def get_route(self, start: Location, end: Location) -> Route:
+        pass
+    
+    @abstractmethod
+    async def get_traffic_data(self, location: Location) -> float:
+        pass
+
+class AsyncEmergencyRepositoryPort(ABC):
+    @abstractmethod
+    async def get_active_emergencies(self) -> List[Emergency]:
+        pass
+    
+    @abstractmethod
+    async def get_emergency_by_id(self, emergency_id: str) -> Emergency:
+        pass
+
+class AsyncVehicleRepositoryPort(ABC):
+    @abstractmethod
+    async def get_available_vehicles(self, vehicle_type: str = None) -> List[EmergencyVehicle]:
+        pass
+    
+    @abstractmethod
+    async def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        pass
+    
+    @abstractmethod
+    async def try_reserve(self, vehicle_id: str) -> bool:
+        pass
+    
+    @abstractmethod
+    async def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        pass
+    
+    @abstractmethod
+    async def nearest_available(
+        self,
+        location: Location,
+        vehicle_type: str = None,
+        k: int = 1,
+        max_radius_km: Optional[float] = None
+    ) -> List[EmergencyVehicle]:
+        pass
+    
+    async def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        # Igual que en VehicleRepositoryPort: genérica y sin control de orden
+        applied = 0
+        for update in updates:
+            if await self.update_vehicle_location(update.vehicle_id, Location(update.latitude, update.longitude)):
+                applied += 1
+        return applied
+
+class AsyncRouteOptimizerPort(ABC):
+    @abstractmethod
+    async def find_optimal_route(self, emergency: Emergency, available_vehicles: List[EmergencyVehicle]) -> Route:
+        pass
+    
+    @abstractmethod
+    async def distance_matrix(self, emergencies: List[Emergency], vehicles: List[EmergencyVehicle]) -> List[List[float]]:
+        pass
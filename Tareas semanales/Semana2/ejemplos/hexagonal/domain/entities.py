@@ -1,20 +1,27 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, Iterator, List, Sequence
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     latitude: float
     longitude: float
     address: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class EmergencyVehicle:
     id: str
     current_location: Location
     type: str  # ambulance, fire_truck, police_car
     available: bool = True
 
-@dataclass
+@dataclass(slots=True)
+class PositionUpdate:
+    vehicle_id: str
+    latitude: float
+    longitude: float
+    timestamp: float  # epoch en segundos, según el GPS del vehículo
+
+@dataclass(slots=True)
 class TypeEmergency:
     id: str
     location: Location
@@ -22,10 +29,64 @@ class TypeEmergency:
     priority: int  # 1 (highest) to 5 (lowest)
     description: str = ""
 
-@dataclass
+class LazyPath(Sequence[Location]):
+    # Recorrido que se calcula recién la primera vez que alguien lo lee y
+    # queda memorizado. Elegir y asignar rutas solo usa tiempo y distancia.
+    __slots__ = ("_factory", "_args", "_locations")
+
+    def __init__(self, factory: Callable[..., Sequence[Location]], *args):
+        self._factory = factory
+        self._args = args
+        self._locations = None
+
+    @classmethod
+    def resolved(cls, locations: Sequence[Location]) -> "LazyPath":
+        path = cls(list, locations)
+        path._locations = list(locations)
+        return path
+
+    @property
+    def materialized(self) -> bool:
+        return self._locations is not None
+
+    def _resolve(self) -> List[Location]:
+        # Si dos hilos llegan a la vez ambos calculan lo mismo; gana el último
+        locations = self._locations
+        if locations is None:
+            locations = list(self._factory(*self._args))
+            self._locations = locations
+        return locations
+
+    def __len__(self) -> int:
+        return len(self._resolve())
+
+    def __getitem__(self, index):
+        return self._resolve()[index]
+
+    def __iter__(self) -> Iterator[Location]:
+        return iter(self._resolve())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyPath):
+            other = other._resolve()
+        return self._resolve() == other
+
+    def __repr__(self) -> str:
+        return repr(self._locations) if self._locations is not None else "LazyPath(<pending>)"
+
+    def __reduce__(self):
+        # Entre procesos viaja sin calcular si todavía no se leyó
+        if self._locations is None:
+            return (LazyPath, (self._factory, *self._args))
+        return (LazyPath.resolved, (self._locations,))
+
+@dataclass(slots=True)
 class Route:
     vehicle: EmergencyVehicle
     emergency: TypeEmergency
-    path: List[Location]
+    path: Sequence[Location]  # lista o LazyPath
     estimated_time: float  # in minutes
-    distance: float  # in kilometers
\ No newline at end of file
+    distance: float  # in kilometers
+
+# Alias usado por los puertos y servicios
+Emergency = TypeEmergency
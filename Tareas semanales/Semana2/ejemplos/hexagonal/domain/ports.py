@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List
-from domain.entities import Emergency, EmergencyVehicle, Location, Route
+from typing import List, Optional
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate, Route
 
 class MapServicePort(ABC):
     @abstractmethod
@@ -28,8 +28,44 @@ class VehicleRepositoryPort(ABC):
     @abstractmethod
     def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
         pass
+    
+    @abstractmethod
+    def try_reserve(self, vehicle_id: str) -> bool:
+        # Compare-and-set atómico: marca el vehículo como no disponible solo
+        # si todavía lo estaba. Devuelve False si otro despacho lo tomó antes.
+        pass
+    
+    @abstractmethod
+    def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        pass
+    
+    @abstractmethod
+    def nearest_available(
+        self,
+        location: Location,
+        vehicle_type: str = None,
+        k: int = 1,
+        max_radius_km: Optional[float] = None
+    ) -> List[EmergencyVehicle]:
+        pass
+    
+    def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        # Actualización masiva de posiciones; devuelve cuántas se aplicaron.
+        # Implementación genérica sin control de orden: los repositorios que
+        # guardan el timestamp la reemplazan para descartar pings atrasados.
+        return sum(
+            1 for update in updates
+            if self.update_vehicle_location(update.vehicle_id, Location(update.latitude, update.longitude))
+        )
 
 class RouteOptimizerPort(ABC):
     @abstractmethod
     def find_optimal_route(self, emergency: Emergency, available_vehicles: List[EmergencyVehicle]) -> Route:
-        pass
\ No newline at end of file
+        pass
+    
+    def distance_matrix(self, emergencies: List[Emergency], vehicles: List[EmergencyVehicle]) -> List[List[float]]:
+        # Implementación genérica (par a par); los optimizadores vectorizados la reemplazan
+        return [
+            [self.find_optimal_route(emergency, [vehicle]).distance for vehicle in vehicles]
+            for emergency in emergencies
+        ]
\ No newline at end of file
@@ -0,0 +1,91 @@
+import numpy as np
+
+# Penalizaciones (en km equivalentes) del despacho por lotes
+TYPE_MISMATCH_PENALTY_KM = 1_000.0
+UNASSIGNED_PENALTY_KM = 100_000.0
+
+def solve_assignment(cost) -> np.ndarray:
+    # Asignación de costo mínimo (método húngaro, O(n² m)) sobre una matriz
+    # rectangular. Devuelve para cada fila la columna asignada, o -1 si hay
+    # más filas que columnas y la fila quedó sin asignar.
+    cost = np.asarray(cost, dtype=np.float64)
+    rows, cols = cost.shape
+    if rows == 0 or cols == 0:
+        return np.full(rows, -1, dtype=np.int64)
+    if rows > cols:
+        col_to_row = solve_assignment(cost.T)
+        result = np.full(rows, -1, dtype=np.int64)
+        assigned = col_to_row >= 0
+        result[col_to_row[assigned]] = np.flatnonzero(assigned)
+        return result
+
+    # Potenciales u (filas) y v (columnas); índice 0 es centinela
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    owner = np.zeros(cols + 1, dtype=np.int64)  # fila (1-based) dueña de cada columna
+    way = np.zeros(cols + 1, dtype=np.int64)
+
+    for row in range(1, rows + 1):
+        owner[0] = row
+        current_col = 0
+        min_reduced = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+
+        while True:
+            used[current_col] = True
+            current_row = owner[current_col]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            free = ~used[1:]
+            improve = free & (reduced < min_reduced[1:])
+            min_reduced[1:][improve] = reduced[improve]
+            way[1:][improve] = current_col
+
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+
+            current_col = next_col
+            if owner[current_col] == 0:
+                break
+
+        # Invertir el camino aumentante
+        while current_col:
+            previous = way[current_col]
+            owner[current_col] = owner[previous]
+            current_col = previous
+
+    result = np.full(rows, -1, dtype=np.int64)
+    assigned_cols = np.flatnonzero(owner[1:])
+    result[owner[1:][assigned_cols] - 1] = assigned_cols
+    return result
+
+def assign_emergencies(
+    emergencies,
+    vehicles,
+    distances,
+    wanted_types,
+    mismatch_penalty_km: float = TYPE_MISMATCH_PENALTY_KM,
+    unassigned_penalty_km: float = UNASSIGNED_PENALTY_KM
+) -> np.ndarray:
+    # Arma la matriz de costos emergencia x vehículo y devuelve, para cada
+    # emergencia, el índice del vehículo asignado o -1
+    distances = np.asarray(distances, dtype=np.float64)
+
+    # Prioridad 1 pesa 5 veces más que prioridad 5
+    weights = np.array([6 - min(max(e.priority, 1), 5) for e in emergencies], dtype=np.float64)[:, None]
+
+    wanted = np.array([wanted_type or "" for wanted_type in wanted_types])
+    vehicle_types = np.array([v.type for v in vehicles])
+    mismatch = (wanted[:, None] != vehicle_types[None, :]) & (wanted[:, None] != "")
+
+    cost = (distances + mismatch * mismatch_penalty_km) * weights
+    # Columnas ficticias: dejar una emergencia sin vehículo cuesta más
+    # mientras más prioritaria sea
+    unassigned = np.repeat(weights * unassigned_penalty_km, len(emergencies), axis=1)
+    assignment = solve_assignment(np.hstack([cost, unassigned]))
+    assignment[assignment >= len(vehicles)] = -1
+    return assignment
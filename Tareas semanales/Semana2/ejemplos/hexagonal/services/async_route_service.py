@@ -0,0 +1,175 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Iterator
+from domain.async_ports import AsyncEmergencyRepositoryPort, AsyncVehicleRepositoryPort, AsyncRouteOptimizerPort
+from domain.entities import Route, Emergency
+from services.assignment import assign_emergencies, TYPE_MISMATCH_PENALTY_KM, UNASSIGNED_PENALTY_KM
+from services.route_service import VEHICLE_TYPE_BY_EMERGENCY
+
+class AsyncRouteService:
+    # Variante asíncrona de RouteService: las emergencias independientes se
+    # evalúan en paralelo, con un máximo de max_concurrency a la vez.
+    TYPE_MISMATCH_PENALTY_KM = TYPE_MISMATCH_PENALTY_KM
+    UNASSIGNED_PENALTY_KM = UNASSIGNED_PENALTY_KM
+
+    def __init__(
+        self,
+        emergency_repository: AsyncEmergencyRepositoryPort,
+        vehicle_repository: AsyncVehicleRepositoryPort,
+        route_optimizer: AsyncRouteOptimizerPort,
+        candidate_limit: int = 5,
+        max_concurrency: int = 16
+    ):
+        self.emergency_repository = emergency_repository
+        self.vehicle_repository = vehicle_repository
+        self.route_optimizer = route_optimizer
+        self.candidate_limit = candidate_limit
+        self.max_concurrency = max_concurrency
+
+    async def get_optimal_route_for_emergency(self, emergency_id: str) -> Route:
+        emergency = await self.emergency_repository.get_emergency_by_id(emergency_id)
+
+        if not emergency:
+            raise ValueError(f"Emergency with id {emergency_id} not found")
+
+        return await self._dispatch(emergency)
+
+    async def get_all_active_emergencies_with_routes(self, batch: bool = False) -> list:
+        # Resultados en el orden de las emergencias
+        return list(await asyncio.gather(*await self._result_coroutines(batch)))
+
+    async def iter_active_emergencies_with_routes(self, batch: bool = False) -> AsyncIterator[dict]:
+        # Resultados en orden de finalización, apenas cada uno está listo.
+        # Si el consumidor corta antes, los despachos en curso terminan igual
+        # (cancelarlos podría dejar un vehículo reservado sin ruta informada).
+        for result in asyncio.as_completed(await self._result_coroutines(batch)):
+            yield await result
+
+    async def _result_coroutines(self, batch: bool) -> list:
+        emergencies = await self.emergency_repository.get_active_emergencies()
+        if batch:
+            return await self._dispatch_batch(emergencies)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def dispatch(emergency: Emergency) -> dict:
+            async with semaphore:
+                try:
+                    return {"emergency": emergency, "route": await self._dispatch(emergency)}
+                except Exception as e:
+                    return {"emergency": emergency, "error": str(e)}
+
+        return [dispatch(emergency) for emergency in emergencies]
+
+    async def _dispatch(self, emergency: Emergency) -> Route:
+        vehicle_type = VEHICLE_TYPE_BY_EMERGENCY.get(emergency.emergency_type)
+        route = await self._reserve_route(emergency, vehicle_type)
+
+        if route is None:
+            # Si no hay vehículos del tipo específico, intentar con cualquier tipo
+            route = await self._reserve_route(emergency, None)
+
+        if route is None:
+            raise Exception("No available vehicles")
+
+        return route
+
+    async def _reserve_route(self, emergency: Emergency, vehicle_type: str):
+        # Igual que RouteService: si try_reserve pierde contra otro despacho
+        # se prueba el siguiente candidato
+        attempted = set()
+        while True:
+            vehicles = await self.vehicle_repository.nearest_available(
+                emergency.location, vehicle_type, k=self.candidate_limit + len(attempted)
+            )
+            candidates = [vehicle for vehicle in vehicles if vehicle.id not in attempted]
+            if not candidates:
+                return None
+
+            while candidates:
+                route = await self.route_optimizer.find_optimal_route(emergency, candidates)
+                if await self.vehicle_repository.try_reserve(route.vehicle.id):
+                    return route
+                attempted.add(route.vehicle.id)
+                candidates = [vehicle for vehicle in candidates if vehicle.id != route.vehicle.id]
+
+    async def _dispatch_batch(self, emergencies: list) -> list:
+        # Resuelve la asignación y devuelve una corrutina por emergencia
+        if not emergencies:
+            return []
+
+        async def unassigned(emergency: Emergency) -> dict:
+            return {"emergency": emergency, "error": "No available vehicles"}
+
+        vehicles = await self.vehicle_repository.get_available_vehicles()
+        if not vehicles:
+            return [unassigned(emergency) for emergency in emergencies]
+
+        distances = await self.route_optimizer.distance_matrix(emergencies, vehicles)
+        assignment = assign_emergencies(
+            emergencies,
+            vehicles,
+            distances,
+            [VEHICLE_TYPE_BY_EMERGENCY.get(e.emergency_type) for e in emergencies],
+            self.TYPE_MISMATCH_PENALTY_KM,
+            self.UNASSIGNED_PENALTY_KM
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def build(emergency: Emergency, column: int) -> dict:
+            async with semaphore:
+                try:
+                    vehicle = vehicles[column]
+                    if await self.vehicle_repository.try_reserve(vehicle.id):
+                        route = await self.route_optimizer.find_optimal_route(emergency, [vehicle])
+                    else:
+                        # Otro despacho tomó el vehículo: asignar el siguiente mejor
+                        route = await self._dispatch(emergency)
+                    return {"emergency": emergency, "route": route}
+                except Exception as e:
+                    return {"emergency": emergency, "error": str(e)}
+
+        return [
+            build(emergency, column) if column >= 0 else unassigned(emergency)
+            for emergency, column in zip(emergencies, assignment.tolist())
+        ]
+
+
+class SyncRouteServiceShim:
+    # Expone un AsyncRouteService con la API síncrona de RouteService, para
+    # que el blueprint de Flask lo use sin cambios. Las corrutinas corren en
+    # un event loop propio dentro de un hilo de fondo.
+
+    def __init__(self, service: AsyncRouteService, timeout: float = None):
+        self.service = service
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-route-service", daemon=True)
+        self._thread.start()
+
+    def get_optimal_route_for_emergency(self, emergency_id: str) -> Route:
+        return self._run(self.service.get_optimal_route_for_emergency(emergency_id))
+
+    def get_all_active_emergencies_with_routes(self, batch: bool = False) -> list:
+        return self._run(self.service.get_all_active_emergencies_with_routes(batch=batch))
+
+    def iter_active_emergencies_with_routes(self, batch: bool = False) -> Iterator[dict]:
+        # Recorre el generador async desde el hilo del llamador, un resultado a la vez
+        generator = self.service.iter_active_emergencies_with_routes(batch=batch)
+        try:
+            while True:
+                try:
+                    yield self._run(generator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(generator.aclose())
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(self.timeout)
@@ -0,0 +1,281 @@
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+from domain.entities import Emergency, Route
+from services.route_service import RouteService, VEHICLE_TYPE_BY_EMERGENCY
+
+# Cuántos despachos fallidos se recuerdan para status()
+MAX_RECENT_FAILURES = 1024
+
+class _WaitStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class DispatchScheduler:
+    # Cola de despacho delante de RouteService. Las emergencias esperan en un
+    # heap ordenado por (prioridad, llegada) y se despachan en micro-lotes
+    # cada interval_seconds; dentro del lote cada nivel de prioridad elige
+    # vehículos antes que el siguiente. Una llamada crítica sin vehículos
+    # libres le quita la unidad a la asignación de menor prioridad, que
+    # vuelve a la cola con su hora de llegada original; status() muestra qué
+    # unidad perdió y, cuando se re-despacha, cuál la reemplazó.
+
+    def __init__(
+        self,
+        route_service: RouteService,
+        interval_seconds: float = 0.05,
+        max_batch: int = 32,
+        preempt_priority: int = 1,
+        on_preempted: Callable[[Emergency, Route], None] = None,
+        clock: Callable[[], float] = monotonic
+    ):
+        self.route_service = route_service
+        self.interval_seconds = interval_seconds
+        self.max_batch = max_batch
+        # Prioridades que pueden desplazar asignaciones (1 = solo las críticas)
+        self.preempt_priority = preempt_priority
+        self.on_preempted = on_preempted
+        self._clock = clock
+        # Entradas (prioridad, llegada, secuencia, emergencia, future)
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        # emergency_id -> future, desde que se encola hasta que se resuelve
+        # (incluye las que están en el lote que se despacha ahora)
+        self._queued: Dict[str, Future] = {}
+        self._dispatching = set()
+        # emergency_id -> (emergencia, ruta, llegada) de los vehículos en curso
+        self._assignments: Dict[str, Tuple[Emergency, Route, float]] = {}
+        # emergency_id -> unidad que le quitaron y emergencia que se la llevó
+        self._preemptions: Dict[str, dict] = {}
+        self._failures: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tick_lock = threading.Lock()
+        self._urgent = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._waits: Dict[int, _WaitStats] = {}
+        self.submitted = 0
+        self.dispatched = 0
+        self.failed = 0
+        self.preempted = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    def submit(self, emergency: Emergency) -> Future:
+        # El future se resuelve con {"emergency", "route"} o {"emergency", "error"}
+        with self._lock:
+            assignment = self._assignments.get(emergency.id)
+            if assignment is not None:
+                # Ya tiene unidad (p. ej. el cliente reintenta tras el 202):
+                # se devuelve esa asignación en vez de reservar otro vehículo
+                future = Future()
+                future.set_result({"emergency": assignment[0], "route": assignment[1]})
+                return future
+            future = self._queued.get(emergency.id)
+            if future is not None:
+                return future
+            future = Future()
+            self._failures.pop(emergency.id, None)
+            self._push(emergency, self._clock(), future)
+            self.submitted += 1
+        if emergency.priority <= self.preempt_priority:
+            # No esperar al próximo intervalo con una llamada crítica en cola
+            self._urgent.set()
+        return future
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def tick(self) -> int:
+        # Despacha un micro-lote; devuelve cuántas emergencias salieron de la cola
+        with self._tick_lock:
+            with self._lock:
+                entries = [heapq.heappop(self._heap) for _ in range(min(self.max_batch, len(self._heap)))]
+                now = self._clock()
+                for priority, enqueued_at, _, emergency, _ in entries:
+                    self._dispatching.add(emergency.id)
+                    self._waits.setdefault(priority, _WaitStats()).add(now - enqueued_at)
+            if not entries:
+                return 0
+
+            # entries ya viene ordenado: se corta en grupos por prioridad
+            for _, group in itertools.groupby(entries, key=lambda entry: entry[0]):
+                self._dispatch_group(list(group))
+            self.batches += 1
+            return len(entries)
+
+    def complete(self, emergency_id: str) -> bool:
+        # La emergencia terminó: se libera su vehículo
+        with self._lock:
+            assignment = self._assignments.pop(emergency_id, None)
+            if assignment is not None:
+                self._preemptions.pop(emergency_id, None)
+        if assignment is None:
+            return False
+        return self.route_service.vehicle_repository.update_vehicle_status(assignment[1].vehicle.id, True)
+
+    def status(self, emergency_id: str) -> Optional[dict]:
+        # Estado de una emergencia para quien encoló sin esperar: queued,
+        # dispatching, assigned (con "result") o failed (con "result"). Si
+        # una llamada crítica le quitó la unidad, "preempted" dice cuál y
+        # quién se la llevó. None si el scheduler no la conoce.
+        with self._lock:
+            assignment = self._assignments.get(emergency_id)
+            if assignment is not None:
+                status = {"state": "assigned", "result": {"emergency": assignment[0], "route": assignment[1]}}
+            elif emergency_id in self._dispatching:
+                status = {"state": "dispatching"}
+            elif emergency_id in self._queued:
+                status = {"state": "queued"}
+            elif emergency_id in self._failures:
+                return dict(self._failures[emergency_id])
+            else:
+                return None
+            preempted = self._preemptions.get(emergency_id)
+        if preempted is not None:
+            status["preempted"] = dict(preempted)
+        return status
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dispatch-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._urgent.set()
+        self._thread.join()
+        self._thread = None
+        while self.tick():
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = {
+                str(priority): {
+                    "count": wait.count,
+                    "mean_seconds": wait.total / wait.count,
+                    "max_seconds": wait.max
+                }
+                for priority, wait in sorted(self._waits.items())
+            }
+            oldest = min((entry[1] for entry in self._heap), default=None)
+            return {
+                "queue_depth": len(self._heap),
+                "max_queue_depth": self.max_depth,
+                "oldest_wait_seconds": 0.0 if oldest is None else self._clock() - oldest,
+                "in_progress": len(self._assignments),
+                "submitted": self.submitted,
+                "dispatched": self.dispatched,
+                "failed": self.failed,
+                "preempted": self.preempted,
+                "batches": self.batches,
+                "wait_by_priority": waits
+            }
+
+    def _push(self, emergency: Emergency, enqueued_at: float, future: Future) -> None:
+        heapq.heappush(self._heap, (emergency.priority, enqueued_at, next(self._seq), emergency, future))
+        self._queued[emergency.id] = future
+        if len(self._heap) > self.max_depth:
+            self.max_depth = len(self._heap)
+
+    def _dispatch_group(self, group: List[tuple]) -> None:
+        entries = {entry[3].id: entry for entry in group}
+        emergencies = [entry[3] for entry in group]
+        try:
+            for result in self.route_service.dispatch_emergencies(emergencies, batch=len(emergencies) > 1):
+                emergency = result["emergency"]
+                _, enqueued_at, _, _, future = entries.pop(emergency.id)
+                if "error" in result and emergency.priority <= self.preempt_priority:
+                    route = self._preempt(emergency, enqueued_at)
+                    if route is not None:
+                        result = {"emergency": emergency, "route": route}
+                self._resolve(result, enqueued_at, future)
+        except Exception as e:
+            # Falló el lote entero (p. ej. el repositorio): se informa a cada una
+            for _, enqueued_at, _, emergency, future in entries.values():
+                self._resolve({"emergency": emergency, "error": str(e)}, enqueued_at, future)
+
+    def _resolve(self, result: dict, enqueued_at: float, future: Future) -> None:
+        emergency = result["emergency"]
+        with self._lock:
+            self._queued.pop(emergency.id, None)
+            self._dispatching.discard(emergency.id)
+            if "route" in result:
+                self._assignments[emergency.id] = (emergency, result["route"], enqueued_at)
+                self.dispatched += 1
+            else:
+                self._failures[emergency.id] = {
+                    "state": "failed",
+                    "result": result,
+                    "preempted": self._preemptions.pop(emergency.id, None)
+                }
+                while len(self._failures) > MAX_RECENT_FAILURES:
+                    self._failures.popitem(last=False)
+                self.failed += 1
+        future.set_result(result)
+
+    def _preempt(self, emergency: Emergency, enqueued_at: float) -> Optional[Route]:
+        with self._lock:
+            victims = [
+                assignment for assignment in self._assignments.values()
+                if assignment[0].priority > emergency.priority
+            ]
+        if not victims:
+            return None
+
+        # Preferir unidades del tipo adecuado y, entre ellas, las de menor prioridad
+        vehicle_type = VEHICLE_TYPE_BY_EMERGENCY.get(emergency.emergency_type)
+        victims = [assignment for assignment in victims if assignment[1].vehicle.type == vehicle_type] or victims
+        lowest = max(assignment[0].priority for assignment in victims)
+        by_vehicle = {assignment[1].vehicle.id: assignment for assignment in victims if assignment[0].priority == lowest}
+        # El vehículo sigue reservado: solo cambia la emergencia a la que va
+        route = self.route_service.route_optimizer.find_optimal_route(
+            emergency, [assignment[1].vehicle for assignment in by_vehicle.values()]
+        )
+        victim, victim_route, victim_enqueued_at = by_vehicle[route.vehicle.id]
+
+        with self._lock:
+            if self._assignments.get(victim.id, (None, None))[1] is not victim_route:
+                # La emergencia terminó o ya fue desplazada mientras se calculaba la ruta
+                return None
+            del self._assignments[victim.id]
+            # El future original ya se resolvió con la unidad perdida: el nuevo
+            # queda en _queued (un submit repetido lo devuelve) y status()
+            # informa el desplazamiento
+            self._preemptions[victim.id] = {
+                "vehicle_id": victim_route.vehicle.id,
+                "by_emergency_id": emergency.id
+            }
+            self._push(victim, victim_enqueued_at, Future())
+            self.preempted += 1
+        if self.on_preempted is not None:
+            self.on_preempted(victim, victim_route)
+        return route
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._urgent.wait(self.interval_seconds)
+            self._urgent.clear()
+            # Con la cola llena se despachan lotes seguidos hasta vaciarla
+            while self.tick() and not self._stop.is_set():
+                pass
@@ -0,0 +1,156 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, Sequence, Tuple
+
+# Límites superiores (segundos) de los buckets de latencia; el último bucket
+# (+Inf) se agrega implícitamente
+DEFAULT_LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+class _Shard:
+    __slots__ = ("thread", "counts", "total", "errors")
+
+    def __init__(self, thread, size: int):
+        self.thread = thread
+        self.counts = [0] * size
+        self.total = 0.0
+        self.errors = 0
+
+
+class LatencyHistogram:
+    # Histograma de buckets fijos. Cada hilo escribe en su propio shard sin
+    # locks (observe() es una búsqueda binaria y tres sumas); snapshot()
+    # suma los shards y pliega los de hilos terminados en uno solo.
+    __slots__ = ("buckets", "_local", "_shards", "_retired", "_lock")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard(None, len(self.buckets) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard.counts[bisect_left(self.buckets, seconds)] += 1
+        shard.total += seconds
+        if error:
+            shard.errors += 1
+
+    def snapshot(self) -> Tuple[list, float, int, int]:
+        # (conteos acumulados por bucket, suma, llamadas, errores)
+        with self._lock:
+            self._retire_finished()
+            counts = list(self._retired.counts)
+            total, errors = self._retired.total, self._retired.errors
+            for shard in self._shards:
+                for index, count in enumerate(shard.counts):
+                    counts[index] += count
+                total += shard.total
+                errors += shard.errors
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running, errors
+
+    def _new_shard(self) -> _Shard:
+        shard = _Shard(threading.current_thread(), len(self.buckets) + 1)
+        with self._lock:
+            # Con un hilo por request los shards se acumulan: se pliegan al crear uno nuevo
+            self._retire_finished()
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def _retire_finished(self) -> None:
+        alive = []
+        retired = self._retired
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+                continue
+            for index, count in enumerate(shard.counts):
+                retired.counts[index] += count
+            retired.total += shard.total
+            retired.errors += shard.errors
+        self._shards = alive
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.histogram.observe(perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+
+class MetricsRegistry:
+    # Histogramas de latencia por (puerto, método), exportables en el
+    # formato de texto de Prometheus
+    NAMESPACE = "emergency"
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, port: str, method: str) -> LatencyHistogram:
+        key = (port, method)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram(self.buckets))
+        return histogram
+
+    def timer(self, port: str, method: str) -> _Timer:
+        return _Timer(self.histogram(port, method))
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        prefix = self.NAMESPACE
+        bounds = [_format_float(bound) for bound in self.buckets] + ["+Inf"]
+        calls, errors, durations = [], [], []
+        for (port, method), histogram in histograms:
+            cumulative, total, count, error_count = histogram.snapshot()
+            labels = f'port="{_escape(port)}",method="{_escape(method)}"'
+            calls.append(f"{prefix}_port_calls_total{{{labels}}} {count}")
+            errors.append(f"{prefix}_port_errors_total{{{labels}}} {error_count}")
+            for bound, bucket_count in zip(bounds, cumulative):
+                durations.append(f'{prefix}_port_call_duration_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            durations.append(f"{prefix}_port_call_duration_seconds_sum{{{labels}}} {_format_float(total)}")
+            durations.append(f"{prefix}_port_call_duration_seconds_count{{{labels}}} {count}")
+
+        lines = [
+            f"# HELP {prefix}_port_calls_total Llamadas a cada método de los puertos.",
+            f"# TYPE {prefix}_port_calls_total counter",
+            *calls,
+            f"# HELP {prefix}_port_errors_total Llamadas que terminaron en excepción.",
+            f"# TYPE {prefix}_port_errors_total counter",
+            *errors,
+            f"# HELP {prefix}_port_call_duration_seconds Latencia de cada método de los puertos.",
+            f"# TYPE {prefix}_port_call_duration_seconds histogram",
+            *durations
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
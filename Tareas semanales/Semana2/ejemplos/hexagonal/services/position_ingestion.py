@@ -0,0 +1,122 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable
+from domain.ports import VehicleRepositoryPort
+from domain.entities import PositionUpdate
+
+class PositionIngestion:
+    # Junta los pings GPS que llegan entre ticks y los aplica al repositorio
+    # en una sola llamada a update_vehicle_positions. Dentro de un tick se
+    # queda solo el ping más nuevo de cada vehículo; los que llegan con un
+    # timestamp anterior al último aplicado se descartan.
+
+    def __init__(self, vehicle_repository: VehicleRepositoryPort, tick_seconds: float = 0.1,
+                 max_pending: int = 100_000, max_tracked: int = 100_000):
+        self.vehicle_repository = vehicle_repository
+        self.tick_seconds = tick_seconds
+        # Tope de vehículos distintos por tick (protege de ids inventados)
+        self.max_pending = max_pending
+        # Tope de timestamps recordados (LRU). Se envían ids sin saber si el
+        # repositorio los conoce, así que sin tope los ids inventados harían
+        # crecer el mapa; olvidar uno solo quita el filtro temprano, porque
+        # los repositorios descartan igual los pings atrasados.
+        self.max_tracked = max_tracked
+        self._pending: Dict[str, PositionUpdate] = {}
+        self._applied_times: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.received = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.dropped = 0
+        self.applied = 0
+        self.flushes = 0
+        self.errors = 0
+
+    def submit(self, updates: Iterable[PositionUpdate]) -> int:
+        # Devuelve cuántos pings quedaron pendientes (nuevos o reemplazos)
+        accepted = 0
+        with self._lock:
+            pending = self._pending
+            applied_times = self._applied_times
+            for update in updates:
+                self.received += 1
+                vehicle_id = update.vehicle_id
+                if update.timestamp <= applied_times.get(vehicle_id, -math.inf):
+                    self.stale += 1
+                    continue
+                current = pending.get(vehicle_id)
+                if current is None:
+                    if len(pending) >= self.max_pending:
+                        self.dropped += 1
+                        continue
+                    pending[vehicle_id] = update
+                    accepted += 1
+                    continue
+                self.coalesced += 1
+                if update.timestamp > current.timestamp:
+                    pending[vehicle_id] = update
+                    accepted += 1
+        return accepted
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            updates = list(pending.values())
+            applied = self.vehicle_repository.update_vehicle_positions(updates)
+            with self._lock:
+                applied_times = self._applied_times
+                for update in updates:
+                    if update.timestamp > applied_times.get(update.vehicle_id, -math.inf):
+                        applied_times[update.vehicle_id] = update.timestamp
+                        applied_times.move_to_end(update.vehicle_id)
+                while len(applied_times) > self.max_tracked:
+                    applied_times.popitem(last=False)
+                self.applied += applied
+                self.flushes += 1
+            return applied
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="position-ingestion", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "tracked": len(self._applied_times),
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "stale": self.stale,
+                "dropped": self.dropped,
+                "applied": self.applied,
+                "flushes": self.flushes,
+                "errors": self.errors
+            }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.tick_seconds):
+            try:
+                self.flush()
+            except Exception:
+                # Un error del repositorio no debe detener la ingesta; el
+                # siguiente ping de cada vehículo vuelve a intentarlo
+                self.errors += 1
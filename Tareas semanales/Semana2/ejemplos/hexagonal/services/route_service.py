@@ -1,16 +1,30 @@
+from typing import Iterator
 from domain.ports import EmergencyRepositoryPort, VehicleRepositoryPort, RouteOptimizerPort
 from domain.entities import Route, Emergency
+from services.assignment import assign_emergencies, TYPE_MISMATCH_PENALTY_KM, UNASSIGNED_PENALTY_KM
+
+VEHICLE_TYPE_BY_EMERGENCY = {
+    "medical": "ambulance",
+    "fire": "fire_truck",
+    "crime": "police_car"
+}
 
 class RouteService:
+    TYPE_MISMATCH_PENALTY_KM = TYPE_MISMATCH_PENALTY_KM
+    UNASSIGNED_PENALTY_KM = UNASSIGNED_PENALTY_KM
+    
     def __init__(
         self, 
         emergency_repository: EmergencyRepositoryPort,
         vehicle_repository: VehicleRepositoryPort,
-        route_optimizer: RouteOptimizerPort
+        route_optimizer: RouteOptimizerPort,
+        candidate_limit: int = 5
     ):
         self.emergency_repository = emergency_repository
         self.vehicle_repository = vehicle_repository
         self.route_optimizer = route_optimizer
+        # Cantidad de vehículos más cercanos que se entregan al optimizador
+        self.candidate_limit = candidate_limit
     
     def get_optimal_route_for_emergency(self, emergency_id: str) -> Route:
         # Obtener la emergencia
@@ -19,48 +33,104 @@ class RouteService:
         if not emergency:
             raise ValueError(f"Emergency with id {emergency_id} not found")
         
-        # Obtener vehículos disponibles del tipo adecuado
+        # Reservar el mejor vehículo disponible del tipo adecuado
         vehicle_type = self._get_vehicle_type_for_emergency(emergency.emergency_type)
-        available_vehicles = self.vehicle_repository.get_available_vehicles(vehicle_type)
+        optimal_route = self._reserve_route(emergency, vehicle_type)
         
-        if not available_vehicles:
+        if optimal_route is None:
             # Si no hay vehículos del tipo específico, intentar con cualquier tipo
-            available_vehicles = self.vehicle_repository.get_available_vehicles()
+            optimal_route = self._reserve_route(emergency, None)
         
-        if not available_vehicles:
+        if optimal_route is None:
             raise Exception("No available vehicles")
         
-        # Encontrar la ruta óptima
-        optimal_route = self.route_optimizer.find_optimal_route(emergency, available_vehicles)
-        
-        # Marcar vehículo como no disponible
-        self.vehicle_repository.update_vehicle_status(optimal_route.vehicle.id, False)
-        
         return optimal_route
     
+    def _reserve_route(self, emergency: Emergency, vehicle_type: str):
+        # Elige entre los vehículos más cercanos y los reserva con try_reserve.
+        # Si otro despacho concurrente ganó la reserva, se pasa al siguiente
+        # candidato; cuando se agotan, se piden candidatos nuevos.
+        attempted = set()
+        while True:
+            candidates = [
+                vehicle for vehicle in self.vehicle_repository.nearest_available(
+                    emergency.location, vehicle_type, k=self.candidate_limit + len(attempted)
+                )
+                if vehicle.id not in attempted
+            ]
+            if not candidates:
+                return None
+            
+            while candidates:
+                route = self.route_optimizer.find_optimal_route(emergency, candidates)
+                if self.vehicle_repository.try_reserve(route.vehicle.id):
+                    return route
+                attempted.add(route.vehicle.id)
+                candidates = [vehicle for vehicle in candidates if vehicle.id != route.vehicle.id]
+    
     def _get_vehicle_type_for_emergency(self, emergency_type: str) -> str:
-        mapping = {
-            "medical": "ambulance",
-            "fire": "fire_truck",
-            "crime": "police_car"
-        }
-        return mapping.get(emergency_type)
+        return VEHICLE_TYPE_BY_EMERGENCY.get(emergency_type)
+    
+    def get_all_active_emergencies_with_routes(self, batch: bool = False) -> list:
+        return list(self.iter_active_emergencies_with_routes(batch=batch))
     
-    def get_all_active_emergencies_with_routes(self) -> list:
+    def iter_active_emergencies_with_routes(self, batch: bool = False) -> Iterator[dict]:
+        # Generador: entrega cada emergencia apenas tiene su ruta, sin esperar al resto
         emergencies = self.emergency_repository.get_active_emergencies()
-        result = []
+        yield from self.dispatch_emergencies(emergencies, batch=batch)
+    
+    def dispatch_emergencies(self, emergencies: list, batch: bool = False) -> Iterator[dict]:
+        # Despacha una lista dada de emergencias (p. ej. un micro-lote del scheduler)
+        if batch:
+            yield from self._dispatch_batch(emergencies)
+            return
         
         for emergency in emergencies:
             try:
                 route = self.get_optimal_route_for_emergency(emergency.id)
-                result.append({
+                yield {
                     "emergency": emergency,
                     "route": route
-                })
+                }
             except Exception as e:
-                result.append({
+                yield {
                     "emergency": emergency,
                     "error": str(e)
-                })
+                }
+    
+    def _dispatch_batch(self, emergencies: list) -> Iterator[dict]:
+        # Asignación global: una sola matriz emergencia x vehículo resuelta
+        # como asignación de costo mínimo, en vez de elegir uno por uno
+        if not emergencies:
+            return
+        
+        vehicles = self.vehicle_repository.get_available_vehicles()
+        if not vehicles:
+            for emergency in emergencies:
+                yield {"emergency": emergency, "error": "No available vehicles"}
+            return
         
-        return result
\ No newline at end of file
+        distances = self.route_optimizer.distance_matrix(emergencies, vehicles)
+        assignment = assign_emergencies(
+            emergencies,
+            vehicles,
+            distances,
+            [self._get_vehicle_type_for_emergency(e.emergency_type) for e in emergencies],
+            self.TYPE_MISMATCH_PENALTY_KM,
+            self.UNASSIGNED_PENALTY_KM
+        )
+        
+        for emergency, column in zip(emergencies, assignment.tolist()):
+            if column < 0:
+                yield {"emergency": emergency, "error": "No available vehicles"}
+                continue
+            try:
+                vehicle = vehicles[column]
+                if self.vehicle_repository.try_reserve(vehicle.id):
+                    route = self.route_optimizer.find_optimal_route(emergency, [vehicle])
+                else:
+                    # Otro despacho tomó el vehículo: asignar el siguiente mejor
+                    route = self.get_optimal_route_for_emergency(emergency.id)
+                yield {"emergency": emergency, "route": route}
+            except Exception as e:
+                yield {"emergency": emergency, "error": str(e)}
@@ -0,0 +1,441 @@
+import math
+import multiprocessing
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence
+from domain.ports import EmergencyRepositoryPort, VehicleRepositoryPort
+from domain.entities import Emergency, EmergencyVehicle, Location, PositionUpdate, Route
+from adapters.secondary.emergency_repository import InMemoryEmergencyRepository, InMemoryVehicleRepository
+from adapters.secondary.geo import haversine_km
+from adapters.secondary.numpy_route_optimizer import NumpyRouteOptimizer
+from services.route_service import RouteService, VEHICLE_TYPE_BY_EMERGENCY
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON = 111.320
+
+class RegionPartitioner:
+    # Divide el área de servicio en una grilla rows x cols de regiones. Los
+    # puntos fuera del área caen en la región del borde más cercana.
+
+    def __init__(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, rows: int, cols: int):
+        if rows < 1 or cols < 1:
+            raise ValueError("A partition needs at least one row and one column")
+        self.min_lat = min_lat
+        self.min_lon = min_lon
+        self.rows = rows
+        self.cols = cols
+        self.cell_lat = (max_lat - min_lat) / rows or 1e-9
+        self.cell_lon = (max_lon - min_lon) / cols or 1e-9
+
+    @classmethod
+    def from_locations(cls, locations: Sequence[Location], rows: int, cols: int) -> "RegionPartitioner":
+        latitudes = [location.latitude for location in locations]
+        longitudes = [location.longitude for location in locations]
+        return cls(min(latitudes), min(longitudes), max(latitudes), max(longitudes), rows, cols)
+
+    @property
+    def region_count(self) -> int:
+        return self.rows * self.cols
+
+    def region_of(self, latitude: float, longitude: float) -> int:
+        return self._row(latitude) * self.cols + self._col(longitude)
+
+    def regions_within(self, latitude: float, longitude: float, radius_km: float) -> List[int]:
+        # Regiones que tocan el cuadrado de lado 2 * radius_km alrededor del
+        # punto; la primera es siempre la región propia
+        home = self.region_of(latitude, longitude)
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LON * max(math.cos(math.radians(latitude)), 1e-6))
+        regions = [home]
+        for row in range(self._row(latitude - dlat), self._row(latitude + dlat) + 1):
+            for col in range(self._col(longitude - dlon), self._col(longitude + dlon) + 1):
+                region = row * self.cols + col
+                if region != home:
+                    regions.append(region)
+        return regions
+
+    def _row(self, latitude: float) -> int:
+        return min(max(int((latitude - self.min_lat) // self.cell_lat), 0), self.rows - 1)
+
+    def _col(self, longitude: float) -> int:
+        return min(max(int((longitude - self.min_lon) // self.cell_lon), 0), self.cols - 1)
+
+
+def _worker_main(connection, vehicles: List[EmergencyVehicle]) -> None:
+    # Proceso dueño de la flota de una región. Atiende un comando a la vez
+    # por su extremo del pipe y responde (ok, resultado).
+    vehicle_repository = InMemoryVehicleRepository(vehicles)
+    emergency_repository = InMemoryEmergencyRepository([])
+    optimizer = NumpyRouteOptimizer()
+    service = RouteService(emergency_repository, vehicle_repository, optimizer)
+
+    def dispatch(emergencies, batch):
+        # Las emergencias pertenecen a la región solo mientras se despachan
+        for emergency in emergencies:
+            emergency_repository.emergencies[emergency.id] = emergency
+        try:
+            return [
+                (result["emergency"].id, result.get("route"), result.get("error"))
+                for result in service.dispatch_emergencies(emergencies, batch=batch)
+            ]
+        finally:
+            for emergency in emergencies:
+                emergency_repository.emergencies.pop(emergency.id, None)
+
+    def propose(emergency, vehicle_type, k, exclude):
+        # Mejor ruta local sin reservar; el coordinador decide entre regiones
+        candidates = [
+            vehicle for vehicle in vehicle_repository.nearest_available(emergency.location, vehicle_type, k + len(exclude))
+            if vehicle.id not in exclude
+        ]
+        return optimizer.find_optimal_route(emergency, candidates) if candidates else None
+
+    def nearest(location, vehicle_type, k, max_radius_km):
+        return [
+            (vehicle, haversine_km(location.latitude, location.longitude,
+                                   vehicle.current_location.latitude, vehicle.current_location.longitude))
+            for vehicle in vehicle_repository.nearest_available(location, vehicle_type, k, max_radius_km)
+        ]
+
+    def put(vehicle, timestamp):
+        vehicle_repository.add_vehicle(vehicle)
+        if timestamp is not None:
+            # Conserva el último timestamp aplicado para seguir descartando pings atrasados
+            location = vehicle.current_location
+            vehicle_repository.update_vehicle_positions([
+                PositionUpdate(vehicle.id, location.latitude, location.longitude, timestamp)
+            ])
+
+    handlers = {
+        "dispatch": dispatch,
+        "propose": propose,
+        "nearest": nearest,
+        "reserve": vehicle_repository.try_reserve,
+        "status": vehicle_repository.update_vehicle_status,
+        "location": vehicle_repository.update_vehicle_location,
+        "positions": vehicle_repository.update_vehicle_positions,
+        "available": vehicle_repository.get_available_vehicles,
+        "take": vehicle_repository.remove_vehicle,
+        "put": put
+    }
+    while True:
+        try:
+            command, args = connection.recv()
+        except EOFError:
+            break
+        if command == "stop":
+            break
+        try:
+            connection.send((True, handlers[command](*args)))
+        except Exception as e:
+            connection.send((False, f"{type(e).__name__}: {e}"))
+    connection.close()
+
+
+class _Shard:
+    __slots__ = ("process", "connection", "lock")
+
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+        self.lock = threading.Lock()
+
+
+class ShardedRouteService:
+    # Despacho repartido por regiones: cada región tiene su flota en un
+    # proceso propio y el coordinador enruta por ubicación. Las emergencias
+    # lejos de los bordes se despachan por lotes dentro de su región, en
+    # paralelo entre procesos; las que están a menos de border_km de otra
+    # región piden una propuesta a cada región vecina y reservan la mejor
+    # (propose/commit). Si la región propia se queda sin vehículos se
+    # consulta a todas. Misma interfaz que RouteService.
+
+    def __init__(
+        self,
+        emergency_repository: EmergencyRepositoryPort,
+        vehicles: List[EmergencyVehicle],
+        partitioner: RegionPartitioner,
+        border_km: float = 2.0,
+        candidate_limit: int = 5,
+        start_method: str = "spawn"
+    ):
+        self.emergency_repository = emergency_repository
+        self.partitioner = partitioner
+        self.border_km = border_km
+        self.candidate_limit = candidate_limit
+        self.start_method = start_method
+        # Optimizador local para quien necesite rutas sin pasar por una región
+        self.route_optimizer = NumpyRouteOptimizer()
+        self.vehicle_repository = ShardedVehicleRepository(self)
+        self._fleets: List[List[EmergencyVehicle]] = [[] for _ in range(partitioner.region_count)]
+        self._vehicle_regions: Dict[str, int] = {}
+        for vehicle in vehicles:
+            region = partitioner.region_of(vehicle.current_location.latitude, vehicle.current_location.longitude)
+            self._fleets[region].append(vehicle)
+            self._vehicle_regions[vehicle.id] = region
+        self._regions_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._shards: Optional[List[_Shard]] = None
+        self.local_dispatches = 0
+        self.cross_border_dispatches = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_spec(cls, emergency_repository: EmergencyRepositoryPort, vehicles: List[EmergencyVehicle],
+                  spec: str, **kwargs) -> "ShardedRouteService":
+        # spec "2x3": 2 filas por 3 columnas sobre el área que cubre la flota
+        rows, cols = (int(part) for part in spec.lower().split("x"))
+        partitioner = RegionPartitioner.from_locations([vehicle.current_location for vehicle in vehicles], rows, cols)
+        return cls(emergency_repository, vehicles, partitioner, **kwargs)
+
+    def start(self) -> None:
+        # Los procesos se crean recién en el primer uso: con "spawn" cada hijo
+        # vuelve a importar el módulo principal y no debe lanzar los suyos
+        if self._shards is not None:
+            return
+        with self._start_lock:
+            if self._shards is not None:
+                return
+            context = multiprocessing.get_context(self.start_method)
+            shards = []
+            for region, fleet in enumerate(self._fleets):
+                parent, child = context.Pipe()
+                process = context.Process(
+                    target=_worker_main, args=(child, fleet), name=f"dispatch-region-{region}", daemon=True
+                )
+                process.start()
+                child.close()
+                shards.append(_Shard(process, parent))
+            self._fleets = None
+            self._shards = shards
+
+    def close(self) -> None:
+        with self._start_lock:
+            shards, self._shards = self._shards, None
+        for shard in shards or []:
+            with shard.lock:
+                shard.connection.send(("stop", ()))
+                shard.connection.close()
+            shard.process.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def get_optimal_route_for_emergency(self, emergency_id: str) -> Route:
+        emergency = self.emergency_repository.get_emergency_by_id(emergency_id)
+        if not emergency:
+            raise ValueError(f"Emergency with id {emergency_id} not found")
+
+        location = emergency.location
+        route = self._propose_commit(
+            emergency, self.partitioner.regions_within(location.latitude, location.longitude, self.border_km)
+        )
+        if route is None:
+            route = self._fallback(emergency)
+        if route is None:
+            raise Exception("No available vehicles")
+        return route
+
+    def get_all_active_emergencies_with_routes(self, batch: bool = False) -> list:
+        return list(self.iter_active_emergencies_with_routes(batch=batch))
+
+    def iter_active_emergencies_with_routes(self, batch: bool = False) -> Iterator[dict]:
+        emergencies = self.emergency_repository.get_active_emergencies()
+        yield from self.dispatch_emergencies(emergencies, batch=batch)
+
+    def dispatch_emergencies(self, emergencies: list, batch: bool = False) -> Iterator[dict]:
+        interior: Dict[int, List[Emergency]] = {}
+        border = []
+        for emergency in emergencies:
+            location = emergency.location
+            regions = self.partitioner.regions_within(location.latitude, location.longitude, self.border_km)
+            if len(regions) == 1:
+                interior.setdefault(regions[0], []).append(emergency)
+            else:
+                border.append((emergency, regions))
+
+        # Todas las regiones despachan su lote a la vez, cada una en su proceso
+        by_id = {emergency.id: emergency for emergency in emergencies}
+        replies = self._fan_out({region: ("dispatch", (group, batch)) for region, group in interior.items()})
+        for region in sorted(replies):
+            for emergency_id, route, error in replies[region]:
+                emergency = by_id[emergency_id]
+                if route is None:
+                    # Sin vehículos en la región: se busca en todas
+                    try:
+                        route = self._fallback(emergency)
+                    except Exception as e:
+                        error = str(e)
+                if route is None:
+                    yield {"emergency": emergency, "error": error}
+                    continue
+                self.local_dispatches += 1
+                yield {"emergency": emergency, "route": route}
+
+        for emergency, regions in border:
+            try:
+                route = self._propose_commit(emergency, regions) or self._fallback(emergency)
+            except Exception as e:
+                yield {"emergency": emergency, "error": str(e)}
+                continue
+            if route is None:
+                yield {"emergency": emergency, "error": "No available vehicles"}
+                continue
+            self.cross_border_dispatches += 1
+            yield {"emergency": emergency, "route": route}
+
+    def stats(self) -> dict:
+        with self._regions_lock:
+            fleet_sizes = [0] * self.partitioner.region_count
+            for region in self._vehicle_regions.values():
+                fleet_sizes[region] += 1
+        return {
+            "regions": self.partitioner.region_count,
+            "fleet_by_region": fleet_sizes,
+            "local_dispatches": self.local_dispatches,
+            "cross_border_dispatches": self.cross_border_dispatches,
+            "fallbacks": self.fallbacks
+        }
+
+    def _get_vehicle_type_for_emergency(self, emergency_type: str) -> str:
+        return VEHICLE_TYPE_BY_EMERGENCY.get(emergency_type)
+
+    def _fallback(self, emergency: Emergency) -> Optional[Route]:
+        self.fallbacks += 1
+        return self._propose_commit(emergency, list(range(self.partitioner.region_count)))
+
+    def _propose_commit(self, emergency: Emergency, regions: List[int]) -> Optional[Route]:
+        # Cada región propone su mejor ruta sin reservar; se reserva la de
+        # menor tiempo y, si otro despacho la ganó, se vuelve a proponer
+        vehicle_type = self._get_vehicle_type_for_emergency(emergency.emergency_type)
+        for wanted_type in dict.fromkeys((vehicle_type, None)):
+            exclude = frozenset()
+            while True:
+                proposals = self._fan_out({
+                    region: ("propose", (emergency, wanted_type, self.candidate_limit, exclude)) for region in regions
+                })
+                routes = [(route.estimated_time, route.distance, region, route)
+                          for region, route in proposals.items() if route is not None]
+                if not routes:
+                    break
+                _, _, region, route = min(routes, key=lambda item: item[:3])
+                if self._call(region, "reserve", route.vehicle.id):
+                    return route
+                exclude = exclude | {route.vehicle.id}
+        return None
+
+    def _region_of_vehicle(self, vehicle_id: str) -> Optional[int]:
+        with self._regions_lock:
+            return self._vehicle_regions.get(vehicle_id)
+
+    def _call(self, region: int, command: str, *args):
+        return self._fan_out({region: (command, args)})[region]
+
+    def _fan_out(self, requests: Dict[int, tuple]) -> Dict[int, object]:
+        # Envía a todas las regiones antes de leer la primera respuesta, así
+        # los procesos trabajan en paralelo. Los locks se toman en orden de
+        # región para que dos fan-outs concurrentes no se bloqueen entre sí.
+        if not requests:
+            return {}
+        self.start()
+        regions = sorted(requests)
+        shards = [self._shards[region] for region in regions]
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            for region, shard in zip(regions, shards):
+                shard.connection.send(requests[region])
+            replies = {region: shard.connection.recv() for region, shard in zip(regions, shards)}
+        finally:
+            for shard in shards:
+                shard.lock.release()
+
+        results = {}
+        for region, (ok, value) in replies.items():
+            if not ok:
+                raise RuntimeError(f"Region {region} failed: {value}")
+            results[region] = value
+        return results
+
+
+class ShardedVehicleRepository(VehicleRepositoryPort):
+    # Vista de la flota repartida como un solo repositorio: cada operación
+    # va al proceso de la región dueña del vehículo
+
+    def __init__(self, service: ShardedRouteService):
+        self.service = service
+
+    def get_available_vehicles(self, vehicle_type: str = None) -> List[EmergencyVehicle]:
+        service = self.service
+        replies = service._fan_out({
+            region: ("available", (vehicle_type,)) for region in range(service.partitioner.region_count)
+        })
+        return [vehicle for region in sorted(replies) for vehicle in replies[region]]
+
+    def update_vehicle_status(self, vehicle_id: str, available: bool) -> bool:
+        region = self.service._region_of_vehicle(vehicle_id)
+        return region is not None and self.service._call(region, "status", vehicle_id, available)
+
+    def try_reserve(self, vehicle_id: str) -> bool:
+        region = self.service._region_of_vehicle(vehicle_id)
+        return region is not None and self.service._call(region, "reserve", vehicle_id)
+
+    def update_vehicle_location(self, vehicle_id: str, location: Location) -> bool:
+        region = self.service._region_of_vehicle(vehicle_id)
+        if region is None or not self.service._call(region, "location", vehicle_id, location):
+            return False
+        if self.service.partitioner.region_of(location.latitude, location.longitude) != region:
+            self._migrate({vehicle_id: None})
+        return True
+
+    def update_vehicle_positions(self, updates: List[PositionUpdate]) -> int:
+        service = self.service
+        by_region: Dict[int, List[PositionUpdate]] = {}
+        for update in updates:
+            region = service._region_of_vehicle(update.vehicle_id)
+            if region is not None:
+                by_region.setdefault(region, []).append(update)
+        replies = service._fan_out({region: ("positions", (group,)) for region, group in by_region.items()})
+
+        # Los vehículos que cruzaron a otra región cambian de proceso
+        moved: Dict[str, float] = {}
+        partitioner = service.partitioner
+        for region, group in by_region.items():
+            for update in group:
+                if partitioner.region_of(update.latitude, update.longitude) != region:
+                    moved[update.vehicle_id] = max(update.timestamp, moved.get(update.vehicle_id, -math.inf))
+        if moved:
+            self._migrate(moved)
+        return sum(replies.values())
+
+    def nearest_available(self, location: Location, vehicle_type: str = None, k: int = 1,
+                          max_radius_km: Optional[float] = None) -> List[EmergencyVehicle]:
+        service = self.service
+        if max_radius_km is None:
+            regions = range(service.partitioner.region_count)
+        else:
+            regions = service.partitioner.regions_within(location.latitude, location.longitude, max_radius_km)
+        replies = service._fan_out({
+            region: ("nearest", (location, vehicle_type, k, max_radius_km)) for region in regions
+        })
+        candidates = sorted((pair for pairs in replies.values() for pair in pairs), key=lambda pair: pair[1])
+        return [vehicle for vehicle, _ in candidates[:k]]
+
+    def _migrate(self, moved: Dict[str, Optional[float]]) -> None:
+        service = self.service
+        with service._regions_lock:
+            for vehicle_id, timestamp in moved.items():
+                region = service._vehicle_regions.get(vehicle_id)
+                if region is None:
+                    continue
+                vehicle = service._call(region, "take", vehicle_id)
+                if vehicle is None:
+                    continue
+                location = vehicle.current_location
+                target = service.partitioner.region_of(location.latitude, location.longitude)
+                service._call(target, "put", vehicle, timestamp)
+                service._vehicle_regions[vehicle_id] = target
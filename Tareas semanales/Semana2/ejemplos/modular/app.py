@@ -1,6 +1,8 @@
 from flask import Flask
 from config import Config
 from database.connection import init_db
+from auth.hashing import init_hashing
+from auth.cache import init_user_cache
 from auth.routes import auth_bp
 
 def create_app():
@@ -10,6 +12,12 @@ def create_app():
     # Inicializar base de datos
     init_db(app)
     
+    # Configurar el pool de hashing de contraseñas
+    init_hashing(app)
+    
+    # Configurar el cache de usuarios
+    init_user_cache(app)
+    
     # Registrar blueprints
     app.register_blueprint(auth_bp)
     
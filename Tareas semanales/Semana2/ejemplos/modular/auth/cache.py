@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from auth.hashing import password_hasher
+
+class CachedUser:
+    # Copia de solo lectura de un User: no queda atada a la sesión de
+    # SQLAlchemy, así que se puede compartir entre requests e hilos
+    __slots__ = ("id", "username", "email", "password_hash")
+
+    def __init__(self, id, username, email, password_hash):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.password_hash = password_hash
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(user.id, user.username, user.email, user.password_hash)
+
+    def check_password(self, password):
+        return password_hasher.verify(self.password_hash, password)
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+
+class UserCache:
+    # Cache read-through de usuarios por proceso: LRU acotado a max_size
+    # entradas, cada una válida ttl segundos. Se indexa por id y por
+    # username (el segundo índice apunta al id, así hay una sola copia).
+
+    def __init__(self, max_size=1024, ttl=300.0, clock=monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # id -> (vence, CachedUser)
+        self._by_username = {}
+        self._lock = threading.Lock()
+        # Sube con cada invalidación: una carga que empezó antes no se guarda
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def configure(self, max_size=None, ttl=None):
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            self._evict()
+
+    def get_by_id(self, user_id, loader):
+        # loader(user_id) -> User o None; solo se llama si no hay entrada vigente
+        with self._lock:
+            user = self._lookup(user_id)
+            generation = self._generation
+        if user is not None:
+            return user
+        return self._load(loader(user_id), generation)
+
+    def get_by_username(self, username, loader):
+        with self._lock:
+            user = self._lookup(self._by_username.get(username))
+            generation = self._generation
+        if user is not None:
+            return user
+        return self._load(loader(username), generation)
+
+    def invalidate(self, user_id=None, username=None):
+        with self._lock:
+            if user_id is None and username is not None:
+                user_id = self._by_username.get(username)
+            self._generation += 1
+            if user_id in self._entries:
+                self._remove(user_id)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_username.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def _lookup(self, user_id):
+        entry = self._entries.get(user_id) if user_id is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= self._clock():
+            self._remove(user_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def _load(self, model, generation):
+        # Los usuarios inexistentes no se guardan: el registro no tiene que invalidar nada
+        if model is None:
+            return None
+        user = CachedUser.from_model(model)
+        with self._lock:
+            if generation != self._generation:
+                return user
+            if user.id in self._entries:
+                self._remove(user.id)
+            self._entries[user.id] = (self._clock() + self.ttl, user)
+            self._by_username[user.username] = user.id
+            self._evict()
+        return user
+
+    def _remove(self, user_id):
+        _, user = self._entries.pop(user_id)
+        if self._by_username.get(user.username) == user_id:
+            del self._by_username[user.username]
+
+    def _evict(self):
+        while len(self._entries) > self.max_size:
+            user_id = next(iter(self._entries))
+            self._remove(user_id)
+            self.evictions += 1
+
+
+# Instancia compartida por AuthService; init_user_cache la configura desde app.config
+user_cache = UserCache()
+
+def init_user_cache(app):
+    user_cache.configure(
+        max_size=app.config.get('USER_CACHE_SIZE'),
+        ttl=app.config.get('USER_CACHE_TTL_SECONDS')
+    )
@@ -56,6 +56,6 @@ class AuthController:
     
     @staticmethod
     def logout():
-        session.pop('user_id', None)
+        AuthService.logout_user(session.pop('user_id', None))
         flash('Has cerrado sesión exitosamente', 'info')
         return redirect(url_for('auth.login'))
\ No newline at end of file
@@ -0,0 +1,153 @@
+import threading
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Límites superiores (ms) de los buckets de latencia
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class HashingBusyError(Exception):
+    # El pool de hashing está lleno: se rechaza en vez de encolar sin límite
+    pass
+
+
+class _OperationStats:
+    def __init__(self):
+        self.count = 0
+        self.rejected = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.wait_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, wait_ms, run_ms):
+        self.count += 1
+        self.total_ms += run_ms
+        self.wait_ms += wait_ms
+        self.max_ms = max(self.max_ms, run_ms)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, run_ms)] += 1
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "mean_wait_ms": self.wait_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "buckets_ms": dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"], self.buckets))
+        }
+
+
+class PasswordHasher:
+    # Ejecuta el hash y la verificación de contraseñas en un pool de hilos
+    # propio (hashlib libera el GIL durante el KDF). Como mucho hay
+    # max_workers cálculos en curso y max_queue esperando; si no hay lugar
+    # se lanza HashingBusyError al instante y el hilo del request queda libre.
+
+    def __init__(self, max_workers=4, max_queue=32, timeout=10.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stats = {"hash": _OperationStats(), "verify": _OperationStats()}
+
+    def configure(self, max_workers=None, max_queue=None, timeout=None):
+        # Solo antes del primer uso (el pool se crea de forma perezosa)
+        with self._lock:
+            if self._executor is not None:
+                raise RuntimeError("El pool de hashing ya está en uso")
+            if max_workers is not None:
+                self.max_workers = max_workers
+            if max_queue is not None:
+                self.max_queue = max_queue
+            if timeout is not None:
+                self.timeout = timeout
+
+    def hash(self, password):
+        return self._run("hash", generate_password_hash, password)
+
+    def verify(self, password_hash, password):
+        return self._run("verify", check_password_hash, password_hash, password)
+
+    def pending(self):
+        # Cálculos en curso + en cola
+        return self._in_flight
+
+    def stats(self):
+        with self._lock:
+            operations = {name: stats.to_dict() for name, stats in self._stats.items()}
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending(),
+            "operations": operations
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _ensure_pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _run(self, operation, function, *args):
+        executor = self._ensure_pool()
+        stats = self._stats[operation]
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                stats.rejected += 1
+                raise HashingBusyError("Demasiadas solicitudes de autenticación, intenta de nuevo")
+            self._in_flight += 1
+
+        submitted = perf_counter()
+        timings = {}
+
+        def task():
+            started = perf_counter()
+            try:
+                return function(*args)
+            finally:
+                timings["wait"] = started - submitted
+                timings["run"] = perf_counter() - started
+                self._release()
+
+        try:
+            future = executor.submit(task)
+        except BaseException:
+            self._release()
+            raise
+        try:
+            result = future.result(timeout=self.timeout)
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+            raise
+        with self._lock:
+            stats.observe(timings["wait"] * 1000, timings["run"] * 1000)
+        return result
+
+
+# Instancia compartida por el modelo; init_hashing la configura desde app.config
+password_hasher = PasswordHasher()
+
+def init_hashing(app):
+    password_hasher.configure(
+        max_workers=app.config.get('HASH_POOL_WORKERS'),
+        max_queue=app.config.get('HASH_POOL_QUEUE'),
+        timeout=app.config.get('HASH_TIMEOUT_SECONDS')
+    )
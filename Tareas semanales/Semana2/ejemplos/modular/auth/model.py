@@ -1,5 +1,5 @@
 from database.connection import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from auth.hashing import password_hasher
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -8,10 +8,11 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        # El KDF corre en el pool de hashing (ver auth/hashing.py)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username}>'
\ No newline at end of file
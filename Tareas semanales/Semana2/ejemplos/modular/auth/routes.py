@@ -1,5 +1,7 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, jsonify
 from auth.controllers import AuthController
+from auth.hashing import HashingBusyError, password_hasher
+from auth.cache import user_cache
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -25,4 +27,17 @@ def dashboard():
 
 @auth_bp.route('/logout', methods=['GET'])
 def logout():
-    return AuthController.logout()
\ No newline at end of file
+    return AuthController.logout()
+
+@auth_bp.route('/hashing/stats', methods=['GET'])
+def hashing_stats():
+    return jsonify(password_hasher.stats())
+
+@auth_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(user_cache.stats())
+
+@auth_bp.errorhandler(HashingBusyError)
+def hashing_busy(error):
+    # Pool de hashing lleno: mejor rechazar rápido que dejar el request colgado
+    return jsonify({"error": str(error)}), 503, {"Retry-After": "1"}
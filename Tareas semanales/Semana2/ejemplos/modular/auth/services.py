@@ -1,26 +1,39 @@
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from auth.models import User
+from auth.cache import user_cache
 from database.connection import db
 
 class AuthService:
     @staticmethod
     def register_user(username, email, password):
-        if User.query.filter_by(username=username).first():
-            return None, "El usuario ya existe"
-        
-        if User.query.filter_by(email=email).first():
+        # Una sola consulta sobre las dos columnas únicas (indexadas), y antes
+        # del hash para no gastar el KDF en un registro que se va a rechazar
+        existing = User.query.with_entities(User.username, User.email).filter(
+            or_(User.username == username, User.email == email)
+        ).first()
+        if existing:
+            if existing.username == username:
+                return None, "El usuario ya existe"
             return None, "El email ya está registrado"
         
         new_user = User(username=username, email=email)
         new_user.set_password(password)
         
         db.session.add(new_user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otro registro con el mismo usuario o email ganó la carrera
+            db.session.rollback()
+            return None, "El usuario o email ya está registrado"
+        user_cache.invalidate(user_id=new_user.id, username=username)
         
         return new_user, "Usuario registrado exitosamente"
     
     @staticmethod
     def authenticate_user(username, password):
-        user = User.query.filter_by(username=username).first()
+        user = user_cache.get_by_username(username, lambda name: User.query.filter_by(username=name).first())
         
         if user and user.check_password(password):
             return user, "Login exitoso"
@@ -29,4 +42,22 @@ class AuthService:
     
     @staticmethod
     def get_user_by_id(user_id):
-        return User.query.get(user_id)
\ No newline at end of file
+        # Lectura a través del cache: en régimen las vistas autenticadas no consultan la base
+        return user_cache.get_by_id(user_id, User.query.get)
+    
+    @staticmethod
+    def change_password(user_id, new_password):
+        user = User.query.get(user_id)
+        if user is None:
+            return None, "Usuario no encontrado"
+        
+        user.set_password(new_password)
+        db.session.commit()
+        user_cache.invalidate(user_id=user.id, username=user.username)
+        
+        return user, "Contraseña actualizada"
+    
+    @staticmethod
+    def logout_user(user_id):
+        # Al cerrar sesión la próxima lectura vuelve a la base
+        user_cache.invalidate(user_id=user_id)
\ No newline at end of file
@@ -3,4 +3,11 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'una-clave-secreta-muy-segura'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///users.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool de hashing de contraseñas: hilos, lugares en cola y espera máxima
+    HASH_POOL_WORKERS = int(os.environ.get('HASH_POOL_WORKERS', 4))
+    HASH_POOL_QUEUE = int(os.environ.get('HASH_POOL_QUEUE', 32))
+    HASH_TIMEOUT_SECONDS = float(os.environ.get('HASH_TIMEOUT_SECONDS', 10))
+    # Cache de usuarios por proceso: entradas máximas y vigencia de cada una
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', 300))
\ No newline at end of file
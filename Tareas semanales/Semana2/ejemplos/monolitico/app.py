@@ -1,22 +1,95 @@
-from flask import Flask, request, jsonify
+import json
+import threading
+from bisect import bisect_right
+from flask import Flask, request, jsonify, Response
 
 app = Flask(__name__)
 
 # Base de datos en memoria (simulada)
 users_db = {}
 
+# Ids en orden creciente (se asignan en orden, así que la lista queda ordenada
+# sin reordenar); permite paginar por cursor con bisect
+user_ids = []
+_next_id = 1
+_users_lock = threading.Lock()
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_USERS = 5000
+STREAM_CHUNK_SIZE = 500
+
+def validate_user(data):
+    if not isinstance(data, dict):
+        return 'Expected a JSON object'
+    for field in ('name', 'email'):
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return f"Field '{field}' is required"
+    if '@' not in data['email']:
+        return 'Invalid email'
+    return None
+
+def insert_users(items):
+    # Asigna ids e inserta bajo el mismo lock: ids únicos y monótonos aun
+    # con requests concurrentes, y users_db/user_ids quedan en el mismo orden
+    global _next_id
+    created = []
+    with _users_lock:
+        for data in items:
+            user = {'id': _next_id, 'name': data['name'], 'email': data['email']}
+            users_db[_next_id] = user
+            user_ids.append(_next_id)
+            created.append(user)
+            _next_id += 1
+    return created
+
+def users_after(after, limit):
+    # Página por cursor: los primeros `limit` usuarios con id > after
+    with _users_lock:
+        start = bisect_right(user_ids, after)
+        return [users_db[user_id] for user_id in user_ids[start:start + limit]]
+
+def _int_arg(name, default, minimum, maximum=None):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if number < minimum or (maximum is not None and number > maximum):
+        raise ValueError(f"'{name}' must be between {minimum} and {maximum}" if maximum is not None
+                         else f"'{name}' must be at least {minimum}")
+    return number
+
 @app.route('/users', methods=['POST'])
 def create_user():
     data = request.get_json()
-    user_id = len(users_db) + 1
-    user = {
-        'id': user_id,
-        'name': data['name'],
-        'email': data['email']
-    }
-    users_db[user_id] = user
+    error = validate_user(data)
+    if error:
+        return jsonify({'error': error}), 400
+    user = insert_users([data])[0]
     return jsonify(user), 201
 
+@app.route('/users/bulk', methods=['POST'])
+def create_users_bulk():
+    # Se valida todo el lote antes de insertar: o entran todos o ninguno
+    items = request.get_json()
+    if not isinstance(items, list):
+        return jsonify({'error': 'Expected a JSON array of users'}), 400
+    if len(items) > MAX_BULK_USERS:
+        return jsonify({'error': f'At most {MAX_BULK_USERS} users per request'}), 413
+    errors = []
+    for index, data in enumerate(items):
+        error = validate_user(data)
+        if error:
+            errors.append({'index': index, 'error': error})
+    if errors:
+        return jsonify({'error': 'Invalid users', 'details': errors}), 400
+    created = insert_users(items)
+    return jsonify({'created': len(created), 'users': created}), 201
+
 @app.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     user = users_db.get(user_id)
@@ -26,9 +99,37 @@ def get_user(user_id):
 
 @app.route('/users', methods=['GET'])
 def get_all_users():
-    return jsonify(list(users_db.values()))
+    stream = (request.args.get('format') == 'ndjson'
+              or request.accept_mimetypes.best == 'application/x-ndjson')
+    if not stream and 'limit' not in request.args and 'after' not in request.args:
+        # Sin parámetros: la respuesta de siempre
+        return jsonify(list(users_db.values()))
+
+    try:
+        after = _int_arg('after', 0, 0)
+        limit = _int_arg('limit', DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if stream:
+        return Response(_stream_users(after), mimetype='application/x-ndjson')
+
+    # Se pide uno de más para saber si hay otra página; next_cursor es None al final
+    users = users_after(after, limit + 1)
+    next_cursor = users[limit - 1]['id'] if len(users) > limit else None
+    return jsonify({'users': users[:limit], 'next_cursor': next_cursor})
+
+def _stream_users(after):
+    # Una línea JSON por usuario, leyendo de a STREAM_CHUNK_SIZE por cursor:
+    # la memoria no crece con la tabla y el lock no se retiene mientras se envía
+    while True:
+        users = users_after(after, STREAM_CHUNK_SIZE)
+        if not users:
+            return
+        yield ''.join(json.dumps(user) + '\n' for user in users)
+        after = users[-1]['id']
 
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)